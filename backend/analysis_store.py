@@ -0,0 +1,104 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.config import ANALYSIS_CONFIG
+
+
+class AnalysisStore:
+    """
+    Keeps the clause-level state of recent analyses in SQLite, so a
+    revised upload can reference an earlier one. Only the newest
+    max_entries analyses are kept, each for at most ttl_seconds.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl_seconds: int = None):
+        self.max_entries = max_entries or ANALYSIS_CONFIG["MAX_ENTRIES"]
+        self.ttl_seconds = ttl_seconds or ANALYSIS_CONFIG["TTL_SECONDS"]
+        self._lock = threading.Lock()
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                value TEXT NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created)"
+        )
+        self._db.commit()
+
+    def save(self, analysis: Dict) -> str:
+        analysis_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO analyses VALUES (?, ?, ?)",
+                (analysis_id, now, json.dumps(analysis))
+            )
+            self._db.execute(
+                "DELETE FROM analyses WHERE created < ?", (now - self.ttl_seconds,)
+            )
+            self._db.execute(
+                """
+                DELETE FROM analyses WHERE id NOT IN (
+                    SELECT id FROM analyses ORDER BY created DESC LIMIT ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._db.commit()
+        return analysis_id
+
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM analyses WHERE id = ? AND created >= ?",
+                (analysis_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+        if row is None:
+            return None
+        analysis = json.loads(row[0])
+        analysis["analysis_id"] = analysis_id
+        return analysis
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """
+    Returns the process-wide store backed by ANALYSIS_CONFIG["STORE_PATH"],
+    or None when ANALYSIS_CONFIG["ENABLED"] is off.
+    """
+    global _store
+
+    if not ANALYSIS_CONFIG["ENABLED"]:
+        return None
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnalysisStore(ANALYSIS_CONFIG["STORE_PATH"])
+
+    return _store
+
+
+def load_analysis(analysis_id: str) -> Optional[Dict]:
+    """
+    The stored analysis, or None when it is unknown, expired or the
+    store is disabled.
+    """
+    store = get_analysis_store()
+    return store.get(analysis_id) if store is not None else None
@@ -1,13 +1,73 @@
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+import torch
+from fastapi import FastAPI, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from backend.prodoc_service import run_prodoc_on_text
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
+from src.model_registry import warm_up, is_ready, warm_up_error
+from src.extract_pdf_text import join_pages
+from backend.analysis_store import load_analysis
+from backend.bulk import (
+    BulkUploadError,
+    expand_uploads,
+    portfolio_summary,
+    read_uploads
+)
+from backend.config import BULK_CONFIG, EXECUTOR_CONFIG
+from backend.executors import (
+    ClientDisconnected,
+    ExtractionUnavailable,
+    extract_pdf_pages,
+    get_inference_pool,
+    run_until_disconnect,
+    shutdown_executors
+)
+from src.classification_cache import get_cache
+from src.lexical_classifier import get_cascade
+from backend.inference_scheduler import get_scheduler
+from backend.job_queue import JobQueueFull, get_job_queue
+from backend.streaming import MEDIA_TYPES, stream_events, stream_format
+from backend.metrics import (
+    PAGES_PER_REQUEST,
+    REGISTRY,
+    REQUEST_SECONDS,
+    REQUESTS,
+    server_timing_header,
+    span
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if EXECUTOR_CONFIG["TORCH_THREADS"]:
+        torch.set_num_threads(EXECUTOR_CONFIG["TORCH_THREADS"])
+
+    # Load LegalBERT in the background so liveness probes answer
+    # immediately while readiness stays false until the model is warm.
+    # A failed warm-up is logged by warm_up() and reported by
+    # /health/ready.
+    loop = asyncio.get_running_loop()
+    app.state.warm_up = loop.run_in_executor(get_inference_pool(), warm_up)
+    app.state.warm_up.add_done_callback(lambda future: future.exception())
+    scheduler = get_scheduler()
+    jobs = get_job_queue()
+    await jobs.start()
+    yield
+    await jobs.stop()
+    scheduler.stop(timeout=5)
+    shutdown_executors()
 
 
-app = FastAPI(title="PRODOC API")
+app = FastAPI(title="PRODOC API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,35 +87,308 @@ def serve_ui():
     return html_path.read_text(encoding="utf-8")
 
 
-import pdfplumber
-from io import BytesIO
+@app.get("/health/live")
+def health_live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def health_ready():
+    error = warm_up_error()
+    if error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": error})
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+
+@app.get("/stats/inference")
+def inference_stats():
+    return get_scheduler().stats()
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    return get_cache().stats()
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    text_chunks = []
+@app.get("/stats/cascade")
+def cascade_stats():
+    cascade = get_cascade()
+    return cascade.stats() if cascade is not None else {"enabled": False}
 
-    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_chunks.append(page_text)
 
-    return "\n\n".join(text_chunks)
+@app.get("/stats/jobs")
+def job_stats():
+    return get_job_queue().stats()
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
 
 @app.post("/upload")
-async def upload_contract(file: UploadFile = File(...)):
+async def upload_contract(
+    request: Request,
+    file: UploadFile = File(...),
+    previous_analysis_id: str = Form(None)
+):
     if not file.filename.lower().endswith(".pdf"):
+        REQUESTS.labels("rejected").inc()
         return {"error": "Only PDF files are supported"}
 
+    previous = None
+    if previous_analysis_id:
+        previous = load_analysis(previous_analysis_id)
+        if previous is None:
+            REQUESTS.labels("rejected").inc()
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Unknown previous_analysis_id"}
+            )
+
+    started = time.perf_counter()
+    file_bytes = await file.read()
+    cancel_event = threading.Event()
+    timings = {}
+
+    try:
+        with span("extraction", timings):
+            pages = await extract_pdf_pages(request, file_bytes)
+            extracted_text = join_pages(pages)
+        PAGES_PER_REQUEST.observe(len(pages))
+
+        if not extracted_text.strip():
+            REQUESTS.labels("empty").inc()
+            return {"error": "No text could be extracted from the PDF"}
+
+        result = await run_until_disconnect(
+            request,
+            get_inference_pool(),
+            run_prodoc_on_text,
+            extracted_text,
+            file.filename,
+            cancel_event,
+            timings,
+            previous,
+            cancel_event=cancel_event
+        )
+    except ClientDisconnected:
+        REQUESTS.labels("disconnected").inc()
+        # 499: client closed request (nginx convention)
+        return JSONResponse(status_code=499, content={"error": "Client disconnected"})
+    except ExtractionUnavailable as exc:
+        REQUESTS.labels("failed").inc()
+        return JSONResponse(status_code=503, content={"error": str(exc)})
+
+    elapsed = time.perf_counter() - started
+    REQUEST_SECONDS.observe(elapsed)
+    REQUESTS.labels("ok").inc()
+
+    timings["total"] = elapsed
+    return JSONResponse(
+        content=result,
+        headers={"Server-Timing": server_timing_header(timings)}
+    )
+
+
+@app.post("/upload/bulk")
+async def upload_bulk(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Analyses many PDFs (or zip archives of PDFs) in one request. Up to
+    BULK_CONFIG["CONCURRENCY"] documents are in flight at once, sharing
+    the extraction pool and the inference scheduler's batches. Returns
+    one result per document, in upload order, and a portfolio summary.
+    """
+    try:
+        documents = expand_uploads(await read_uploads(files))
+    except BulkUploadError as exc:
+        REQUESTS.labels("rejected").inc()
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+
+    started = time.perf_counter()
+    cancel_event = threading.Event()
+    semaphore = asyncio.Semaphore(BULK_CONFIG["CONCURRENCY"])
+
+    async def analyse(filename: str, file_bytes: bytes):
+        async with semaphore:
+            try:
+                pages = await extract_pdf_pages(request, file_bytes)
+                PAGES_PER_REQUEST.observe(len(pages))
+                extracted_text = join_pages(pages)
+                if not extracted_text.strip():
+                    return {
+                        "contract_title": filename,
+                        "error": "No text could be extracted from the PDF"
+                    }
+
+                return await run_until_disconnect(
+                    request,
+                    get_inference_pool(),
+                    run_prodoc_on_text,
+                    extracted_text,
+                    filename,
+                    cancel_event,
+                    cancel_event=cancel_event
+                )
+            except ClientDisconnected:
+                raise
+            except Exception as exc:
+                return {"contract_title": filename, "error": str(exc)}
+
+    tasks = [asyncio.create_task(analyse(*document)) for document in documents]
+    try:
+        results = await asyncio.gather(*tasks)
+    except ClientDisconnected:
+        cancel_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        REQUESTS.labels("disconnected").inc()
+        return JSONResponse(status_code=499, content={"error": "Client disconnected"})
+
+    REQUESTS.labels("ok").inc()
+    return {
+        "documents": results,
+        "summary": portfolio_summary(results),
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+@app.post("/upload/stream")
+async def upload_contract_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    previous_analysis_id: str = Form(None),
+    format: str = None
+):
+    """
+    Streaming variant of /upload. Emits "extraction", "clauses", one
+    "clause" per classified clause as its batch finishes, one "highlight"
+    per highlight, then "result" with the same body /upload returns (or
+    "error"). NDJSON by default; Server-Sent Events with
+    Accept: text/event-stream or ?format=sse.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        REQUESTS.labels("rejected").inc()
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Only PDF files are supported"}
+        )
+
+    previous = None
+    if previous_analysis_id:
+        previous = load_analysis(previous_analysis_id)
+        if previous is None:
+            REQUESTS.labels("rejected").inc()
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Unknown previous_analysis_id"}
+            )
+
+    fmt = stream_format(request.headers.get("accept"), format)
     file_bytes = await file.read()
-    extracted_text = extract_text_from_pdf(file_bytes)
+    cancel_event = threading.Event()
+
+    async def produce(channel):
+        started = time.perf_counter()
+        timings = {}
+        loop = asyncio.get_running_loop()
+
+        try:
+            # Disconnects are noticed by the response itself, which stops
+            # the stream and sets cancel_event, so the request is not
+            # polled here.
+            with span("extraction", timings):
+                pages = await extract_pdf_pages(None, file_bytes)
+                extracted_text = join_pages(pages)
+            PAGES_PER_REQUEST.observe(len(pages))
+            channel.emit("extraction", {
+                "pages": len(pages),
+                "characters": len(extracted_text)
+            })
 
-    if not extracted_text.strip():
-        return {"error": "No text could be extracted from the PDF"}
+            if not extracted_text.strip():
+                REQUESTS.labels("empty").inc()
+                channel.emit("error", {"error": "No text could be extracted from the PDF"})
+                return
 
-    result = run_prodoc_on_text(
-        contract_text=extracted_text,
-        contract_title=file.filename
+            result = await loop.run_in_executor(
+                get_inference_pool(),
+                run_prodoc_on_text,
+                extracted_text,
+                file.filename,
+                cancel_event,
+                timings,
+                previous,
+                None,
+                channel.emit
+            )
+        except Exception as exc:
+            if not cancel_event.is_set():
+                REQUESTS.labels("failed").inc()
+                channel.emit("error", {"error": str(exc)})
+            return
+
+        elapsed = time.perf_counter() - started
+        REQUEST_SECONDS.observe(elapsed)
+        REQUESTS.labels("ok").inc()
+        timings["total"] = elapsed
+        result["timings_ms"] = {
+            stage: round(seconds * 1000, 1) for stage, seconds in timings.items()
+        }
+        channel.emit("result", result)
+
+    def on_abort():
+        cancel_event.set()
+        REQUESTS.labels("disconnected").inc()
+
+    return StreamingResponse(
+        stream_events(produce, fmt, on_abort),
+        media_type=MEDIA_TYPES[fmt],
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/jobs")
+async def submit_job(
+    file: UploadFile = File(...),
+    previous_analysis_id: str = Form(None)
+):
+    if not file.filename.lower().endswith(".pdf"):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Only PDF files are supported"}
+        )
+
+    if previous_analysis_id and load_analysis(previous_analysis_id) is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Unknown previous_analysis_id"}
+        )
+
+    file_bytes = await file.read()
+    try:
+        job_id = await get_job_queue().submit(file.filename, file_bytes, previous_analysis_id)
+    except JobQueueFull:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Job queue is full, retry later"},
+            headers={"Retry-After": "30"}
+        )
+
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued"},
+        headers={"Location": f"/jobs/{job_id}"}
     )
 
-    return result
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown job"})
+    return job
@@ -0,0 +1,209 @@
+import io
+import statistics
+import zipfile
+import zlib
+from collections import Counter
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.decision_thresholds import DECISION_THRESHOLDS
+from backend.config import BULK_CONFIG
+
+DECISIONS = ("SAFE_TO_SIGN", "REQUIRES_LEGAL_REVIEW", "HIGH_RISK")
+
+
+class BulkUploadError(ValueError):
+    pass
+
+
+def _is_pdf_member(info: zipfile.ZipInfo) -> bool:
+    path = PurePosixPath(info.filename)
+    return (
+        not info.is_dir()
+        and path.suffix.lower() == ".pdf"
+        # Skip macOS resource forks and hidden files
+        and not any(part.startswith(("__MACOSX", ".")) for part in path.parts)
+    )
+
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> Optional[bytes]:
+    """
+    Decompresses one member, stopping after limit bytes: the declared
+    file_size in the archive cannot be trusted.
+    """
+    with archive.open(info) as member:
+        data = member.read(limit + 1)
+    if len(data) > limit:
+        return None
+    return data
+
+
+_READ_CHUNK = 1024 * 1024
+
+
+async def read_uploads(files) -> List[Tuple[str, bytes]]:
+    """
+    Reads uploaded files (UploadFile-like: filename and an async read)
+    in chunks, so an upload past MAX_DOCUMENT_MB per PDF or MAX_TOTAL_MB
+    in all is rejected before it is held in memory. Zip archives count
+    with their compressed size here; expand_uploads checks their members.
+    """
+    max_bytes = BULK_CONFIG["MAX_DOCUMENT_MB"] * 1024 * 1024
+    max_total = BULK_CONFIG["MAX_TOTAL_MB"] * 1024 * 1024
+    total = 0
+    uploads = []
+
+    for upload in files:
+        is_pdf = PurePosixPath(upload.filename).suffix.lower() == ".pdf"
+        chunks = []
+        size = 0
+        while True:
+            chunk = await upload.read(_READ_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if is_pdf and size > max_bytes:
+                raise BulkUploadError(
+                    f"{upload.filename} exceeds {BULK_CONFIG['MAX_DOCUMENT_MB']} MB"
+                )
+            if total + size > max_total:
+                raise BulkUploadError(
+                    f"Bulk upload exceeds {BULK_CONFIG['MAX_TOTAL_MB']} MB of PDFs"
+                )
+            chunks.append(chunk)
+
+        total += size
+        uploads.append((upload.filename, b"".join(chunks)))
+
+    return uploads
+
+
+def expand_uploads(uploads: Sequence[Tuple[str, bytes]]) -> List[Tuple[str, bytes]]:
+    """
+    Turns uploaded PDFs and zip archives into one (filename, bytes) pair
+    per PDF, in upload order. Zip members keep their path inside the
+    archive as their name. Every PDF is limited to MAX_DOCUMENT_MB and
+    all of them together to MAX_TOTAL_MB, counting decompressed bytes.
+    """
+    max_bytes = BULK_CONFIG["MAX_DOCUMENT_MB"] * 1024 * 1024
+    max_total = BULK_CONFIG["MAX_TOTAL_MB"] * 1024 * 1024
+    total = 0
+    documents = []
+
+    def check_total(size: int):
+        if total + size > max_total:
+            raise BulkUploadError(
+                f"Bulk upload exceeds {BULK_CONFIG['MAX_TOTAL_MB']} MB of PDFs"
+            )
+
+    for filename, data in uploads:
+        suffix = PurePosixPath(filename).suffix.lower()
+
+        if suffix == ".pdf":
+            if len(data) > max_bytes:
+                raise BulkUploadError(
+                    f"{filename} exceeds {BULK_CONFIG['MAX_DOCUMENT_MB']} MB"
+                )
+            check_total(len(data))
+            total += len(data)
+            documents.append((filename, data))
+        elif suffix == ".zip":
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile:
+                raise BulkUploadError(f"{filename} is not a valid zip archive")
+
+            with archive:
+                for info in archive.infolist():
+                    if not _is_pdf_member(info):
+                        continue
+                    # Declared sizes are checked up front, actual sizes
+                    # while decompressing, to keep zip bombs out
+                    if info.file_size > max_bytes:
+                        raise BulkUploadError(
+                            f"{filename}:{info.filename} exceeds "
+                            f"{BULK_CONFIG['MAX_DOCUMENT_MB']} MB"
+                        )
+                    check_total(info.file_size)
+
+                    try:
+                        member = _read_member(
+                            archive, info, min(max_bytes, max_total - total)
+                        )
+                    except (zipfile.BadZipFile, zlib.error, EOFError) as exc:
+                        raise BulkUploadError(f"{filename}:{info.filename} is corrupt: {exc}")
+                    if member is None:
+                        raise BulkUploadError(
+                            f"{filename}:{info.filename} decompresses past "
+                            f"its size limit"
+                        )
+                    total += len(member)
+                    documents.append((info.filename, member))
+        else:
+            raise BulkUploadError(f"{filename}: only PDF and zip files are supported")
+
+        if len(documents) > BULK_CONFIG["MAX_DOCUMENTS"]:
+            raise BulkUploadError(
+                f"At most {BULK_CONFIG['MAX_DOCUMENTS']} documents per bulk upload"
+            )
+
+    if not documents:
+        raise BulkUploadError("No PDF files found in the upload")
+
+    return documents
+
+
+_SAFE, _REVIEW, _HIGH = (
+    DECISION_THRESHOLDS[key] for key in ("SAFE_TO_SIGN", "REQUIRES_REVIEW", "HIGH_RISK")
+)
+# Risk score bands aligned with the decision thresholds
+SCORE_BANDS = (
+    f"0-{_SAFE:g}",
+    f"{_SAFE:g}-{_REVIEW:g}",
+    f"{_REVIEW:g}-{_HIGH:g}",
+    f"{_HIGH:g}+"
+)
+
+
+def _score_band(score: float) -> str:
+    if score <= _SAFE:
+        return SCORE_BANDS[0]
+    if score < _REVIEW:
+        return SCORE_BANDS[1]
+    if score < _HIGH:
+        return SCORE_BANDS[2]
+    return SCORE_BANDS[3]
+
+
+def portfolio_summary(results: List[Dict]) -> Dict:
+    """
+    Decision counts and risk score distribution over the documents of a
+    bulk upload. Documents that failed are only counted.
+    """
+    analysed = [r for r in results if "decision" in r]
+    scores = sorted(r["risk_score"] for r in analysed)
+
+    decisions = Counter(r["decision"] for r in analysed)
+    bands = Counter(_score_band(score) for score in scores)
+
+    summary = {
+        "documents": len(results),
+        "analysed": len(analysed),
+        "failed": len(results) - len(analysed),
+        "decisions": {decision: decisions.get(decision, 0) for decision in DECISIONS},
+        "risk_score": None,
+        "risk_score_bands": {
+            band: bands.get(band, 0) for band in SCORE_BANDS
+        }
+    }
+
+    if scores:
+        summary["risk_score"] = {
+            "min": scores[0],
+            "max": scores[-1],
+            "mean": round(statistics.fmean(scores), 2),
+            "median": round(statistics.median(scores), 2),
+            "p90": scores[min(len(scores) - 1, int(0.9 * len(scores)))]
+        }
+
+    return summary
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# Per-deployment tuning, overridable through environment variables.
+EXECUTOR_CONFIG = {
+    # Worker processes parsing PDFs with pdfplumber
+    "EXTRACTION_WORKERS": _env_int(
+        "PRODOC_EXTRACTION_WORKERS", min(4, os.cpu_count() or 1)
+    ),
+    # Pages handed to one extraction worker at a time
+    "PAGES_PER_TASK": _env_int("PRODOC_PAGES_PER_TASK", 16),
+    # Threads running run_prodoc_on_text (inference itself is batched
+    # by the scheduler thread)
+    "INFERENCE_WORKERS": _env_int("PRODOC_INFERENCE_WORKERS", 4),
+    # torch intra-op threads; 0 keeps the torch default
+    "TORCH_THREADS": _env_int("PRODOC_TORCH_THREADS", 0),
+    # How often a running upload checks whether the client went away
+    "DISCONNECT_POLL_SECONDS": 0.25
+}
+
+# Stored analyses that revised uploads can reference. By default only
+# clause text hashes, labels and keyword features are kept, so unchanged
+# clauses are recognised but no contract text is persisted; STORE_TEXT
+# also keeps the text, which lets edited clauses be paired as "modified".
+ANALYSIS_CONFIG = {
+    "ENABLED": os.environ.get("PRODOC_ANALYSIS_STORE_ENABLED", "1") != "0",
+    "STORE_PATH": os.environ.get(
+        "PRODOC_ANALYSIS_STORE",
+        str(BASE_DIR / "data" / "cache" / "analyses.sqlite3")
+    ),
+    "MAX_ENTRIES": _env_int("PRODOC_ANALYSIS_MAX_ENTRIES", 2000),
+    "TTL_SECONDS": _env_int("PRODOC_ANALYSIS_TTL_SECONDS", 7 * 24 * 3600),
+    "STORE_TEXT": os.environ.get("PRODOC_ANALYSIS_STORE_TEXT", "0") == "1"
+}
+
+# Background analysis jobs (POST /jobs)
+JOB_CONFIG = {
+    "STORE_PATH": os.environ.get(
+        "PRODOC_JOB_STORE",
+        str(BASE_DIR / "data" / "cache" / "jobs.sqlite3")
+    ),
+    # Jobs processed concurrently
+    "WORKERS": _env_int("PRODOC_JOB_WORKERS", 2),
+    # Jobs allowed to wait before POST /jobs is refused
+    "MAX_QUEUED": _env_int("PRODOC_JOB_MAX_QUEUED", 64),
+    # How long finished jobs and their results are kept
+    "RESULT_TTL_SECONDS": _env_int("PRODOC_JOB_TTL_SECONDS", 3600),
+    # Unfinished jobs are leased to the process that holds them and
+    # renewed while it runs; other processes sharing STORE_PATH take over
+    # a job only once its lease has expired
+    "LEASE_SECONDS": _env_int("PRODOC_JOB_LEASE_SECONDS", 120)
+}
+
+# Bulk uploads (POST /upload/bulk)
+BULK_CONFIG = {
+    # Documents of one bulk upload analysed at the same time
+    "CONCURRENCY": _env_int("PRODOC_BULK_CONCURRENCY", 8),
+    "MAX_DOCUMENTS": _env_int("PRODOC_BULK_MAX_DOCUMENTS", 500),
+    # Per-PDF limit, applied to direct uploads and to zip members while
+    # decompressing
+    "MAX_DOCUMENT_MB": _env_int("PRODOC_BULK_MAX_DOCUMENT_MB", 50),
+    # Limit on all PDFs of one bulk upload together, after decompression
+    "MAX_TOTAL_MB": _env_int("PRODOC_BULK_MAX_TOTAL_MB", 500)
+}
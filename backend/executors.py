@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict
+
+from src.extract_pdf_text import count_pages, extract_page_range, page_ranges
+from backend.config import EXECUTOR_CONFIG
+
+_lock = threading.Lock()
+_extraction_pool = None
+_inference_pool = None
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class ExtractionUnavailable(Exception):
+    """
+    The extraction pool broke again on the retry with a fresh pool.
+    """
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+
+    with _lock:
+        if _extraction_pool is None:
+            # spawn keeps torch's thread state out of the PDF workers
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=EXECUTOR_CONFIG["EXTRACTION_WORKERS"],
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _extraction_pool
+
+
+def _discard_extraction_pool(pool: ProcessPoolExecutor):
+    """
+    Shuts down a pool whose worker died, so the next get_extraction_pool()
+    starts a fresh one. Another request may have replaced it already.
+    """
+    global _extraction_pool
+
+    with _lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_inference_pool() -> ThreadPoolExecutor:
+    global _inference_pool
+
+    with _lock:
+        if _inference_pool is None:
+            _inference_pool = ThreadPoolExecutor(
+                max_workers=EXECUTOR_CONFIG["INFERENCE_WORKERS"],
+                thread_name_prefix="prodoc-inference"
+            )
+        return _inference_pool
+
+
+def shutdown_executors():
+    global _extraction_pool, _inference_pool
+
+    with _lock:
+        for pool in (_extraction_pool, _inference_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+        _inference_pool = None
+
+
+async def gather_until_disconnect(request, futures, cancel_event=None):
+    """
+    Awaits all futures, polling the client connection meanwhile.
+    If the client disconnects, pending futures are cancelled (and
+    cancel_event is set for work that is already running) and
+    ClientDisconnected is raised. Without a request (background jobs)
+    the futures are simply awaited.
+    """
+    pending = set(futures)
+
+    while pending:
+        _, pending = await asyncio.wait(
+            pending,
+            timeout=EXECUTOR_CONFIG["DISCONNECT_POLL_SECONDS"]
+        )
+        if pending and request is not None and await request.is_disconnected():
+            if cancel_event is not None:
+                cancel_event.set()
+            for future in pending:
+                future.cancel()
+            raise ClientDisconnected()
+
+    return [future.result() for future in futures]
+
+
+def _count_pages(progress: Dict, future, pages: int):
+    if not future.cancelled() and future.exception() is None:
+        progress["pages_extracted"] += pages
+
+
+async def run_until_disconnect(request, pool, fn, *args, cancel_event=None):
+    """
+    Runs fn(*args) on the given executor until it finishes or the
+    client disconnects.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(pool, fn, *args)
+
+    results = await gather_until_disconnect(
+        request, [future], cancel_event=cancel_event
+    )
+    return results[0]
+
+
+async def extract_pdf_pages(request, file_bytes: bytes, progress: Dict = None):
+    """
+    Extracts page texts in order, fanning page ranges out across the
+    extraction process pool. pages_total and pages_extracted are kept
+    up to date in progress when it is given.
+
+    If a worker dies (out of memory, or a crash on a bad PDF) the broken
+    pool is replaced and the extraction retried once; a second failure
+    raises ExtractionUnavailable.
+    """
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            return await _extract_pages(request, pool, file_bytes, progress)
+        except BrokenProcessPool:
+            _discard_extraction_pool(pool)
+    raise ExtractionUnavailable("PDF extraction failed twice: a worker process died")
+
+
+async def _extract_pages(request, pool, file_bytes: bytes, progress: Dict = None):
+    loop = asyncio.get_running_loop()
+
+    page_count = await run_until_disconnect(request, pool, count_pages, file_bytes)
+    futures = []
+    if progress is not None:
+        progress["pages_total"] = page_count
+        progress["pages_extracted"] = 0
+
+    for start, end in page_ranges(page_count, EXECUTOR_CONFIG["PAGES_PER_TASK"]):
+        future = loop.run_in_executor(pool, extract_page_range, file_bytes, start, end)
+        if progress is not None:
+            future.add_done_callback(
+                lambda f, pages=end - start: _count_pages(progress, f, pages)
+            )
+        futures.append(future)
+
+    chunks = await gather_until_disconnect(request, futures)
+    return [text for chunk in chunks for text in chunk]
@@ -0,0 +1,254 @@
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future, wait
+from functools import partial
+from typing import Callable, Dict, List, Sequence
+
+from src.batch_inference import (
+    classify_texts,
+    classify_token_ids,
+    request_window_caps,
+    tokenize_full
+)
+from src.inference_config import INFERENCE_CONFIG
+from src.model_registry import get_classifier
+from backend.metrics import QUEUE_WAIT_SECONDS, observe_stage
+
+_STOP = object()
+
+
+class InferenceScheduler:
+    """
+    Collects clauses from every in-flight request into shared batches.
+
+    Each submitted clause gets its own Future. A single worker thread takes
+    clauses off the queue until it has max_batch_size of them or the oldest
+    one has waited max_wait_ms, runs one batched classification and resolves
+    the futures in place.
+
+    classify_fn must accept a timings keyword like
+    batch_inference.classify_texts; its tokenization and inference times
+    feed the stage histograms. In windowed mode submit() tokenizes each
+    call's texts once, allocates its MAX_WINDOWS_PER_REQUEST budget across
+    them, and the token IDs travel with their window_caps to
+    classify_ids_fn (batch_inference.classify_token_ids), so the budget
+    holds however the texts are split across batches.
+    """
+
+    def __init__(
+        self,
+        classify_fn: Callable[..., List[Dict]] = classify_texts,
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        classify_ids_fn: Callable[..., List[Dict]] = classify_token_ids
+    ):
+        self.classify_fn = classify_fn
+        self.classify_ids_fn = classify_ids_fn
+        self.max_batch_size = (
+            max_batch_size or INFERENCE_CONFIG["SCHEDULER_MAX_BATCH_SIZE"]
+        )
+        self.max_wait_ms = (
+            max_wait_ms if max_wait_ms is not None
+            else INFERENCE_CONFIG["SCHEDULER_MAX_WAIT_MS"]
+        )
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._batches = 0
+        self._clauses = 0
+        self._queue_wait_total = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="prodoc-inference-scheduler",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Stops the worker after the batch it is running. Clauses still
+        queued behind the stop are cancelled instead of being left
+        unresolved.
+        """
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                item[2].cancel()
+
+    def submit(self, texts: Sequence[str]) -> List[Future]:
+        self.start()
+
+        if INFERENCE_CONFIG["WINDOWED"]:
+            tokenizer = get_classifier()[0]
+            started = time.perf_counter()
+            token_ids = tokenize_full(texts, tokenizer)
+            observe_stage("tokenization", time.perf_counter() - started)
+            caps = request_window_caps(token_ids, tokenizer)
+        else:
+            token_ids = caps = [None] * len(texts)
+
+        # Queue items: (text, token IDs, future, enqueued_at, window cap)
+        futures = []
+        enqueued_at = time.monotonic()
+        for text, ids, cap in zip(texts, token_ids, caps):
+            future = Future()
+            self._queue.put((text, ids, future, enqueued_at, cap))
+            futures.append(future)
+        return futures
+
+    def classify_texts(
+        self,
+        texts: Sequence[str],
+        cancel_event: threading.Event = None,
+        on_done: Callable[[str, Future], None] = None
+    ) -> List[Dict]:
+        """
+        Drop-in replacement for batch_inference.classify_texts that shares
+        forward passes with concurrent callers. Setting cancel_event
+        withdraws the clauses that have not been classified yet. on_done
+        is called with each text and its future, on the scheduler thread,
+        as soon as that text's batch finishes.
+        """
+        futures = self.submit(texts)
+        if on_done is not None:
+            for text, future in zip(texts, futures):
+                future.add_done_callback(partial(on_done, text))
+
+        if cancel_event is not None:
+            pending = futures
+            while pending:
+                _, pending = wait(pending, timeout=0.1)
+                if pending and cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise CancelledError()
+
+        return [f.result() for f in futures]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            batches = self._batches
+            clauses = self._clauses
+            wait_total = self._queue_wait_total
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "clauses": clauses,
+            "mean_batch_size": round(clauses / batches, 2) if batches else 0.0,
+            "mean_batch_fill": (
+                round(clauses / (batches * self.max_batch_size), 3)
+                if batches else 0.0
+            ),
+            "mean_queue_wait_ms": (
+                round(1000 * wait_total / clauses, 2) if clauses else 0.0
+            ),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+
+            # Futures cancelled by a disconnected client are dropped here.
+            batch = [
+                item for item in batch
+                if item[2].set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            started_at = time.monotonic()
+            waits = [started_at - item[3] for item in batch]
+            for wait_seconds in waits:
+                QUEUE_WAIT_SECONDS.observe(wait_seconds)
+
+            timings = {}
+            try:
+                caps = [item[4] for item in batch]
+                if None in caps:
+                    predictions = self.classify_fn(
+                        [item[0] for item in batch], timings=timings
+                    )
+                else:
+                    predictions = self.classify_ids_fn(
+                        [item[1] for item in batch],
+                        timings=timings,
+                        windowed=True,
+                        window_caps=caps
+                    )
+            except Exception as exc:
+                for item in batch:
+                    item[2].set_exception(exc)
+            else:
+                for item, prediction in zip(batch, predictions):
+                    item[2].set_result(prediction)
+
+            for stage, seconds in timings.items():
+                observe_stage(stage, seconds)
+
+            with self._lock:
+                self._batches += 1
+                self._clauses += len(batch)
+                self._queue_wait_total += sum(waits)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> InferenceScheduler:
+    """
+    Returns the process-wide scheduler, starting it on first use.
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = InferenceScheduler()
+                _scheduler.start()
+
+    return _scheduler
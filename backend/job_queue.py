@@ -0,0 +1,438 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.extract_pdf_text import join_pages
+from backend.analysis_store import load_analysis
+from backend.config import JOB_CONFIG
+from backend.executors import extract_pdf_pages, get_inference_pool
+from backend.metrics import JOBS, PAGES_PER_REQUEST
+from backend.prodoc_service import run_prodoc_on_text
+
+# Statuses a job moves through; the last two are final
+QUEUED = "queued"
+EXTRACTING = "extracting"
+ANALYSING = "analysing"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """
+    Keeps jobs in SQLite so queued and interrupted work survives a
+    restart. The uploaded PDF is stored with the job and dropped once
+    the job finishes.
+
+    Unfinished jobs carry an owner (one per JobStore) and a lease. The
+    owner renews its leases while it is alive; other processes sharing
+    the file only take over jobs whose lease has expired.
+    """
+
+    def __init__(self, path: str = None, owner: str = None, lease_seconds: float = None):
+        self._lock = threading.Lock()
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds or JOB_CONFIG["LEASE_SECONDS"]
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                previous_analysis_id TEXT,
+                payload BLOB,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                owner TEXT,
+                lease_until REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Stores created before leases: their unfinished jobs count as expired
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._db.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._db.commit()
+
+    def create(self, filename: str, payload: bytes, previous_analysis_id: str = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO jobs
+                VALUES (?, ?, ?, ?, ?, ?, ?, '{}', NULL, NULL, ?, ?)
+                """,
+                (
+                    job_id, now, now, QUEUED, filename, previous_analysis_id, payload,
+                    self.owner, now + self.lease_seconds
+                )
+            )
+            self._db.commit()
+        return job_id
+
+    def claim(self, job_id: str) -> Optional[Tuple[bytes, str, Optional[str]]]:
+        """
+        Marks a queued job of this owner as started and returns (payload,
+        filename, previous_analysis_id), or None when the job has been
+        taken over by another process in the meantime.
+        """
+        now = time.time()
+        with self._lock:
+            claimed = self._db.execute(
+                """
+                UPDATE jobs SET status = ?, updated = ?, lease_until = ?
+                WHERE id = ? AND status = ? AND owner = ?
+                """,
+                (EXTRACTING, now, now + self.lease_seconds, job_id, QUEUED, self.owner)
+            ).rowcount
+            self._db.commit()
+            if not claimed:
+                return None
+            return self._db.execute(
+                "SELECT payload, filename, previous_analysis_id FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+
+    def update(self, job_id: str, status: str, progress: Dict):
+        with self._lock:
+            self._db.execute(
+                """
+                UPDATE jobs SET status = ?, progress = ?, updated = ?
+                WHERE id = ? AND owner = ?
+                """,
+                (status, json.dumps(progress), time.time(), job_id, self.owner)
+            )
+            self._db.commit()
+
+    def finish(self, job_id: str, progress: Dict, result: Dict = None, error: str = None):
+        with self._lock:
+            self._db.execute(
+                """
+                UPDATE jobs
+                SET status = ?, progress = ?, result = ?, error = ?,
+                    payload = NULL, updated = ?
+                WHERE id = ? AND owner = ?
+                """,
+                (
+                    FAILED if error else DONE,
+                    json.dumps(progress),
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    self.owner
+                )
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                """
+                SELECT status, filename, created, updated, progress, result, error
+                FROM jobs WHERE id = ?
+                """,
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, filename, created, updated, progress, result, error = row
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "filename": filename,
+            "created": created,
+            "updated": updated,
+            "progress": json.loads(progress)
+        }
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def renew_leases(self) -> int:
+        """
+        Extends the lease of every unfinished job this owner holds.
+        """
+        with self._lock:
+            renewed = self._db.execute(
+                """
+                UPDATE jobs SET lease_until = ?
+                WHERE owner = ? AND status NOT IN (?, ?)
+                """,
+                (time.time() + self.lease_seconds, self.owner, DONE, FAILED)
+            ).rowcount
+            self._db.commit()
+        return renewed
+
+    def release_leases(self):
+        """
+        Expires this owner's leases so the next process can take over its
+        unfinished jobs right away.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET lease_until = 0 WHERE owner = ? AND status NOT IN (?, ?)",
+                (self.owner, DONE, FAILED)
+            )
+            self._db.commit()
+
+    def requeue_expired(self, limit: int = None) -> List[str]:
+        """
+        Takes over unfinished jobs whose lease has expired (their process
+        stopped or died), puts them back to queued under this owner and
+        returns their ids, oldest first. Jobs of live processes are left
+        alone.
+        """
+        now = time.time()
+        with self._lock:
+            # One write transaction, so two processes never take the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    """
+                    SELECT id FROM jobs
+                    WHERE status NOT IN (?, ?) AND lease_until < ?
+                    ORDER BY created LIMIT ?
+                    """,
+                    (DONE, FAILED, now, -1 if limit is None else limit)
+                ).fetchall()
+                self._db.executemany(
+                    """
+                    UPDATE jobs SET status = ?, progress = '{}', owner = ?, lease_until = ?
+                    WHERE id = ?
+                    """,
+                    [(QUEUED, self.owner, now + self.lease_seconds, row[0]) for row in rows]
+                )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return [row[0] for row in rows]
+
+    def prune(self, finished_before: float) -> int:
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?",
+                (DONE, FAILED, finished_before)
+            ).rowcount
+            self._db.commit()
+        return deleted
+
+
+class JobQueue:
+    """
+    Runs uploaded contracts in the background.
+
+    Job ids go through an asyncio queue drained by a fixed number of
+    worker tasks; submit() refuses new work once max_queued jobs are
+    waiting. Finished jobs are kept for ttl_seconds. Live progress of
+    running jobs is held in memory and written to the store at each
+    status change. Store calls run on the default executor, off the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = None,
+        max_queued: int = None,
+        ttl_seconds: float = None
+    ):
+        self.store = store
+        self.workers = workers or JOB_CONFIG["WORKERS"]
+        self.max_queued = max_queued or JOB_CONFIG["MAX_QUEUED"]
+        self.ttl_seconds = ttl_seconds or JOB_CONFIG["RESULT_TTL_SECONDS"]
+
+        self._queue = None
+        self._tasks = []
+        self._live = {}
+        # Jobs admitted but not yet picked up by a worker, counting slots
+        # reserved while their store call is in flight
+        self._waiting = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"prodoc-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._janitor()))
+
+        # Recovered jobs may exceed the bound; new submissions are refused
+        # until they drain
+        recovered = await self._store(self.store.requeue_expired)
+        if recovered:
+            print(f"Requeued {len(recovered)} unfinished job(s)", file=sys.stderr)
+            for job_id in recovered:
+                self._waiting += 1
+                self._queue.put_nowait(job_id)
+
+    async def stop(self):
+        # Running jobs stay unfinished in the store; releasing their leases
+        # lets the next start() (or another process) pick them up at once
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._store(self.store.release_leases)
+
+    async def submit(self, filename: str, payload: bytes, previous_analysis_id: str = None) -> str:
+        if self._queue is None or self._waiting >= self.max_queued:
+            JOBS.labels("rejected").inc()
+            raise JobQueueFull()
+
+        self._waiting += 1
+        try:
+            job_id = await self._store(
+                self.store.create, filename, payload, previous_analysis_id
+            )
+        except BaseException:
+            self._waiting -= 1
+            raise
+        self._queue.put_nowait(job_id)
+        JOBS.labels(QUEUED).inc()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self.store.get(job_id)
+        if job is not None and job_id in self._live:
+            job["progress"] = dict(self._live[job_id])
+        return job
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._waiting,
+            "running": len(self._live),
+            "workers": self.workers,
+            "max_queued": self.max_queued
+        }
+
+    async def _store(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._waiting -= 1
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        loop = asyncio.get_running_loop()
+        progress = self._live[job_id] = {}
+
+        try:
+            claimed = await self._store(self.store.claim, job_id)
+            if claimed is None:
+                print(f"Job {job_id} was taken over by another worker", file=sys.stderr)
+                return
+            payload, filename, previous_analysis_id = claimed
+
+            pages = await extract_pdf_pages(None, payload, progress)
+            PAGES_PER_REQUEST.observe(len(pages))
+            extracted_text = join_pages(pages)
+            if not extracted_text.strip():
+                raise ValueError("No text could be extracted from the PDF")
+
+            previous = None
+            if previous_analysis_id:
+                previous = load_analysis(previous_analysis_id)
+
+            await self._store(self.store.update, job_id, ANALYSING, progress)
+            result = await loop.run_in_executor(
+                get_inference_pool(),
+                run_prodoc_on_text,
+                extracted_text,
+                filename,
+                None,
+                None,
+                previous,
+                progress
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"Job {job_id} failed: {exc}", file=sys.stderr)
+            await self._store(partial(self.store.finish, job_id, progress, error=str(exc)))
+            JOBS.labels(FAILED).inc()
+        else:
+            await self._store(partial(self.store.finish, job_id, progress, result=result))
+            JOBS.labels(DONE).inc()
+        finally:
+            self._live.pop(job_id, None)
+
+    async def _janitor(self):
+        """
+        Renews this process's leases, prunes expired results and takes
+        over jobs whose owner stopped renewing. A failing round is logged
+        and retried on the next tick.
+        """
+        interval = min(self.ttl_seconds, 60, self.store.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._store(self.store.renew_leases)
+                await self._store(self.store.prune, time.time() - self.ttl_seconds)
+
+                room = self.max_queued - self._waiting
+                if room > 0:
+                    self._waiting += room
+                    taken = []
+                    try:
+                        taken = await self._store(self.store.requeue_expired, room)
+                    finally:
+                        self._waiting -= room - len(taken)
+                    for job_id in taken:
+                        print(f"Took over job {job_id} from an expired lease", file=sys.stderr)
+                        self._queue.put_nowait(job_id)
+            except Exception as exc:
+                print(f"Job janitor failed: {exc!r}", file=sys.stderr)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the process-wide job queue backed by JOB_CONFIG["STORE_PATH"].
+    The app starts and stops it from its lifespan.
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(JobStore(JOB_CONFIG["STORE_PATH"]))
+
+    return _job_queue
@@ -0,0 +1,182 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+REGISTRY = CollectorRegistry()
+
+STAGES = (
+    "extraction",
+    "segmentation",
+    "alignment",
+    "classification",
+    "tokenization",
+    "inference",
+    "risk_detection",
+    "decision"
+)
+
+_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+STAGE_SECONDS = Histogram(
+    "prodoc_stage_seconds",
+    "Wall time spent in each pipeline stage",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+REQUEST_SECONDS = Histogram(
+    "prodoc_request_seconds",
+    "End-to-end /upload latency",
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "prodoc_queue_wait_seconds",
+    "Time a clause waits in the inference scheduler before its batch runs",
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+PAGES_PER_REQUEST = Histogram(
+    "prodoc_pages_per_request",
+    "PDF pages per upload",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    registry=REGISTRY
+)
+CLAUSES_PER_REQUEST = Histogram(
+    "prodoc_clauses_per_request",
+    "Clauses per analysed contract",
+    buckets=(1, 5, 10, 20, 40, 80, 160, 320, 640),
+    registry=REGISTRY
+)
+TOKENS_PER_REQUEST = Histogram(
+    "prodoc_tokens_per_request",
+    "Model input tokens per analysed contract",
+    buckets=(500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000),
+    registry=REGISTRY
+)
+REQUESTS = Counter(
+    "prodoc_requests",
+    "Uploads by outcome",
+    ["outcome"],
+    registry=REGISTRY
+)
+JOBS = Counter(
+    "prodoc_jobs",
+    "Background jobs by outcome",
+    ["outcome"],
+    registry=REGISTRY
+)
+
+# Label lookups are bound once so observing on the hot path is a plain call
+_STAGE_CHILDREN = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+
+
+def observe_stage(stage: str, seconds: float, timings: Dict = None):
+    _STAGE_CHILDREN[stage].observe(seconds)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage: str, timings: Dict = None):
+    """
+    Times a block into the stage histogram and, if given, the per-request
+    timings dict.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, timings)
+
+
+def server_timing_header(timings: Dict) -> str:
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.1f}"
+        for stage, seconds in timings.items()
+    )
+
+
+class _RuntimeCollector:
+    """
+    Reads scheduler and cache counters at scrape time, so they cost
+    nothing on the request path.
+    """
+
+    def collect(self):
+        from src.classification_cache import get_cache
+        from src.lexical_classifier import get_cascade
+        from backend.inference_scheduler import get_scheduler
+        from backend.job_queue import get_job_queue
+
+        scheduler = get_scheduler().stats()
+        yield GaugeMetricFamily(
+            "prodoc_scheduler_queue_depth",
+            "Clauses waiting for an inference batch",
+            value=scheduler["queue_depth"]
+        )
+        yield CounterMetricFamily(
+            "prodoc_scheduler_batches",
+            "Inference batches run",
+            value=scheduler["batches"]
+        )
+        yield CounterMetricFamily(
+            "prodoc_scheduler_clauses",
+            "Clauses classified by the scheduler",
+            value=scheduler["clauses"]
+        )
+        yield GaugeMetricFamily(
+            "prodoc_scheduler_batch_fill_ratio",
+            "Mean batch size over the configured maximum",
+            value=scheduler["mean_batch_fill"]
+        )
+
+        jobs = get_job_queue().stats()
+        yield GaugeMetricFamily(
+            "prodoc_job_queue_depth",
+            "Background jobs waiting for a worker",
+            value=jobs["queued"]
+        )
+        yield GaugeMetricFamily(
+            "prodoc_jobs_running",
+            "Background jobs being processed",
+            value=jobs["running"]
+        )
+
+        cache = get_cache().stats()
+        hits = CounterMetricFamily(
+            "prodoc_cache_hits",
+            "Clause classification cache hits",
+            labels=["tier"]
+        )
+        hits.add_metric(["memory"], cache["memory_hits"])
+        hits.add_metric(["disk"], cache["disk_hits"])
+        yield hits
+        yield CounterMetricFamily(
+            "prodoc_cache_misses",
+            "Clause classification cache misses",
+            value=cache["misses"]
+        )
+
+        cascade = get_cascade()
+        if cascade is not None:
+            stats = cascade.stats()
+            yield CounterMetricFamily(
+                "prodoc_cascade_clauses",
+                "Clauses seen by the lexical cascade tier",
+                value=stats["clauses"]
+            )
+            yield CounterMetricFamily(
+                "prodoc_cascade_escalated",
+                "Clauses escalated from the lexical tier to the transformer",
+                value=stats["escalated"]
+            )
+
+
+REGISTRY.register(_RuntimeCollector())
@@ -1,9 +1,12 @@
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import CancelledError
+from functools import partial
+from typing import Callable, Dict, List
 
 # Core pipeline imports
 from src.prodoc_pipeline import (
-    split_clauses,
-    normalize_clauses,
+    normalize_clause_spans,
     classify_clauses,
     detect_risks,
     aggregate_risk,
@@ -11,8 +14,25 @@ from src.prodoc_pipeline import (
     generate_summary
 )
 
-from src.critical_clauses import CRITICAL_CLAUSE_TYPES
-from src.risk_thresholds import CONFIDENCE_THRESHOLDS
+from src.inference_config import INFERENCE_CONFIG
+from src.classification_cache import cached_classifier, get_cache
+from src.lexical_classifier import get_cascade
+from src.clause_alignment import align_clauses, clause_fingerprint
+from src.clause_batch import ClauseBatch
+from src.clause_segmenter import iter_clause_spans
+from src.model_registry import model_identity
+from src.risk_rules import is_strong
+from src.decision_thresholds import COMPLEX_CONTRACT_WORDS, DECISION_THRESHOLDS
+
+from backend.analysis_store import get_analysis_store
+from backend.config import ANALYSIS_CONFIG
+from backend.inference_scheduler import get_scheduler
+from backend.metrics import (
+    CLAUSES_PER_REQUEST,
+    TOKENS_PER_REQUEST,
+    observe_stage,
+    span
+)
 
 
 # -------------------------------------------------
@@ -23,27 +43,7 @@ def is_structurally_strong_clause(clause_text: str) -> bool:
     Determines whether a clause appears legally complete and balanced.
     Used to avoid penalizing well-written clauses with low ML confidence.
     """
-    words = clause_text.split()
-
-    # Long clauses are usually real
-    if len(words) >= 60:
-        return True
-
-    strong_keywords = [
-        "each party",
-        "either party",
-        "shall",
-        "may",
-        "governed by",
-        "indemnify",
-        "termination",
-        "terminate",
-        "liability",
-        "confidential"
-    ]
-
-    hits = sum(1 for k in strong_keywords if k in clause_text.lower())
-    return hits >= 2
+    return is_strong({"text": clause_text}, "STRONG_CLAUSE")
 
 
 # -------------------------------------------------
@@ -54,52 +54,291 @@ def is_complex_contract(contract_text: str) -> bool:
     Determines if a contract is large/complex (e.g., government or enterprise).
     """
     word_count = len(contract_text.split())
-    return word_count > 1200
+    return word_count > COMPLEX_CONTRACT_WORDS
+
+
+def _check_cancelled(cancel_event: threading.Event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise CancelledError()
+
+
+# -------------------------------------------------
+# Helper: Reuse of a previous analysis
+# -------------------------------------------------
+def reuse_previous_analysis(clauses: List[Dict], previous: Dict, identity: str) -> Dict:
+    """
+    Aligns the new clauses with a stored analysis and copies labels onto
+    unchanged clauses (and keyword hits when the text is byte-identical).
+    Only clauses left without a label need classifying. Returns the
+    change report.
+
+    Analyses stored without text (the default) are aligned by clause
+    fingerprint: unchanged clauses are found, but edited ones are
+    reported as added rather than modified.
+    """
+    old_clauses = previous["clauses"]
+    if all("text" in c for c in old_clauses):
+        matches, removed = align_clauses(
+            [c["text"] for c in old_clauses],
+            [c["text"] for c in clauses]
+        )
+    else:
+        # Distinct fingerprints never reach the similarity floor
+        matches, removed = align_clauses(
+            [c["key"] for c in old_clauses],
+            [clause_fingerprint(c["text"]) for c in clauses]
+        )
+    same_model = previous["model_identity"] == identity
+
+    changes = {
+        "previous_analysis_id": previous["analysis_id"],
+        "unchanged": 0,
+        "reused": 0,
+        "modified": [],
+        "added": [],
+        "removed": [
+            {
+                "previous_clause_id": old_clauses[i]["clause_id"],
+                "previous_label": old_clauses[i]["label"]
+            }
+            for i in removed
+        ]
+    }
+
+    for clause, match in zip(clauses, matches):
+        if match["status"] == "added":
+            changes["added"].append({"clause_id": clause["clause_id"]})
+            continue
+
+        old = old_clauses[match["previous"]]
+        if match["status"] == "modified":
+            changes["modified"].append({
+                "clause_id": clause["clause_id"],
+                "previous_clause_id": old["clause_id"],
+                "similarity": match["similarity"],
+                "previous_label": old["label"]
+            })
+            continue
+
+        changes["unchanged"] += 1
+        if same_model:
+            clause["label"] = old["label"]
+            clause["confidence"] = old["confidence"]
+            if "text" in old:
+                identical = old["text"] == clause["text"]
+            else:
+                identical = old["text_hash"] == clause_fingerprint(clause["text"], exact=True)
+            if identical and old.get("features"):
+                clause["features"] = old["features"]
+            changes["reused"] += 1
+
+    return changes
+
+
+def stored_clause(clause: Dict) -> Dict:
+    """
+    What the analysis store keeps of a clause: fingerprints instead of
+    the text unless ANALYSIS_CONFIG["STORE_TEXT"] is set.
+    """
+    stored = {
+        "clause_id": clause["clause_id"],
+        "key": clause_fingerprint(clause["text"]),
+        "text_hash": clause_fingerprint(clause["text"], exact=True),
+        "label": clause["label"],
+        "confidence": clause["confidence"],
+        "features": clause.get("features")
+    }
+    if ANALYSIS_CONFIG["STORE_TEXT"]:
+        stored["text"] = clause["text"]
+    return stored
+
+
+# -------------------------------------------------
+# Helper: Per-clause progress
+# -------------------------------------------------
+class ClauseReporter:
+    """
+    Reports each clause once, as soon as its label is known: counts it
+    into progress and/or emits a "clause" event. Clauses classified by
+    the model are reported from the scheduler thread as their batch
+    finishes; the rest (reused, cached, lexical) are reported on finish().
+    """
+
+    def __init__(
+        self,
+        clauses: List[Dict],
+        progress: Dict = None,
+        emit: Callable[[str, Dict], None] = None
+    ):
+        self.clauses = clauses
+        self.progress = progress
+        self.emit = emit
+
+        self._lock = threading.Lock()
+        self._reported = set()
+        self._pending = {}
+        for i, clause in enumerate(clauses):
+            if "label" not in clause:
+                self._pending.setdefault(clause["text"], []).append(i)
+
+        if progress is not None:
+            progress["clauses_total"] = len(clauses)
+            progress["clauses_classified"] = 0
+
+        for i, clause in enumerate(clauses):
+            if "label" in clause:
+                self.report(i, clause)
+
+    def report(self, index: int, prediction: Dict):
+        with self._lock:
+            if index in self._reported:
+                return
+            self._reported.add(index)
+            if self.progress is not None:
+                self.progress["clauses_classified"] += 1
+
+        if self.emit is not None:
+            self.emit("clause", {
+                "clause_id": self.clauses[index]["clause_id"],
+                "label": prediction["label"],
+                "confidence": round(prediction["confidence"], 3)
+            })
+
+    def on_done(self, text: str, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        prediction = future.result()
+        for index in self._pending.get(text, ()):
+            self.report(index, prediction)
+
+    def finish(self):
+        for i, clause in enumerate(self.clauses):
+            self.report(i, clause)
 
 
 # -------------------------------------------------
 # Main PRODOC Service
 # -------------------------------------------------
-def run_prodoc_on_text(contract_text: str, contract_title: str) -> Dict:
+def run_prodoc_on_text(
+    contract_text: str,
+    contract_title: str,
+    cancel_event: threading.Event = None,
+    timings: Dict = None,
+    previous: Dict = None,
+    progress: Dict = None,
+    emit: Callable[[str, Dict], None] = None
+) -> Dict:
     """
     Runs the full PRODOC pipeline and returns frontend-ready JSON.
+    Raises CancelledError between stages once cancel_event is set.
+    Per-stage wall times are added to timings when it is given.
+
+    With a previous analysis from the analysis store, unchanged clauses
+    keep their earlier classification and only changed or new clauses
+    are classified; the response then includes a "changes" report.
+
+    clauses_total and clauses_classified are kept up to date in progress
+    when it is given (background jobs report them while running).
+    emit(event, data) is called with "clauses", then one "clause" per
+    classified clause and one "highlight" per highlight, as they become
+    available (streaming uploads); it may be called from the scheduler
+    thread.
     """
 
-    # 1. Split and normalize clauses
-    raw_clauses = split_clauses(contract_text)
-    clauses = normalize_clauses(raw_clauses)
+    # 1. Split and normalize clauses (start/end are offsets into
+    #    contract_text, returned with clauses and highlights)
+    with span("segmentation", timings):
+        clauses = normalize_clause_spans(contract_text, iter_clause_spans(contract_text))
+    _check_cancelled(cancel_event)
+
+    if emit is not None:
+        emit("clauses", {
+            "count": len(clauses),
+            "clauses": [
+                {
+                    "clause_id": c["clause_id"],
+                    "start": c["start"],
+                    "end": c["end"],
+                    "heading": c["heading"],
+                    "text": c["text"]
+                }
+                for c in clauses
+            ]
+        })
+
+    identity = model_identity()
+    changes = None
+    if previous is not None:
+        with span("alignment", timings):
+            changes = reuse_previous_analysis(clauses, previous, identity)
+
+    pending = [c for c in clauses if "label" not in c]
+    reporter = None
+    if progress is not None or emit is not None:
+        reporter = ClauseReporter(clauses, progress, emit)
 
-    # 2. Classify clauses
-    clauses = classify_clauses(clauses)
+    # 2. Classify clauses (cache first, then the lexical tier; escalated
+    #    clauses are batched together with concurrent requests)
+    classify_fn = partial(
+        get_scheduler().classify_texts,
+        cancel_event=cancel_event,
+        on_done=reporter.on_done if reporter is not None else None
+    )
+    cascade = get_cascade()
+    if cascade is not None:
+        classify_fn = cascade.wrap(classify_fn)
+    if INFERENCE_CONFIG["CACHE_ENABLED"]:
+        classify_fn = cached_classifier(classify_fn, get_cache())
 
-    # 3. Detect risks (raw)
-    detected_risks = detect_risks(clauses)
+    token_count = 0
 
-    # 4. Aggregate risks
-    risk_score, breakdown = aggregate_risk(detected_risks)
+    def classify_and_count(texts):
+        nonlocal token_count
+        predictions = classify_fn(texts)
+        token_count += sum(p.get("num_tokens", 0) for p in predictions)
+        return predictions
+
+    with span("classification", timings):
+        if pending:
+            classify_clauses(pending, classify_fn=classify_and_count)
+    _check_cancelled(cancel_event)
+
+    # Cache and lexical-tier hits never reach the scheduler
+    if reporter is not None:
+        reporter.finish()
+
+    CLAUSES_PER_REQUEST.observe(len(clauses))
+    TOKENS_PER_REQUEST.observe(token_count)
+
+    with span("risk_detection", timings):
+        # 3. Detect risks (raw) over the columnar view of the clauses
+        batch = ClauseBatch.from_clauses(clauses, contract_text)
+        detected_risks = detect_risks(batch)
+
+        # 4. Aggregate risks
+        risk_score, breakdown = aggregate_risk(detected_risks)
+
+    decision_started = time.perf_counter()
 
     # -------------------------------------------------
     # 5. Build highlight evidence (USER-VISIBLE RISKS)
     # -------------------------------------------------
     highlights: List[Dict] = []
 
-    for clause in clauses:
-        if clause["label"] not in CRITICAL_CLAUSE_TYPES:
-            continue
-
-        # Skip strong clauses
-        if is_structurally_strong_clause(clause["text"]):
-            continue
-
-        # Highlight only genuinely weak / uncertain clauses
-        if clause["confidence"] < CONFIDENCE_THRESHOLDS["LOW"]:
-            highlights.append({
-                "clause_id": clause["clause_id"],
-                "risk_type": "LOW_CONFIDENCE_CRITICAL_CLAUSE",
-                "label": clause["label"],
-                "confidence": round(clause["confidence"], 3),
-                "text": clause["text"][:600]
-            })
+    # Highlight only genuinely weak / uncertain critical clauses,
+    # skipping strong ones
+    for clause in batch.records(batch.low_confidence_critical("STRONG_CLAUSE")):
+        highlights.append({
+            "clause_id": clause["clause_id"],
+            "risk_type": "LOW_CONFIDENCE_CRITICAL_CLAUSE",
+            "label": clause["label"],
+            "confidence": round(clause["confidence"], 3),
+            "start": clause["start"],
+            "end": clause["end"],
+            "text": clause["text"][:600]
+        })
+        if emit is not None:
+            emit("highlight", highlights[-1])
 
     # -------------------------------------------------
     # 6. FINAL DECISION LOGIC (CRITICAL)
@@ -113,7 +352,7 @@ def run_prodoc_on_text(contract_text: str, contract_title: str) -> Dict:
                 "However, due to the length and complexity of the contract, "
                 "a legal review is recommended."
             )
-        elif risk_score <= 5:
+        elif risk_score <= DECISION_THRESHOLDS["SAFE_TO_SIGN"]:
             decision = "SAFE_TO_SIGN"
             summary = (
                 "No significant legal risks detected. "
@@ -130,13 +369,35 @@ def run_prodoc_on_text(contract_text: str, contract_title: str) -> Dict:
         decision = classify_decision(risk_score)
         summary = generate_summary(decision, breakdown)
 
+    observe_stage("decision", time.perf_counter() - decision_started, timings)
+
+    analysis_id = None
+    store = get_analysis_store()
+    if store is not None:
+        analysis_id = store.save({
+            "model_identity": identity,
+            "decision": decision,
+            "clauses": [stored_clause(c) for c in clauses]
+        })
+
     # -------------------------------------------------
     # 7. Final API Response
     # -------------------------------------------------
-    return {
+    response = {
+        "analysis_id": analysis_id,
         "contract_title": contract_title,
         "decision": decision,
         "risk_score": round(risk_score, 2),
         "highlights": highlights,
         "justification_report": summary
     }
+
+    if changes is not None:
+        labels = {c["clause_id"]: c["label"] for c in clauses}
+        for entry in changes["modified"] + changes["added"]:
+            entry["label"] = labels[entry["clause_id"]]
+        changes["previous_decision"] = previous["decision"]
+        changes["decision_changed"] = previous["decision"] != decision
+        response["changes"] = changes
+
+    return response
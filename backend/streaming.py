@@ -0,0 +1,83 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable, Dict, Tuple
+
+NDJSON = "ndjson"
+SSE = "sse"
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    SSE: "text/event-stream"
+}
+
+_END = object()
+
+
+def stream_format(accept: str, requested: str = None) -> str:
+    """
+    Picks the wire format: an explicit ?format= wins, otherwise SSE when
+    the client accepts text/event-stream, otherwise NDJSON.
+    """
+    if requested in MEDIA_TYPES:
+        return requested
+    return SSE if MEDIA_TYPES[SSE] in (accept or "") else NDJSON
+
+
+def encode_event(event: str, data: Dict, fmt: str) -> str:
+    if fmt == SSE:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+class EventChannel:
+    """
+    Carries (event, data) pairs from pipeline threads to the response
+    generator on the event loop. emit() is safe to call from any thread
+    and keeps call order.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def emit(self, event: str, data: Dict):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (event, data))
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, _END)
+
+    async def events(self) -> AsyncIterator[Tuple[str, Dict]]:
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            yield item
+
+
+async def stream_events(
+    produce: Callable[[EventChannel], "asyncio.Future"],
+    fmt: str,
+    on_abort: Callable[[], None] = None
+) -> AsyncIterator[str]:
+    """
+    Runs produce(channel) in a task and yields its events encoded as they
+    arrive. If the client goes away before produce finishes, on_abort is
+    called and the task is cancelled.
+    """
+    channel = EventChannel(asyncio.get_running_loop())
+
+    async def run():
+        try:
+            await produce(channel)
+        finally:
+            channel.close()
+
+    task = asyncio.create_task(run())
+    try:
+        async for event, data in channel.events():
+            yield encode_event(event, data, fmt)
+    finally:
+        if not task.done():
+            if on_abort is not None:
+                on_abort()
+            task.cancel()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.risk_weights import RISK_WEIGHTS
 from src.decision_thresholds import DECISION_THRESHOLDS
 def aggregate_risk(detected_risks):
@@ -36,3 +38,57 @@ def classify_decision(total_score):
         return "REQUIRES_LEGAL_REVIEW"
     else:
         return "SAFE_TO_SIGN"
+
+
+# -------------------------------------------------
+# Batch scoring (portfolios of stored analyses)
+# -------------------------------------------------
+RISK_IDS = list(RISK_WEIGHTS)
+DECISIONS = np.array(["SAFE_TO_SIGN", "REQUIRES_LEGAL_REVIEW", "HIGH_RISK"])
+_DECISION_EDGES = np.array([
+    DECISION_THRESHOLDS["REQUIRES_REVIEW"],
+    DECISION_THRESHOLDS["HIGH_RISK"]
+])
+
+
+def risk_count_matrix(detected_risks_per_contract, risk_ids=RISK_IDS):
+    """
+    Turns one detect_risks() list per contract into a contracts x
+    risk_ids count matrix. Risk ids outside risk_ids carry no weight in
+    aggregate_risk and are left out.
+    """
+    column = {risk_id: j for j, risk_id in enumerate(risk_ids)}
+    counts = np.zeros((len(detected_risks_per_contract), len(risk_ids)))
+
+    for i, detected_risks in enumerate(detected_risks_per_contract):
+        for risk in detected_risks:
+            j = column.get(risk["id"])
+            if j is not None:
+                counts[i, j] += risk.get("count", 1)
+
+    return counts
+
+
+def aggregate_risk_batch(counts, risk_ids=RISK_IDS):
+    """
+    counts: contracts x risk_ids matrix of signal counts.
+
+    Returns (scores, contributions): the rounded total score of every
+    contract and the contracts x risk_ids matrix of weight * count, as
+    aggregate_risk computes them one contract at a time.
+    """
+    weights = np.array([RISK_WEIGHTS.get(risk_id, 0.0) for risk_id in risk_ids])
+    counts = np.asarray(counts, dtype=np.float64)
+
+    contributions = counts * weights
+    scores = np.round(counts @ weights, 2)
+    return scores, contributions
+
+
+def classify_decision_batch(scores):
+    """
+    classify_decision for an array of scores; returns an array of
+    decision names.
+    """
+    buckets = np.searchsorted(_DECISION_EDGES, scores, side="right")
+    return DECISIONS[buckets]
@@ -0,0 +1,488 @@
+import time
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import torch
+
+from src.clause_schema import CLAUSE_LABELS
+from src.inference_backends import as_backend
+from src.inference_config import INFERENCE_CONFIG
+from src.model_registry import get_classifier
+
+
+def tokenize_texts(texts: Sequence[str], tokenizer) -> List[List[int]]:
+    """
+    Tokenizes every clause once, without padding.
+    """
+    if not texts:
+        return []
+    return tokenizer(list(texts), truncation=True)["input_ids"]
+
+
+def tokenize_full(texts: Sequence[str], tokenizer) -> List[List[int]]:
+    """
+    Tokenizes every clause once, without special tokens or truncation,
+    so long clauses can be cut into windows afterwards.
+    """
+    if not texts:
+        return []
+    return tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        truncation=False,
+        verbose=False
+    )["input_ids"]
+
+
+def _id_list(ids) -> List[int]:
+    # Token-cache slices are NumPy arrays; the tokenizer wants Python ints
+    return ids.tolist() if hasattr(ids, "tolist") else list(ids)
+
+
+def truncate_encodings(token_ids: Sequence[Sequence[int]], tokenizer) -> List[List[int]]:
+    """
+    Adds special tokens to untruncated token IDs (tokenize_full) and
+    truncates them to the model context, giving the same encodings as
+    tokenize_texts on the original texts.
+    """
+    prefix, suffix = special_affixes(tokenizer)
+    body = tokenizer.model_max_length - len(prefix) - len(suffix)
+    return [prefix + _id_list(ids[:body]) + suffix for ids in token_ids]
+
+
+def special_affixes(tokenizer) -> Tuple[List[int], List[int]]:
+    """
+    The special tokens the tokenizer puts before and after a single
+    sequence (e.g. [CLS] and [SEP] for BERT).
+    """
+    bare = tokenizer("a", add_special_tokens=False)["input_ids"]
+    full = tokenizer("a")["input_ids"]
+    for offset in range(len(full) - len(bare) + 1):
+        if full[offset:offset + len(bare)] == bare:
+            return full[:offset], full[offset + len(bare):]
+    return [], []
+
+
+def window_starts(num_tokens: int, body: int, stride: int) -> List[int]:
+    """
+    Start offsets of overlapping windows of `body` tokens, `stride` tokens
+    of overlap apart. The last window is aligned to the end of the clause.
+    """
+    if num_tokens <= body:
+        return [0]
+
+    step = max(1, body - stride)
+    starts = list(range(0, num_tokens - body + 1, step))
+    if starts[-1] + body < num_tokens:
+        starts.append(num_tokens - body)
+    return starts
+
+
+def spread(starts: List[int], keep: int) -> List[int]:
+    """
+    Keeps `keep` evenly spaced windows, always including the first and last.
+    """
+    if keep >= len(starts):
+        return starts
+    if keep == 1:
+        return starts[:1]
+    last = len(starts) - 1
+    return [starts[round(i * last / (keep - 1))] for i in range(keep)]
+
+
+def allocate_windows(counts: Sequence[int], budget: int) -> List[int]:
+    """
+    Shares a per-request window budget between clauses. Every clause keeps
+    at least one window; the rest is handed out level by level, so short
+    clauses keep all of theirs and only the longest ones are thinned.
+    """
+    if sum(counts) <= budget:
+        return list(counts)
+
+    level = 1
+    while sum(min(c, level + 1) for c in counts) <= budget:
+        level += 1
+
+    allocated = [min(c, level) for c in counts]
+    spare = budget - sum(allocated)
+    for i, c in enumerate(counts):
+        if spare <= 0:
+            break
+        if c > level:
+            allocated[i] += 1
+            spare -= 1
+    return allocated
+
+
+def _window_layout(
+    token_ids: Sequence[Sequence[int]],
+    tokenizer,
+    max_length: int = None,
+    stride: int = None
+) -> Tuple[List[int], List[int], int, List[List[int]]]:
+    max_length = min(
+        max_length or INFERENCE_CONFIG["WINDOW_MAX_LENGTH"],
+        tokenizer.model_max_length
+    )
+    stride = INFERENCE_CONFIG["WINDOW_STRIDE"] if stride is None else stride
+    prefix, suffix = special_affixes(tokenizer)
+    body = max_length - len(prefix) - len(suffix)
+    return prefix, suffix, body, [window_starts(len(ids), body, stride) for ids in token_ids]
+
+
+def _allocate(
+    starts: Sequence[List[int]],
+    groups: Sequence[Hashable],
+    max_windows_per_clause: int = None,
+    max_windows_per_request: int = None
+) -> List[int]:
+    max_windows_per_clause = (
+        max_windows_per_clause or INFERENCE_CONFIG["MAX_WINDOWS_PER_CLAUSE"]
+    )
+    max_windows_per_request = (
+        max_windows_per_request or INFERENCE_CONFIG["MAX_WINDOWS_PER_REQUEST"]
+    )
+
+    members = {}
+    for i, group in enumerate(groups):
+        members.setdefault(group, []).append(i)
+
+    keep = [min(len(s), max_windows_per_clause) for s in starts]
+    for indices in members.values():
+        allocated = allocate_windows(
+            [keep[i] for i in indices], max_windows_per_request
+        )
+        for i, count in zip(indices, allocated):
+            keep[i] = count
+    return keep
+
+
+def request_window_caps(
+    token_ids: Sequence[Sequence[int]],
+    tokenizer=None,
+    max_windows_per_clause: int = None,
+    max_windows_per_request: int = None
+) -> List[int]:
+    """
+    How many windows each clause of one request (tokenize_full output)
+    may use under the per-clause and per-request caps. Allocating this
+    once per request keeps the budget per request however its clauses are
+    later split across batches; pass it to classify_token_ids with the
+    same token IDs as window_caps.
+    """
+    if tokenizer is None:
+        tokenizer = get_classifier()[0]
+    _, _, _, starts = _window_layout(token_ids, tokenizer)
+    return _allocate(
+        starts, [None] * len(starts), max_windows_per_clause, max_windows_per_request
+    )
+
+
+def build_windows(
+    token_ids: Sequence[List[int]],
+    tokenizer,
+    groups: Sequence[Hashable] = None,
+    max_length: int = None,
+    stride: int = None,
+    max_windows_per_clause: int = None,
+    max_windows_per_request: int = None,
+    window_caps: Sequence[int] = None
+) -> Tuple[List[List[int]], List[int], List[int]]:
+    """
+    Cuts each clause into model-sized windows with special tokens added.
+    A clause that fits in one window produces exactly what truncation
+    would have. Window counts are capped per clause and per request
+    (clauses sharing a group id belong to the same request), or by
+    window_caps when the caller already allocated them
+    (request_window_caps).
+
+    Returns (encodings, owners, dropped): the window encodings, the clause
+    index each window belongs to, and per clause how many windows were
+    skipped because of the caps.
+    """
+    prefix, suffix, body, starts = _window_layout(token_ids, tokenizer, max_length, stride)
+
+    if window_caps is not None:
+        keep = [min(len(s), cap) for s, cap in zip(starts, window_caps)]
+    else:
+        keep = _allocate(
+            starts,
+            [None] * len(token_ids) if groups is None else groups,
+            max_windows_per_clause,
+            max_windows_per_request
+        )
+
+    encodings = []
+    owners = []
+    dropped = []
+    for i, ids in enumerate(token_ids):
+        for start in spread(starts[i], keep[i]):
+            encodings.append(prefix + ids[start:start + body] + suffix)
+            owners.append(i)
+        dropped.append(len(starts[i]) - keep[i])
+
+    return encodings, owners, dropped
+
+
+def make_batches(
+    lengths: Sequence[int],
+    max_batch_tokens: int,
+    max_batch_size: int
+) -> List[List[int]]:
+    """
+    Groups sequence indices into length-sorted batches whose padded size
+    (batch size x longest sequence) stays within max_batch_tokens.
+    A single sequence longer than the budget still gets its own batch.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    batches = []
+    current = []
+    longest = 0
+
+    for i in order:
+        width = max(longest, lengths[i])
+        if current and (
+            len(current) >= max_batch_size
+            or width * (len(current) + 1) > max_batch_tokens
+        ):
+            batches.append(current)
+            current = []
+            width = lengths[i]
+
+        current.append(i)
+        longest = width
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def _forward_batches(
+    encodings: Sequence[List[int]],
+    tokenizer,
+    model,
+    max_batch_tokens: int = None,
+    max_batch_size: int = None
+):
+    """
+    Yields (indices, logits) for each length bucket of encodings.
+    model may be an inference backend or a bare transformers model.
+    """
+    backend = as_backend(model)
+    max_batch_tokens = max_batch_tokens or INFERENCE_CONFIG["MAX_BATCH_TOKENS"]
+    max_batch_size = max_batch_size or INFERENCE_CONFIG["MAX_BATCH_SIZE"]
+    lengths = [len(ids) for ids in encodings]
+
+    for batch in make_batches(lengths, max_batch_tokens, max_batch_size):
+        inputs = tokenizer.pad(
+            [{"input_ids": encodings[i]} for i in batch],
+            padding=True,
+            return_tensors="pt"
+        )
+        yield batch, backend.logits(inputs)
+
+
+def _add_timing(timings: Dict, stage: str, started: float):
+    if timings is not None:
+        timings[stage] = (
+            timings.get(stage, 0.0) + time.perf_counter() - started
+        )
+
+
+def classify_encoded(
+    encodings: Sequence[List[int]],
+    tokenizer,
+    model,
+    max_batch_tokens: int = None,
+    max_batch_size: int = None,
+    timings: Dict = None
+) -> List[Dict]:
+    """
+    Runs one forward pass per length bucket and returns one prediction
+    per encoding, in the original order. If timings is given, the time
+    spent in forward passes is added to timings["inference"].
+    """
+    predictions = [None] * len(encodings)
+    started = time.perf_counter()
+
+    for batch, logits in _forward_batches(
+        encodings, tokenizer, model, max_batch_tokens, max_batch_size
+    ):
+        probs = logits.softmax(dim=1)
+        indices = logits.argmax(dim=1)
+
+        for row, i in enumerate(batch):
+            idx = indices[row].item()
+            predictions[i] = {
+                "label_idx": idx,
+                "label": CLAUSE_LABELS.get(idx, "Unknown"),
+                "confidence": probs[row][idx].item(),
+                "logits": logits[row].tolist(),
+                "num_tokens": len(encodings[i])
+            }
+
+    _add_timing(timings, "inference", started)
+    return predictions
+
+
+def classify_windows(
+    encodings: Sequence[List[int]],
+    owners: Sequence[int],
+    dropped: Sequence[int],
+    tokenizer,
+    model,
+    max_batch_tokens: int = None,
+    max_batch_size: int = None,
+    timings: Dict = None
+) -> List[Dict]:
+    """
+    Classifies the windows of all clauses in shared length buckets and
+    mean-pools the window logits into one prediction per clause.
+    """
+    num_clauses = len(dropped)
+    started = time.perf_counter()
+
+    pooled = None
+    for batch, logits in _forward_batches(
+        encodings, tokenizer, model, max_batch_tokens, max_batch_size
+    ):
+        if pooled is None:
+            pooled = torch.zeros(num_clauses, logits.shape[1], dtype=torch.float32)
+        pooled.index_add_(
+            0,
+            torch.tensor([owners[i] for i in batch]),
+            logits
+        )
+
+    windows = [0] * num_clauses
+    tokens = [0] * num_clauses
+    for ids, owner in zip(encodings, owners):
+        windows[owner] += 1
+        tokens[owner] += len(ids)
+
+    predictions = []
+    if pooled is not None:
+        pooled /= torch.tensor(windows, dtype=torch.float32).unsqueeze(1)
+        probs = pooled.softmax(dim=1)
+        indices = pooled.argmax(dim=1)
+
+        for i in range(num_clauses):
+            idx = indices[i].item()
+            predictions.append({
+                "label_idx": idx,
+                "label": CLAUSE_LABELS.get(idx, "Unknown"),
+                "confidence": probs[i][idx].item(),
+                "logits": pooled[i].tolist(),
+                "num_tokens": tokens[i],
+                "windows": windows[i],
+                "windows_dropped": dropped[i]
+            })
+
+    _add_timing(timings, "inference", started)
+    return predictions
+
+
+def classify_texts(
+    texts: Sequence[str],
+    tokenizer=None,
+    model=None,
+    max_batch_tokens: int = None,
+    max_batch_size: int = None,
+    timings: Dict = None,
+    windowed: bool = None,
+    groups: Sequence[Hashable] = None,
+    window_caps: Sequence[int] = None
+) -> List[Dict]:
+    """
+    Batched equivalent of classifying each clause on its own.
+    Defaults to the process-wide model from the registry.
+
+    In windowed mode (INFERENCE_CONFIG["WINDOWED"] unless overridden)
+    clauses longer than the model context are classified from all of
+    their windows instead of being truncated. groups marks which clauses
+    belong to the same request for the per-request window cap; window_caps
+    gives per-clause caps allocated beforehand instead.
+    """
+    if tokenizer is None or model is None:
+        tokenizer, model = get_classifier()
+    if windowed is None:
+        windowed = INFERENCE_CONFIG["WINDOWED"]
+
+    started = time.perf_counter()
+    if not windowed:
+        encodings = tokenize_texts(texts, tokenizer)
+        _add_timing(timings, "tokenization", started)
+        return classify_encoded(
+            encodings,
+            tokenizer,
+            model,
+            max_batch_tokens=max_batch_tokens,
+            max_batch_size=max_batch_size,
+            timings=timings
+        )
+
+    encodings, owners, dropped = build_windows(
+        tokenize_full(texts, tokenizer), tokenizer, groups=groups, window_caps=window_caps
+    )
+    _add_timing(timings, "tokenization", started)
+    return classify_windows(
+        encodings,
+        owners,
+        dropped,
+        tokenizer,
+        model,
+        max_batch_tokens=max_batch_tokens,
+        max_batch_size=max_batch_size,
+        timings=timings
+    )
+
+
+def classify_token_ids(
+    token_ids: Sequence[Sequence[int]],
+    tokenizer=None,
+    model=None,
+    max_batch_tokens: int = None,
+    max_batch_size: int = None,
+    timings: Dict = None,
+    windowed: bool = None,
+    groups: Sequence[Hashable] = None,
+    window_caps: Sequence[int] = None
+) -> List[Dict]:
+    """
+    classify_texts for clauses that are already tokenised without special
+    tokens or truncation (tokenize_full, or slices of a token_cache memory
+    map). Gives the same predictions as classify_texts on the texts.
+    """
+    if tokenizer is None or model is None:
+        tokenizer, model = get_classifier()
+    if windowed is None:
+        windowed = INFERENCE_CONFIG["WINDOWED"]
+
+    started = time.perf_counter()
+    if not windowed:
+        encodings = truncate_encodings(token_ids, tokenizer)
+        _add_timing(timings, "tokenization", started)
+        return classify_encoded(
+            encodings,
+            tokenizer,
+            model,
+            max_batch_tokens=max_batch_tokens,
+            max_batch_size=max_batch_size,
+            timings=timings
+        )
+
+    encodings, owners, dropped = build_windows(
+        [_id_list(ids) for ids in token_ids], tokenizer, groups=groups, window_caps=window_caps
+    )
+    _add_timing(timings, "tokenization", started)
+    return classify_windows(
+        encodings,
+        owners,
+        dropped,
+        tokenizer,
+        model,
+        max_batch_tokens=max_batch_tokens,
+        max_batch_size=max_batch_size,
+        timings=timings
+    )
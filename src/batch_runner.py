@@ -0,0 +1,324 @@
+"""
+Runs the PRODOC pipeline over every contract in the CUAD corpus (or a
+directory of PDFs) with a pool of worker processes, writing one JSONL
+record per contract. Contracts already in the output are skipped, so
+re-running the same command after an interruption resumes where it
+stopped. Every
+record carries the worker's model_identity(); a run stops rather than
+mix records of different models in one output file.
+
+    python -m src.batch_runner --output runs/cuad.jsonl --workers 4
+    python -m src.batch_runner --pdf-dir contracts/ --output runs/pdfs.jsonl
+
+With --token-cache, corpus contracts are read pre-segmented and
+pre-tokenised from the token_cache memory maps (built on first use).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from src.cuad_corpus import DATA_PATH, open_corpus
+
+
+_identity = None
+
+
+def _init_worker(torch_threads: int):
+    global _identity
+
+    import torch
+    from src.inference_config import INFERENCE_CONFIG
+    from src.model_registry import model_identity, warm_up
+
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+        if not INFERENCE_CONFIG["ONNX_THREADS"]:
+            INFERENCE_CONFIG["ONNX_THREADS"] = torch_threads
+    warm_up()
+    _identity = model_identity()
+
+
+def _load_text(item: Dict) -> str:
+    if item["source"] == "pdf":
+        from src.extract_pdf_text import extract_text_from_pdf
+        return extract_text_from_pdf(Path(item["path"]).read_bytes())
+
+    from src.prodoc_pipeline import extract_full_contract_text
+    contract = open_corpus(item["path"]).get(item["index"])
+    return extract_full_contract_text(contract)
+
+
+@lru_cache(maxsize=None)
+def _token_cache(directory: str):
+    """
+    The worker's view of a token cache, checked once against the
+    tokenizer of the loaded model.
+    """
+    from src.model_registry import get_classifier
+    from src.token_cache import TokenCache
+
+    cache = TokenCache(directory)
+    cache.check_tokenizer(get_classifier()[0])
+    return cache
+
+
+def _cached_classify_fn(cache, index: int):
+    """
+    A classify_texts-style function over one cached contract. It looks
+    the texts it is given up in the cache, so the cascade can still pass
+    on only the escalated clauses.
+    """
+    from src.batch_inference import classify_token_ids
+
+    token_ids = dict(zip(cache.clause_texts(index), cache.clause_tokens(index)))
+
+    def classify(texts):
+        return classify_token_ids([token_ids[t] for t in texts])
+
+    return classify
+
+
+def analyze_item(item: Dict) -> Dict:
+    """
+    Worker entry point: analyses one corpus contract or PDF.
+    """
+    from src.batch_inference import classify_texts
+    from src.lexical_classifier import get_cascade
+    from src.prodoc_pipeline import analyze_clause_texts, analyze_contract_text
+
+    started = time.perf_counter()
+    cascade = get_cascade()
+
+    if "token_cache" in item:
+        cache = _token_cache(item["token_cache"])
+        classify_fn = _cached_classify_fn(cache, item["index"])
+        if cascade is not None:
+            classify_fn = cascade.wrap(classify_fn)
+        output = analyze_clause_texts(
+            cache.clause_texts(item["index"]), item["title"], classify_fn=classify_fn
+        )
+    else:
+        classify_fn = classify_texts
+        if cascade is not None:
+            classify_fn = cascade.wrap(classify_fn)
+        text = _load_text(item)
+        output = analyze_contract_text(text, item["title"], classify_fn=classify_fn)
+
+    return {
+        "id": item["id"],
+        "title": item["title"],
+        "source": item["source"],
+        "decision": output["decision"],
+        "risk_score": output["risk_score"],
+        "breakdown": output["risks"],
+        "clause_count": output["clause_count"],
+        "model_identity": _identity,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def iter_items(
+    corpus_path: Path = None,
+    pdf_dir: Path = None,
+    token_cache=None
+) -> Iterator[Dict]:
+    if pdf_dir is not None:
+        for path in sorted(pdf_dir.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                yield {
+                    "id": str(path.relative_to(pdf_dir)),
+                    "title": path.name,
+                    "source": "pdf",
+                    "path": str(path)
+                }
+        return
+
+    if token_cache is not None:
+        for index, title in enumerate(token_cache.titles()):
+            yield {
+                "id": f"cuad-{index:04d}",
+                "title": title,
+                "source": "cuad",
+                "token_cache": str(token_cache.directory),
+                "index": index
+            }
+        return
+
+    corpus = open_corpus(corpus_path)
+    for index, title in enumerate(corpus.titles()):
+        yield {
+            "id": f"cuad-{index:04d}",
+            "title": title,
+            "source": "cuad",
+            "path": str(corpus_path),
+            "index": index
+        }
+
+
+def read_output(path: Path) -> Tuple[Set[str], Optional[str]]:
+    """
+    The IDs and the model_identity of the records already in an output
+    file. A torn last line (the run was killed while writing it) is
+    truncated away, so its contract is processed again.
+    """
+    done = set()
+    identity = None
+    if not path.exists():
+        return done, identity
+
+    with open(path, "r+b") as f:
+        lines = f.readlines()
+        kept = 0
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                record = None
+
+            if record is None:
+                if number < len(lines):
+                    raise RuntimeError(f"{path} line {number} is not a complete record")
+                print(f"Dropping a partly written record at the end of {path}", file=sys.stderr)
+                f.truncate(kept)
+                break
+
+            done.add(record["id"])
+            identity = identity or record.get("model_identity")
+            kept += len(line)
+
+    return done, identity
+
+
+def _append_line(f, line: str):
+    f.write(line + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def run(
+    items,
+    output_path: Path,
+    workers: int,
+    torch_threads: int = 0
+) -> Dict:
+    done, identity = read_output(output_path)
+    todo = [item for item in items if item["id"] not in done]
+    total = len(todo)
+
+    print(
+        f"{len(done)} already done, {total} to process with {workers} workers",
+        file=sys.stderr
+    )
+    if not todo:
+        return {"processed": 0, "failed": 0}
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    processed = failed = clauses = 0
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(torch_threads,)
+            ) as pool:
+
+        queue = iter(todo)
+        pending = {}
+
+        def top_up():
+            while len(pending) < workers * 2:
+                item = next(queue, None)
+                if item is None:
+                    return
+                pending[pool.submit(analyze_item, item)] = item
+
+        top_up()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item = pending.pop(future)
+                try:
+                    record = future.result()
+                except Exception as exc:
+                    # Not written, so the next run retries it
+                    failed += 1
+                    print(f"FAILED {item['id']}: {exc!r}", file=sys.stderr)
+                    continue
+
+                if identity is None:
+                    identity = record["model_identity"]
+                elif record["model_identity"] != identity:
+                    for other in pending:
+                        other.cancel()
+                    raise RuntimeError(
+                        f"{item['id']} was analysed by model {record['model_identity']}, "
+                        f"but {output_path} holds records of model {identity}; "
+                        "use a new --output for a different model"
+                    )
+
+                _append_line(out, json.dumps(record))
+                processed += 1
+                clauses += record["clause_count"]
+
+                elapsed = time.perf_counter() - started
+                rate = processed / elapsed
+                remaining = total - processed - failed
+                print(
+                    f"[{processed + failed}/{total}] {record['id']} "
+                    f"{record['decision']} | {rate:.2f} contracts/s, "
+                    f"{clauses / elapsed:.1f} clauses/s, "
+                    f"ETA {remaining / rate:.0f}s",
+                    file=sys.stderr
+                )
+            top_up()
+
+    return {"processed": processed, "failed": failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--corpus", type=Path, default=DATA_PATH, help="CUAD_v1.json path")
+    source.add_argument("--pdf-dir", type=Path, help="analyse every PDF under this directory")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file to append records to")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--torch-threads", type=int, default=0,
+                        help="torch / ONNX Runtime intra-op threads per worker "
+                             "(default: cores / workers)")
+    parser.add_argument("--limit", type=int, help="only consider the first N contracts")
+    parser.add_argument("--token-cache", action="store_true",
+                        help="read corpus clauses from the pre-tokenised cache")
+    args = parser.parse_args(argv)
+
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    token_cache = None
+    if args.token_cache and args.pdf_dir is None:
+        from transformers import AutoTokenizer
+        from src.model_registry import MODEL_NAME
+        from src.token_cache import open_token_cache
+
+        token_cache = open_token_cache(AutoTokenizer.from_pretrained(MODEL_NAME), args.corpus)
+
+    items = list(iter_items(
+        corpus_path=args.corpus, pdf_dir=args.pdf_dir, token_cache=token_cache
+    ))
+    if args.limit:
+        items = items[:args.limit]
+
+    summary = run(items, args.output, args.workers, torch_threads)
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
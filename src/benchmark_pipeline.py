@@ -0,0 +1,501 @@
+"""
+Per-stage benchmark of the PRODOC analysis pipeline.
+
+Runs every stage over a fixed CUAD sample and a set of PDFs rendered from
+that sample, using a small randomly initialised local BERT so no network
+access is needed. Reports wall time, p50/p95/p99 per contract, clauses/sec
+and peak RSS, saves the results as JSON and, given a baseline file, flags
+regressions.
+
+With --token-cache a "cuad_cached" suite also runs the same contracts
+from the token_cache memory maps, skipping JSON parsing, segmentation
+and tokenisation.
+
+    python -m src.benchmark_pipeline --sample 20 --output bench/base.json
+    python -m src.benchmark_pipeline --sample 20 --baseline bench/base.json
+"""
+import argparse
+import json
+import platform
+import re
+import resource
+import string
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+
+from src.aggregate_risk import aggregate_risk, classify_decision
+from src.batch_inference import (
+    build_windows,
+    classify_encoded,
+    classify_windows,
+    tokenize_full,
+    tokenize_texts,
+    truncate_encodings
+)
+from src.clause_schema import CLAUSE_LABELS
+from src.cuad_corpus import DATA_PATH, open_corpus
+from src.extract_pdf_text import extract_text_from_pdf
+from src.generate_report import generate_decision_report
+from src.inference_config import INFERENCE_CONFIG
+from src.inference_backends import OnnxBackend, export_onnx
+from src.model_registry import apply_precision, get_classifier, resolve_precision
+from src.prodoc_pipeline import (
+    extract_full_contract_text,
+    split_clauses,
+    normalize_clauses,
+    detect_risks,
+    generate_summary
+)
+from src.token_cache import open_token_cache
+
+STAGES = [
+    "load_tokens",
+    "extract_text",
+    "split_clauses",
+    "normalize_clauses",
+    "tokenize",
+    "forward",
+    "detect_risks",
+    "aggregate_risk",
+    "generate_report"
+]
+
+
+# -------------------------------------------------
+# Local model (no network)
+# -------------------------------------------------
+def build_local_model(texts: List[str], work_dir: Path, vocab_words: int = 4000, seed: int = 0):
+    """
+    Builds a WordPiece tokenizer from the sample's most frequent words and a
+    2-layer randomly initialised BERT with the 8-label head. The vocab file
+    is written to work_dir.
+    """
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    counts = Counter(
+        w for t in texts for w in re.findall(r"[a-z]+", t.lower())
+    )
+    symbols = string.ascii_lowercase + string.digits + string.punctuation
+    vocab = (
+        ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+        + list(symbols)
+        + ["##" + c for c in string.ascii_lowercase + string.digits]
+        + [w for w, _ in counts.most_common(vocab_words)]
+    )
+
+    vocab_file = work_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(dict.fromkeys(vocab)), encoding="utf-8")
+
+    tokenizer = BertTokenizerFast(
+        vocab_file=str(vocab_file),
+        do_lower_case=True,
+        model_max_length=512
+    )
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=512,
+        max_position_embeddings=512,
+        num_labels=len(CLAUSE_LABELS)
+    )
+    model = BertForSequenceClassification(config)
+    model.eval()
+    return tokenizer, model
+
+
+# -------------------------------------------------
+# Sample PDFs rendered from the CUAD sample
+# -------------------------------------------------
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(text: str, path: Path, lines_per_page: int = 60, width: int = 95):
+    """
+    Writes text as a plain Helvetica PDF, enough for pdfplumber to extract.
+    """
+    lines = []
+    for paragraph in text.splitlines():
+        while len(paragraph) > width:
+            cut = paragraph.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+
+    pages = [
+        lines[i:i + lines_per_page]
+        for i in range(0, len(lines), lines_per_page)
+    ] or [[]]
+
+    font_id = 3 + 2 * len(pages)
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+
+    def add(num, content: bytes):
+        offsets[num] = len(body)
+        body.extend(f"{num} 0 obj\n".encode() + content + b"\nendobj\n")
+
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    add(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+
+    for i, page_lines in enumerate(pages):
+        stream = "BT /F1 9 Tf 36 806 Td 12.5 TL " + " ".join(
+            f"({_pdf_escape(line)}) '" for line in page_lines
+        ) + " ET"
+        stream = stream.encode("latin-1")
+        add(3 + 2 * i, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        ).encode())
+        add(4 + 2 * i, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    add(font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    xref = len(body)
+    body.extend(f"xref\n0 {font_id + 1}\n0000000000 65535 f \n".encode())
+    for num in range(1, font_id + 1):
+        body.extend(f"{offsets[num]:010d} 00000 n \n".encode())
+    body.extend(
+        f"trailer << /Size {font_id + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    )
+
+    Path(path).write_bytes(bytes(body))
+
+
+# -------------------------------------------------
+# Timing
+# -------------------------------------------------
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._current = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        yield
+        self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - started
+
+    def finish_contract(self) -> float:
+        for name, seconds in self._current.items():
+            self.samples[name].append(seconds)
+        total = sum(self._current.values())
+        self.samples["contract"].append(total)
+        self._current = {}
+        return total
+
+
+def run_contract(load_text, title: str, tokenizer, model, timer: StageTimer) -> int:
+    with timer.stage("extract_text"):
+        text = load_text()
+    with timer.stage("split_clauses"):
+        raw_clauses = split_clauses(text)
+    with timer.stage("normalize_clauses"):
+        clauses = normalize_clauses(raw_clauses)
+    texts = [c["text"] for c in clauses]
+    windowed = INFERENCE_CONFIG["WINDOWED"]
+    with timer.stage("tokenize"):
+        if windowed:
+            windows = build_windows(tokenize_full(texts, tokenizer), tokenizer)
+        else:
+            encodings = tokenize_texts(texts, tokenizer)
+    return _finish_contract(clauses, title, windows if windowed else encodings,
+                            tokenizer, model, timer)
+
+
+def run_cached_contract(cache, index: int, title: str, tokenizer, model, timer: StageTimer) -> int:
+    """
+    run_contract for a contract read back from the token cache: the
+    clauses and their token IDs come straight from the memory maps.
+    """
+    with timer.stage("load_tokens"):
+        clauses = normalize_clauses(cache.clause_texts(index))
+        token_ids = cache.clause_tokens(index)
+    windowed = INFERENCE_CONFIG["WINDOWED"]
+    with timer.stage("tokenize"):
+        if windowed:
+            encoded = build_windows([ids.tolist() for ids in token_ids], tokenizer)
+        else:
+            encoded = truncate_encodings(token_ids, tokenizer)
+    return _finish_contract(clauses, title, encoded, tokenizer, model, timer)
+
+
+def _finish_contract(clauses: List[Dict], title: str, encoded, tokenizer, model,
+                     timer: StageTimer) -> int:
+    """
+    Forward pass and the stages after it. encoded is the output of
+    build_windows in windowed mode and a list of encodings otherwise.
+    """
+    with timer.stage("forward"):
+        if INFERENCE_CONFIG["WINDOWED"]:
+            predictions = classify_windows(*encoded, tokenizer, model)
+        else:
+            predictions = classify_encoded(encoded, tokenizer, model)
+        for c, prediction in zip(clauses, predictions):
+            c["label"] = prediction["label"]
+            c["confidence"] = prediction["confidence"]
+    with timer.stage("detect_risks"):
+        detected_risks = detect_risks(clauses)
+    with timer.stage("aggregate_risk"):
+        score, breakdown = aggregate_risk(detected_risks)
+    with timer.stage("generate_report"):
+        decision = classify_decision(score)
+        generate_decision_report({
+            "contract_title": title,
+            "decision": decision,
+            "risk_score": score,
+            "risks": breakdown,
+            "summary": generate_summary(decision, breakdown)
+        })
+    return len(clauses)
+
+
+def summarize(timer: StageTimer, clauses: int) -> Dict:
+    def stats(values):
+        return {
+            "total_s": round(sum(values), 4),
+            "p50_ms": round(1000 * percentile(values, 0.50), 3),
+            "p95_ms": round(1000 * percentile(values, 0.95), 3),
+            "p99_ms": round(1000 * percentile(values, 0.99), 3)
+        }
+
+    contract_times = timer.samples["contract"]
+    total = sum(contract_times)
+    return {
+        "contracts": len(contract_times),
+        "clauses": clauses,
+        "wall_s": round(total, 4),
+        "clauses_per_sec": round(clauses / total, 2) if total else 0.0,
+        "per_contract": stats(contract_times),
+        "stages": {
+            name: stats(timer.samples[name])
+            for name in STAGES if timer.samples.get(name)
+        }
+    }
+
+
+def run_suite(contracts: List[Dict], pdf_paths: List[Path], tokenizer, model, warmup: int = 1,
+              token_cache=None) -> Dict:
+    # Untimed warm-up so lazy initialisation does not skew the first sample
+    for contract in contracts[:warmup]:
+        run_contract(lambda: extract_full_contract_text(contract), contract["title"],
+                     tokenizer, model, StageTimer())
+
+    results = {}
+
+    timer = StageTimer()
+    clauses = 0
+    for contract in contracts:
+        clauses += run_contract(
+            lambda: extract_full_contract_text(contract),
+            contract["title"], tokenizer, model, timer
+        )
+        timer.finish_contract()
+    results["cuad"] = summarize(timer, clauses)
+
+    if token_cache is not None:
+        timer = StageTimer()
+        clauses = 0
+        for index, contract in enumerate(contracts):
+            clauses += run_cached_contract(
+                token_cache, index, contract["title"], tokenizer, model, timer
+            )
+            timer.finish_contract()
+        results["cuad_cached"] = summarize(timer, clauses)
+
+    if pdf_paths:
+        timer = StageTimer()
+        clauses = 0
+        for path in pdf_paths:
+            data = path.read_bytes()
+            clauses += run_contract(
+                lambda: extract_text_from_pdf(data),
+                path.name, tokenizer, model, timer
+            )
+            timer.finish_contract()
+        results["pdf"] = summarize(timer, clauses)
+
+    return results
+
+
+# -------------------------------------------------
+# Baseline comparison
+# -------------------------------------------------
+def compare(current: Dict, baseline: Dict, tolerance: float, min_delta_ms: float = 0.5) -> List[str]:
+    """
+    Lists p50 stage times, p95 contract times and clauses/sec that got
+    worse than the baseline by more than the relative tolerance.
+    """
+    regressions = []
+
+    def check(label, new, old):
+        if old > 0 and new > old * (1 + tolerance) and new - old > min_delta_ms:
+            regressions.append(f"{label}: {old:.3f} -> {new:.3f} ms (+{100 * (new / old - 1):.0f}%)")
+
+    for suite, result in current["results"].items():
+        base = baseline.get("results", {}).get(suite)
+        if not base:
+            continue
+
+        for stage, stats in result["stages"].items():
+            if stage in base["stages"]:
+                check(f"{suite}.{stage}.p50", stats["p50_ms"], base["stages"][stage]["p50_ms"])
+        check(f"{suite}.contract.p95", result["per_contract"]["p95_ms"], base["per_contract"]["p95_ms"])
+
+        old_rate, new_rate = base["clauses_per_sec"], result["clauses_per_sec"]
+        if old_rate and new_rate < old_rate * (1 - tolerance):
+            regressions.append(f"{suite}.clauses_per_sec: {old_rate} -> {new_rate}")
+
+    return regressions
+
+
+def print_table(results: Dict):
+    for suite, result in results.items():
+        print(f"\n[{suite}] {result['contracts']} contracts, {result['clauses']} clauses, "
+              f"{result['clauses_per_sec']} clauses/s")
+        print(f"{'stage':<20}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        rows = list(result["stages"].items()) + [("per contract", result["per_contract"])]
+        for name, s in rows:
+            print(f"{name:<20}{s['total_s']:>10}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage PRODOC pipeline benchmark")
+    parser.add_argument("--corpus", type=Path, default=DATA_PATH)
+    parser.add_argument("--sample", type=int, default=20, help="first N CUAD contracts")
+    parser.add_argument("--pdfs", type=int, default=5, help="sample contracts rendered to PDF")
+    parser.add_argument("--pdf-dir", type=Path, help="benchmark these PDFs instead")
+    parser.add_argument("--model", choices=["local", "registry"], default="local",
+                        help="small random local BERT (default) or the registry model")
+    parser.add_argument("--backend", choices=["torch", "onnx"], default=INFERENCE_CONFIG["BACKEND"])
+    parser.add_argument("--threads", type=int, default=0, help="torch / ONNX Runtime intra-op threads")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--token-cache", action="store_true",
+                        help="also run the sample from the pre-tokenised corpus cache")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    # The local model's vocab, its ONNX export and the sample PDFs live
+    # here for the length of the run.
+    with tempfile.TemporaryDirectory(prefix="prodoc-bench-") as work_dir:
+        return run(args, Path(work_dir))
+
+
+def run(args, work_dir: Path) -> int:
+    if args.threads:
+        torch.set_num_threads(args.threads)
+        INFERENCE_CONFIG["ONNX_THREADS"] = args.threads
+    INFERENCE_CONFIG["BACKEND"] = args.backend
+
+    contracts = list(open_corpus(args.corpus).iter_contracts(stop=args.sample))
+
+    if args.model == "local":
+        tokenizer, model = build_local_model(
+            [extract_full_contract_text(c) for c in contracts],
+            work_dir
+        )
+        if args.backend == "onnx":
+            path = export_onnx(
+                model,
+                tokenizer,
+                work_dir / "local.onnx",
+                quantize=resolve_precision() == "int8"
+            )
+            model = OnnxBackend(path, INFERENCE_CONFIG["ONNX_THREADS"])
+        else:
+            model = apply_precision(model)
+    else:
+        tokenizer, model = get_classifier()
+
+    if args.pdf_dir:
+        pdf_paths = sorted(args.pdf_dir.glob("*.pdf"))
+    else:
+        pdf_paths = []
+        for i, contract in enumerate(contracts[:args.pdfs]):
+            path = work_dir / f"contract_{i:03d}.pdf"
+            write_text_pdf(extract_full_contract_text(contract), path)
+            pdf_paths.append(path)
+
+    token_cache = None
+    if args.token_cache:
+        # The local model's vocab exists only for this run, so its cache
+        # goes with the rest of work_dir
+        token_cache = open_token_cache(
+            tokenizer, args.corpus, root=work_dir if args.model == "local" else None
+        )
+
+    results = run_suite(contracts, pdf_paths, tokenizer, model, warmup=args.warmup,
+                        token_cache=token_cache)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model": args.model,
+            "backend": args.backend,
+            "precision": resolve_precision(),
+            "sample": len(contracts),
+            "pdfs": len(pdf_paths),
+            "torch": torch.__version__,
+            "threads": torch.get_num_threads(),
+            "python": platform.python_version(),
+            "machine": platform.machine()
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results
+    }
+
+    print_table(results)
+    print(f"\npeak RSS: {report['peak_rss_mb']} MB")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print("-", line)
+            return 1
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
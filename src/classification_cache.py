@@ -0,0 +1,262 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.inference_config import INFERENCE_CONFIG
+from src.model_registry import model_identity
+
+
+def normalize_clause_text(text: str) -> str:
+    # Whitespace runs do not change BERT tokenization, so collapsing them is safe
+    return " ".join(text.split())
+
+
+def clause_key(text: str, identity: str) -> str:
+    payload = identity + "\x00" + normalize_clause_text(text)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Two-tier cache of clause predictions keyed by normalized clause text
+    plus model identity: an in-memory LRU in front of a SQLite table with
+    size-based eviction of the least recently used rows.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = None,
+        max_disk_bytes: int = None,
+        identity: str = None
+    ):
+        self.identity = identity or model_identity()
+        self.memory_entries = memory_entries or INFERENCE_CONFIG["CACHE_MEMORY_ENTRIES"]
+        self.max_disk_bytes = max_disk_bytes or INFERENCE_CONFIG["CACHE_MAX_DISK_BYTES"]
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        self._disk_bytes = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS predictions_last_used
+                ON predictions (last_used);
+            """
+        )
+
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'model_identity'"
+        ).fetchone()
+        if row is None or row[0] != self.identity:
+            # Model or label set changed: every stored prediction is stale
+            self._db.execute("DELETE FROM predictions")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('model_identity', ?)",
+                (self.identity,)
+            )
+            self._db.commit()
+
+        size, clock = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM predictions"
+        ).fetchone()
+        self._disk_bytes = size
+        self._clock = clock
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _remember(self, key: str, prediction: Dict):
+        self._memory[key] = prediction
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[Dict]]:
+        keys = [clause_key(t, self.identity) for t in texts]
+        results = [None] * len(keys)
+
+        with self._lock:
+            disk_lookup = {}
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+            if disk_lookup and self._db is not None:
+                found = self._read_disk(list(disk_lookup))
+                for key, prediction in found.items():
+                    self._remember(key, prediction)
+                    for i in disk_lookup.pop(key):
+                        results[i] = prediction
+                        self.disk_hits += 1
+
+            self.misses += sum(len(v) for v in disk_lookup.values())
+
+        return results
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, Dict]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._db.execute(
+                "SELECT key, value FROM predictions WHERE key IN (%s)"
+                % ",".join("?" * len(chunk)),
+                chunk
+            ).fetchall()
+            for key, value in rows:
+                found[key] = json.loads(value)
+
+        if found:
+            now = self._tick()
+            self._db.executemany(
+                "UPDATE predictions SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self._db.commit()
+        return found
+
+    def put_many(self, texts: Sequence[str], predictions: Sequence[Dict]):
+        rows = []
+        with self._lock:
+            for text, prediction in zip(texts, predictions):
+                key = clause_key(text, self.identity)
+                self._remember(key, prediction)
+                value = json.dumps(prediction)
+                rows.append((key, value, len(value), self._tick()))
+
+            if self._db is not None and rows:
+                for key, _, _, _ in rows:
+                    old = self._db.execute(
+                        "SELECT size FROM predictions WHERE key = ?", (key,)
+                    ).fetchone()
+                    if old:
+                        self._disk_bytes -= old[0]
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._disk_bytes += sum(size for _, _, size, _ in rows)
+                self._evict()
+                self._db.commit()
+
+    def _evict(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+
+        # Trim to 90% so eviction does not run on every insert
+        target = int(self.max_disk_bytes * 0.9)
+        rows = self._db.execute(
+            "SELECT key, size FROM predictions ORDER BY last_used"
+        )
+        doomed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+        self._db.executemany("DELETE FROM predictions WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "model_identity": self.identity,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+def cached_classifier(
+    classify_fn: Callable[[Sequence[str]], List[Dict]],
+    cache: ClassificationCache
+) -> Callable[[Sequence[str]], List[Dict]]:
+    """
+    Wraps a classify_texts-style function so that only cache misses
+    (deduplicated) reach the model.
+    """
+    def classify(texts: Sequence[str]) -> List[Dict]:
+        predictions = cache.get_many(texts)
+
+        missing = {}
+        for i, prediction in enumerate(predictions):
+            if prediction is None:
+                missing.setdefault(normalize_clause_text(texts[i]), []).append(i)
+
+        if missing:
+            miss_texts = [texts[indices[0]] for indices in missing.values()]
+            fresh = classify_fn(miss_texts)
+            # Predictions thinned by the per-request window cap depend on
+            # what else was in the request, so they are not cached.
+            complete = [
+                (text, prediction)
+                for text, prediction in zip(miss_texts, fresh)
+                if not prediction.get("windows_dropped")
+            ]
+            if complete:
+                cache.put_many(*map(list, zip(*complete)))
+            for indices, prediction in zip(missing.values(), fresh):
+                for i in indices:
+                    predictions[i] = prediction
+
+        return predictions
+
+    return classify
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ClassificationCache:
+    """
+    Returns the process-wide cache backed by INFERENCE_CONFIG["CACHE_PATH"].
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClassificationCache(path=INFERENCE_CONFIG["CACHE_PATH"])
+
+    return _cache
@@ -1,22 +1,8 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import os
-
-MODEL_NAME = "nlpaueb/legal-bert-base-uncased"
+from src.inference_backends import as_backend
+from src.model_registry import get_classifier
 
 def load_model():
-    tokenizer = AutoTokenizer.from_pretrained(
-        MODEL_NAME,
-        force_download=True
-    )
-    model = AutoModelForSequenceClassification.from_pretrained(
-        MODEL_NAME,
-        force_download=True,
-        num_labels=8,
-        ignore_mismatched_sizes=True
-    )
-    model.eval()
-    return tokenizer, model
+    return get_classifier()
 
 def classify_clause(text, tokenizer, model):
     inputs = tokenizer(
@@ -26,11 +12,8 @@ def classify_clause(text, tokenizer, model):
         return_tensors="pt"
     )
 
-    with torch.no_grad():
-        outputs = model(**inputs)
-
-    logits = outputs.logits
-    predicted_class = torch.argmax(logits, dim=1).item()
+    logits = as_backend(model).logits(inputs)
+    predicted_class = logits.argmax(dim=1).item()
 
     return predicted_class, logits
 
@@ -0,0 +1,125 @@
+"""
+Aligns the clause list of a revised contract with the previous version,
+so unchanged clauses can keep their earlier analysis.
+"""
+import hashlib
+from collections import defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Dict, List, Sequence, Tuple
+
+from src.classification_cache import normalize_clause_text
+
+# Word-level similarity above which a changed clause counts as a
+# modified version of an old one rather than an added clause
+MIN_SIMILARITY = 0.6
+
+
+def clause_fingerprint(text: str, exact: bool = False) -> str:
+    """
+    Hash identifying a clause text, for analyses stored without the text.
+    Insensitive to whitespace runs (like the alignment itself) unless
+    exact is set.
+    """
+    if not exact:
+        text = normalize_clause_text(text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def clause_similarity(a: str, b: str, floor: float = 0.0) -> float:
+    """
+    Word-level similarity ratio in [0, 1]. Pairs that cannot reach floor
+    are rejected from the cheap upper bounds and scored 0.
+    """
+    matcher = SequenceMatcher(None, a.split(), b.split(), autojunk=False)
+    if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+        return 0.0
+    return matcher.ratio()
+
+
+def _pair_block(
+    old_texts: Sequence[str],
+    new_texts: Sequence[str],
+    old_indices: List[int],
+    new_indices: List[int],
+    matches: List[Dict],
+    min_similarity: float
+) -> List[int]:
+    """
+    Greedily pairs the most similar old/new clauses of one changed block.
+    Returns the old indices left unpaired.
+    """
+    candidates = []
+    for j in new_indices:
+        for i in old_indices:
+            score = clause_similarity(old_texts[i], new_texts[j], min_similarity)
+            if score >= min_similarity:
+                candidates.append((score, i, j))
+
+    used_old = set()
+    for score, i, j in sorted(candidates, reverse=True):
+        if i in used_old or matches[j] is not None:
+            continue
+        used_old.add(i)
+        matches[j] = {"status": "modified", "previous": i, "similarity": round(score, 3)}
+
+    return [i for i in old_indices if i not in used_old]
+
+
+def align_clauses(
+    old_texts: Sequence[str],
+    new_texts: Sequence[str],
+    min_similarity: float = MIN_SIMILARITY
+) -> Tuple[List[Dict], List[int]]:
+    """
+    Returns one match per new clause, {"status", "previous", "similarity"}
+    with status "unchanged", "modified" or "added", and the indices of
+    old clauses that no longer appear ("removed").
+
+    Clauses that are identical up to whitespace match exactly, even if
+    they moved. The rest are paired by word-level similarity within
+    each changed region of the document.
+    """
+    old_keys = [normalize_clause_text(t) for t in old_texts]
+    new_keys = [normalize_clause_text(t) for t in new_texts]
+    matches: List[Dict] = [None] * len(new_texts)
+
+    opcodes = SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes()
+
+    unmatched_old = []
+    blocks = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                matches[j] = {"status": "unchanged", "previous": i, "similarity": 1.0}
+        else:
+            unmatched_old.extend(range(i1, i2))
+            blocks.append((list(range(i1, i2)), list(range(j1, j2))))
+
+    # Moved clauses: identical text at a different position
+    by_key = defaultdict(deque)
+    for i in unmatched_old:
+        by_key[old_keys[i]].append(i)
+    moved = set()
+    for _, new_indices in blocks:
+        for j in new_indices:
+            if by_key[new_keys[j]]:
+                i = by_key[new_keys[j]].popleft()
+                moved.add(i)
+                matches[j] = {"status": "unchanged", "previous": i, "similarity": 1.0}
+
+    removed = []
+    for old_indices, new_indices in blocks:
+        removed.extend(_pair_block(
+            old_texts,
+            new_texts,
+            [i for i in old_indices if i not in moved],
+            [j for j in new_indices if matches[j] is None],
+            matches,
+            min_similarity
+        ))
+
+    for j, match in enumerate(matches):
+        if match is None:
+            matches[j] = {"status": "added", "previous": None, "similarity": 0.0}
+
+    return matches, sorted(removed)
@@ -0,0 +1,174 @@
+"""
+Columnar storage for the clauses of one contract.
+
+Labels, confidences, word counts and keyword-set hit counts are NumPy
+columns and the clause texts are (start, end) spans into one string
+buffer, normally the contract text itself, so the risk checks run as
+mask operations over the whole contract instead of per-clause dict
+lookups. record()/records() give the dict view used in JSON responses.
+"""
+from operator import itemgetter
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from src.clause_schema import CLAUSE_LABELS
+from src.critical_clauses import CRITICAL_CLAUSE_TYPES
+from src.risk_rules import MATCHER, STRONG_MIN_HITS, STRONG_MIN_WORDS, word_count
+from src.risk_thresholds import CONFIDENCE_THRESHOLDS
+
+LABEL_NAMES = [CLAUSE_LABELS[i] for i in sorted(CLAUSE_LABELS)]
+LABEL_INDEX = {name: i for i, name in enumerate(LABEL_NAMES)}
+CRITICAL_LABELS = np.array([name in CRITICAL_CLAUSE_TYPES for name in LABEL_NAMES])
+
+HIT_SETS = list(MATCHER.set_names)
+HIT_COLUMNS = {name: i for i, name in enumerate(HIT_SETS)}
+_hit_row = itemgetter(*HIT_SETS)
+
+
+class ClauseBatch:
+    """
+    The classified clauses of one contract as parallel arrays. Clause i
+    is buffer[starts[i]:ends[i]]. When source_offsets is set the buffer
+    is the contract text and the offsets are reported in records.
+    """
+
+    __slots__ = (
+        "clause_ids", "buffer", "starts", "ends", "source_offsets",
+        "labels", "confidences", "words", "hits"
+    )
+
+    def __init__(
+        self,
+        clause_ids: Sequence[str],
+        buffer: str,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        labels: np.ndarray,
+        confidences: np.ndarray,
+        words: np.ndarray,
+        hits: np.ndarray,
+        source_offsets: bool = False
+    ):
+        self.clause_ids = list(clause_ids)
+        self.buffer = buffer
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.source_offsets = source_offsets
+        self.labels = np.asarray(labels, dtype=np.int16)
+        self.confidences = np.asarray(confidences, dtype=np.float64)
+        self.words = np.asarray(words, dtype=np.int32)
+        self.hits = np.asarray(hits, dtype=np.int16).reshape(len(self.starts), len(HIT_SETS))
+
+    @classmethod
+    def from_clauses(cls, clauses: Sequence[Dict], text: str = None) -> "ClauseBatch":
+        """
+        Builds the columns from classified clause dicts. With the contract
+        text, clauses carrying start/end offsets (normalize_clause_spans)
+        are referenced in place; otherwise their texts are joined into a
+        new buffer. Keyword features already cached on the dicts are
+        reused, and new ones are cached on them, as risk_rules does.
+        """
+        unknown = {c["label"] for c in clauses} - LABEL_INDEX.keys()
+        if unknown:
+            raise ValueError(f"Unknown clause labels: {sorted(unknown)}")
+
+        for c in clauses:
+            word_count(c)
+
+        n = len(clauses)
+        if text is not None and all("start" in c for c in clauses):
+            buffer = text
+            starts = np.fromiter((c["start"] for c in clauses), np.int64, n)
+            ends = np.fromiter((c["end"] for c in clauses), np.int64, n)
+        else:
+            text = None
+            buffer = "".join(c["text"] for c in clauses)
+            lengths = np.fromiter((len(c["text"]) for c in clauses), np.int64, n)
+            ends = np.cumsum(lengths)
+            starts = ends - lengths
+
+        return cls(
+            [c["clause_id"] for c in clauses],
+            buffer,
+            starts,
+            ends,
+            np.fromiter((LABEL_INDEX[c["label"]] for c in clauses), np.int16, n),
+            np.fromiter((c["confidence"] for c in clauses), np.float64, n),
+            np.fromiter((c["features"]["words"] for c in clauses), np.int32, n),
+            np.array(
+                [_hit_row(c["features"]["hits"]) for c in clauses],
+                dtype=np.int16
+            ).reshape(n, len(HIT_SETS)),
+            source_offsets=text is not None
+        )
+
+    def __len__(self) -> int:
+        return len(self.clause_ids)
+
+    def text(self, i: int) -> str:
+        return self.buffer[self.starts[i]:self.ends[i]]
+
+    # -------------------------------------------------
+    # Masks
+    # -------------------------------------------------
+    def critical(self) -> np.ndarray:
+        return CRITICAL_LABELS[self.labels]
+
+    def strong(self, keyword_set: str = "STRONG_CLAUSE") -> np.ndarray:
+        return (
+            (self.words >= STRONG_MIN_WORDS)
+            | (self.hits[:, HIT_COLUMNS[keyword_set]] >= STRONG_MIN_HITS)
+        )
+
+    def low_confidence_critical(self, strong_set: str = None) -> np.ndarray:
+        """
+        Critical clauses below the LOW confidence threshold, leaving out
+        clauses that are strong under strong_set when it is given.
+        """
+        mask = self.critical() & (self.confidences < CONFIDENCE_THRESHOLDS["LOW"])
+        if strong_set is not None:
+            mask &= ~self.strong(strong_set)
+        return mask
+
+    def missing_critical(self) -> set:
+        present = np.bincount(self.labels, minlength=len(LABEL_NAMES)) > 0
+        return {
+            LABEL_NAMES[i]
+            for i in np.flatnonzero(CRITICAL_LABELS & ~present)
+        }
+
+    # -------------------------------------------------
+    # Dict view
+    # -------------------------------------------------
+    def record(self, i: int) -> Dict:
+        record = {
+            "clause_id": self.clause_ids[i],
+            "text": self.text(i),
+            "label": LABEL_NAMES[self.labels[i]],
+            "confidence": float(self.confidences[i])
+        }
+        if self.source_offsets:
+            record["start"] = int(self.starts[i])
+            record["end"] = int(self.ends[i])
+        return record
+
+    def records(self, mask: np.ndarray = None) -> List[Dict]:
+        indices = range(len(self)) if mask is None else np.flatnonzero(mask)
+        return [self.record(i) for i in indices]
+
+
+def as_clause_batch(clauses: Union[ClauseBatch, Sequence[Dict]]) -> ClauseBatch:
+    if isinstance(clauses, ClauseBatch):
+        return clauses
+    return ClauseBatch.from_clauses(clauses)
+
+
+def select(clauses: Union[ClauseBatch, Sequence[Dict]], mask: np.ndarray) -> List[Dict]:
+    """
+    The clauses under mask: the original dicts for a list, the dict view
+    for a batch.
+    """
+    if isinstance(clauses, ClauseBatch):
+        return clauses.records(mask)
+    return [clauses[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,174 @@
+"""
+Runs a CUAD sample through the fp32 classifier and a reduced-precision
+mode and reports label agreement, confidence drift, decision flips,
+speedup and model size. Exits non-zero when the mode falls outside the
+accuracy guardrail, so it can gate a precision change.
+
+    python -m src.compare_precision --precision int8 --sample 20
+    python -m src.compare_precision --precision bf16 --model local
+"""
+import argparse
+import copy
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+
+from src.batch_inference import classify_texts
+from src.cuad_corpus import DATA_PATH, open_corpus
+from src.inference_config import INFERENCE_CONFIG
+from src.model_registry import (
+    MODEL_NAME,
+    PRECISIONS,
+    apply_precision,
+    load_model,
+    resolve_precision
+)
+from src.prodoc_pipeline import analyze_contract_text, extract_full_contract_text
+
+
+def model_size_mb(model) -> float:
+    """
+    Serialized state_dict size; counts packed int8 weights correctly.
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def run_mode(contracts: List[Dict], texts: List[str], tokenizer, model) -> Dict:
+    """
+    Analyses every contract with the given model, recording the clause
+    predictions, the decision and the time spent in classification.
+    """
+    predictions = []
+    decisions = []
+    seconds = 0.0
+
+    def classify(clause_texts):
+        nonlocal seconds
+        started = time.perf_counter()
+        result = classify_texts(clause_texts, tokenizer, model)
+        seconds += time.perf_counter() - started
+        predictions.extend(result)
+        return result
+
+    for contract, text in zip(contracts, texts):
+        output = analyze_contract_text(text, contract["title"], classify_fn=classify)
+        decisions.append(output["decision"])
+
+    return {"predictions": predictions, "decisions": decisions, "seconds": seconds}
+
+
+def compare_modes(baseline: Dict, candidate: Dict, titles: List[str]) -> Dict:
+    pairs = list(zip(baseline["predictions"], candidate["predictions"]))
+    agree = sum(a["label"] == b["label"] for a, b in pairs)
+    drift = [abs(a["confidence"] - b["confidence"]) for a, b in pairs]
+
+    flips = [
+        {"title": title, "fp32": a, "candidate": b}
+        for title, a, b in zip(titles, baseline["decisions"], candidate["decisions"])
+        if a != b
+    ]
+
+    return {
+        "clauses": len(pairs),
+        "label_agreement": round(agree / len(pairs), 4) if pairs else 1.0,
+        "confidence_drift_mean": round(sum(drift) / len(drift), 4) if drift else 0.0,
+        "confidence_drift_max": round(max(drift), 4) if drift else 0.0,
+        "decision_flips": flips
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a precision mode against fp32")
+    parser.add_argument("--corpus", type=Path, default=DATA_PATH)
+    parser.add_argument("--sample", type=int, default=20, help="first N CUAD contracts")
+    parser.add_argument("--precision", choices=PRECISIONS, default=INFERENCE_CONFIG["PRECISION"])
+    parser.add_argument("--model", choices=["local", "registry"], default="registry",
+                        help="registry model (default) or the benchmark's small local BERT")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads")
+    parser.add_argument("--min-agreement", type=float, default=0.98,
+                        help="fail below this clause label agreement")
+    parser.add_argument("--max-flips", type=int, default=0,
+                        help="fail above this many decision flips")
+    parser.add_argument("--output", type=Path, help="write the report JSON here")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    contracts = list(open_corpus(args.corpus).iter_contracts(stop=args.sample))
+    texts = [extract_full_contract_text(c) for c in contracts]
+
+    if args.model == "local":
+        from src.benchmark_pipeline import build_local_model
+        # The fast tokenizer reads its vocab file once, at construction
+        with tempfile.TemporaryDirectory(prefix="prodoc-precision-") as work_dir:
+            tokenizer, fp32_model = build_local_model(texts, Path(work_dir))
+    else:
+        tokenizer, fp32_model = load_model(MODEL_NAME, precision="fp32")
+
+    precision = resolve_precision(args.precision)
+    candidate_model = apply_precision(copy.deepcopy(fp32_model), precision)
+
+    # One warm-up pass each so lazy kernel initialisation is not timed
+    for model in (fp32_model, candidate_model):
+        classify_texts(texts[:1], tokenizer, model)
+
+    baseline = run_mode(contracts, texts, tokenizer, fp32_model)
+    candidate = run_mode(contracts, texts, tokenizer, candidate_model)
+
+    fp32_size = model_size_mb(fp32_model)
+    candidate_size = model_size_mb(candidate_model)
+
+    report = {
+        "precision": precision,
+        "model": args.model,
+        "contracts": len(contracts),
+        **compare_modes(baseline, candidate, [c["title"] for c in contracts]),
+        "fp32_seconds": round(baseline["seconds"], 3),
+        "candidate_seconds": round(candidate["seconds"], 3),
+        "speedup": round(baseline["seconds"] / candidate["seconds"], 2)
+        if candidate["seconds"] else 0.0,
+        "fp32_size_mb": round(fp32_size, 1),
+        "candidate_size_mb": round(candidate_size, 1),
+        "memory_saving": round(1 - candidate_size / fp32_size, 3)
+    }
+
+    print(f"{precision} vs fp32 on {report['contracts']} contracts, {report['clauses']} clauses")
+    print(f"label agreement   {100 * report['label_agreement']:.2f}%")
+    print(f"confidence drift  mean {report['confidence_drift_mean']}, "
+          f"max {report['confidence_drift_max']}")
+    print(f"decision flips    {len(report['decision_flips'])}")
+    for flip in report["decision_flips"]:
+        print(f"  - {flip['title']}: {flip['fp32']} -> {flip['candidate']}")
+    print(f"classification    {report['fp32_seconds']}s -> {report['candidate_seconds']}s "
+          f"({report['speedup']}x)")
+    print(f"model size        {report['fp32_size_mb']} MB -> {report['candidate_size_mb']} MB "
+          f"({100 * report['memory_saving']:.0f}% smaller)")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failures = []
+    if report["label_agreement"] < args.min_agreement:
+        failures.append(f"label agreement below {args.min_agreement}")
+    if len(report["decision_flips"]) > args.max_flips:
+        failures.append(f"more than {args.max_flips} decision flips")
+
+    if failures:
+        print("\nGUARDRAIL FAILED: " + "; ".join(failures))
+        return 1
+    print("\nWithin guardrail.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
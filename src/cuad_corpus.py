@@ -0,0 +1,212 @@
+import json
+import mmap
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
+
+INDEX_VERSION = 1
+
+# Strings (with escapes) and structural characters; numbers and literals
+# are never needed to locate contracts, so they are skipped implicitly.
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},]')
+
+
+def build_offset_index(buffer) -> List[Dict]:
+    """
+    Single incremental pass over the raw CUAD bytes that records, for every
+    entry of the top-level "data" array, its title, its byte span and the
+    byte spans of its paragraphs' "qas" arrays. Nothing is materialised
+    beyond those offsets.
+    """
+    contracts = []
+    # Each frame: [container char, pending key, role]
+    stack = []
+    expect_key = False
+    key = None
+    current = None
+
+    for match in _TOKEN.finditer(buffer):
+        token = match.group()
+        first = token[:1]
+
+        if first == b'"':
+            if stack and stack[-1][0] == b"{" and expect_key:
+                key = token
+                expect_key = False
+            elif (
+                key == b'"title"'
+                and current is not None
+                and len(stack) == 3
+            ):
+                current["title"] = json.loads(token.decode("utf-8"))
+            continue
+
+        if first in (b"{", b"["):
+            parent_role = stack[-1][2] if stack else None
+            role = None
+
+            if first == b"[" and len(stack) == 1 and key == b'"data"':
+                role = "data"
+            elif first == b"{" and parent_role == "data":
+                role = "contract"
+                current = {"title": None, "start": match.start(), "qas": []}
+            elif first == b"[" and parent_role == "contract" and key == b'"paragraphs"':
+                role = "paragraphs"
+            elif first == b"{" and parent_role == "paragraphs":
+                role = "paragraph"
+            elif first == b"[" and parent_role == "paragraph" and key == b'"qas"':
+                role = "qas"
+                current["qas"].append([match.start(), None])
+
+            stack.append([first, key, role])
+            expect_key = first == b"{"
+            key = None
+            continue
+
+        if first in (b"}", b"]"):
+            _, _, role = stack.pop()
+            if role == "qas":
+                current["qas"][-1][1] = match.end()
+            elif role == "contract":
+                current["end"] = match.end()
+                contracts.append(current)
+                current = None
+            key = None
+            expect_key = False
+            continue
+
+        # comma
+        if stack and stack[-1][0] == b"{":
+            expect_key = True
+        key = None
+
+    return contracts
+
+
+class CuadCorpus:
+    """
+    Lazy, random-access reader over CUAD_v1.json.
+
+    The first open scans the file once and stores a small offset index next
+    to it; afterwards fetching a contract reads and parses only that
+    contract's bytes, with "qas" payloads cut out unless requested.
+    """
+
+    def __init__(self, path: Union[str, Path] = DATA_PATH, index_path: Optional[Path] = None):
+        self.path = Path(path)
+
+        if not self.path.exists():
+            raise FileNotFoundError(f"Dataset not found at {self.path}")
+
+        if not self.path.is_file():
+            raise IsADirectoryError(f"Expected a file but found a directory at {self.path}")
+
+        self.index_path = Path(index_path) if index_path else self.path.with_suffix(".index.json")
+        self._contracts = self._load_index()
+        self._by_title = {c["title"]: i for i, c in enumerate(self._contracts)}
+
+    def _load_index(self) -> List[Dict]:
+        stat = self.path.stat()
+        fingerprint = {
+            "version": INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("source") == fingerprint:
+                return stored["contracts"]
+
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                contracts = build_offset_index(buffer)
+
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump({"source": fingerprint, "contracts": contracts}, f)
+        except OSError:
+            # Read-only data directory: keep the index in memory only
+            pass
+
+        return contracts
+
+    def __len__(self) -> int:
+        return len(self._contracts)
+
+    def titles(self) -> List[str]:
+        return [c["title"] for c in self._contracts]
+
+    def index_of(self, title: str) -> int:
+        return self._by_title[title]
+
+    def _read(self, entry: Dict, f, with_qas: bool) -> Dict:
+        f.seek(entry["start"])
+        raw = f.read(entry["end"] - entry["start"])
+
+        if not with_qas and entry["qas"]:
+            pieces = []
+            cursor = 0
+            for start, end in entry["qas"]:
+                pieces.append(raw[cursor:start - entry["start"]])
+                pieces.append(b"[]")
+                cursor = end - entry["start"]
+            pieces.append(raw[cursor:])
+            raw = b"".join(pieces)
+
+        return json.loads(raw)
+
+    def get(self, key: Union[int, str], with_qas: bool = False) -> Dict:
+        """
+        Returns one contract by position in the corpus or by title.
+        """
+        index = self._by_title[key] if isinstance(key, str) else key
+        entry = self._contracts[index]
+        with open(self.path, "rb") as f:
+            return self._read(entry, f, with_qas)
+
+    def __getitem__(self, key: Union[int, str]) -> Dict:
+        return self.get(key)
+
+    def iter_contracts(
+        self,
+        with_qas: bool = False,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> Iterator[Dict]:
+        with open(self.path, "rb") as f:
+            for entry in self._contracts[start:stop]:
+                yield self._read(entry, f, with_qas)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_contracts()
+
+
+_corpora = {}
+_corpora_lock = threading.Lock()
+
+
+def open_corpus(path: Union[str, Path] = DATA_PATH) -> CuadCorpus:
+    """
+    Returns a shared CuadCorpus for the given file.
+    """
+    key = str(Path(path).resolve())
+    with _corpora_lock:
+        if key not in _corpora:
+            _corpora[key] = CuadCorpus(path)
+        return _corpora[key]
+
+
+
+def extract_full_contract_text(contract: Dict) -> str:
+    texts = []
+    for p in contract["paragraphs"]:
+        t = p.get("context", "").strip()
+        if t:
+            texts.append(t)
+    return "\n\n".join(texts)
@@ -1,5 +1,10 @@
 DECISION_THRESHOLDS = {
+    # Without highlighted clauses, a score up to this is safe to sign
     "SAFE_TO_SIGN": 5.0,
     "REQUIRES_REVIEW": 15.0,
     "HIGH_RISK": 25.0
 }
+
+# Without highlighted clauses, contracts longer than this (in words) are
+# sent to legal review regardless of their score
+COMPLEX_CONTRACT_WORDS = 1200
@@ -1,16 +1,9 @@
-import json
-from pathlib import Path
-
-from clause_schema import CLAUSE_LABELS
-from critical_clauses import CRITICAL_CLAUSE_TYPES
-from risk_thresholds import CONFIDENCE_THRESHOLDS
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
-
-def load_cuad():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+from src.clause_schema import CLAUSE_LABELS
+from src.batch_inference import classify_texts
+from src.cuad_corpus import open_corpus
+from src.risk_rules import evaluate_rule
+from src.clause_batch import as_clause_batch, select
+from src.clause_segmenter import split_clauses
 
 def extract_full_contract_text(contract):
     paragraphs = contract["paragraphs"]
@@ -21,12 +14,6 @@ def extract_full_contract_text(contract):
             texts.append(t)
     return "\n\n".join(texts)
 
-def basic_clause_split(text):
-    import re
-    pattern = r"\n\s*(?=(ARTICLE\s+[IVXLC]+|\d+\.\d+|\d+\.)\s+)"
-    parts = re.split(pattern, text, flags=re.IGNORECASE)
-    return [p.strip() for p in parts if p and len(p.strip()) > 200]
-
 def normalize_clauses(clauses):
     return [
         {
@@ -39,112 +26,49 @@ def normalize_clauses(clauses):
 
 def load_classified_clauses(contract):
     """
-    For now, we re-run classification inline.
-    Later, this will be refactored into a pipeline.
+    Classifies the clauses of a CUAD contract inline, using the
+    process-wide model from the registry.
     """
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
-    import torch
-
-    MODEL_NAME = "nlpaueb/legal-bert-base-uncased"
-
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(
-        MODEL_NAME,
-        num_labels=len(CLAUSE_LABELS),
-        ignore_mismatched_sizes=True
-    )
-    model.eval()
-
     full_text = extract_full_contract_text(contract)
-    raw = basic_clause_split(full_text)
+    raw = split_clauses(full_text)
     clauses = normalize_clauses(raw)
 
-    for clause in clauses:
-        inputs = tokenizer(
-            clause["text"],
-            truncation=True,
-            padding=True,
-            return_tensors="pt"
-        )
-        with torch.no_grad():
-            outputs = model(**inputs)
+    predictions = classify_texts([c["text"] for c in clauses])
 
-        logits = outputs.logits
-        idx = logits.argmax(dim=1).item()
-        confidence = logits.softmax(dim=1)[0][idx].item()
-
-        clause["label"] = CLAUSE_LABELS.get(idx, "Unknown")
-        clause["confidence"] = confidence
+    for clause, prediction in zip(clauses, predictions):
+        clause["label"] = prediction["label"]
+        clause["confidence"] = prediction["confidence"]
 
     return clauses
 
 def detect_missing_critical_clauses(clauses):
-    present_types = {c["label"] for c in clauses}
-    missing = CRITICAL_CLAUSE_TYPES - present_types
-    return missing
+    return as_clause_batch(clauses).missing_critical()
 
 def detect_low_confidence_critical_clauses(clauses):
-    low_conf = []
-    for c in clauses:
-        if (
-            c["label"] in CRITICAL_CLAUSE_TYPES
-            and c["confidence"] < CONFIDENCE_THRESHOLDS["LOW"]
-        ):
-            low_conf.append(c)
-    return low_conf
-
-from obligation_heuristics import (
-    OBLIGATION_KEYWORDS,
-    ONE_SIDED_PARTY_TERMS,
-    COUNTERPARTY_TERMS,
-    TERMINATION_KEYWORDS
-)
+    return select(clauses, as_clause_batch(clauses).low_confidence_critical())
 
 def detect_one_sided_obligations(clauses):
-    risky_clauses = []
+    return evaluate_rule("ONE_SIDED_OBLIGATION", clauses)["matches"]
 
-    for c in clauses:
-        text = c["text"].lower()
 
-        obligation_hits = sum(
-            1 for k in OBLIGATION_KEYWORDS if k in text
-        )
+def detect_weak_termination_rights(clauses):
+    result = evaluate_rule("WEAK_TERMINATION_RIGHTS", clauses)
 
-        one_sided_hits = sum(
-            1 for p in ONE_SIDED_PARTY_TERMS if p.lower() in text
-        )
+    if not result["in_scope"]:
+        return "NO_TERMINATION_CLAUSE"
 
-        counterparty_hits = sum(
-            1 for p in COUNTERPARTY_TERMS if p.lower() in text
-        )
+    return result["matches"]
 
-        if obligation_hits >= 2 and one_sided_hits > counterparty_hits:
-            risky_clauses.append(c)
 
-    return risky_clauses
+def detect_long_term_commitments(clauses):
+    return evaluate_rule("LONG_TERM_COMMITMENT", clauses)["matches"]
 
 
-def detect_weak_termination_rights(clauses):
-    termination_clauses = [
-        c for c in clauses
-        if c["label"] == "Termination"
-        or any(k in c["text"].lower() for k in TERMINATION_KEYWORDS)
-    ]
-
-    if not termination_clauses:
-        return "NO_TERMINATION_CLAUSE"
-
-    weak = []
-    for c in termination_clauses:
-        text = c["text"].lower()
-        if "only" in text or "sole discretion" in text:
-            weak.append(c)
-
-    return weak
+def detect_ambiguous_grants(clauses):
+    return evaluate_rule("AMBIGUOUS_GRANT", clauses)["matches"]
 
 if __name__ == "__main__":
-    cuad = load_cuad()
-    contract = cuad["data"][0]
+    contract = open_corpus().get(0)
 
     clauses = load_classified_clauses(contract)
 
@@ -195,3 +119,24 @@ if __name__ == "__main__":
             print(f"{c['clause_id']} | {c['label']}")
     else:
         print("Termination rights appear present.")
+
+    long_term = detect_long_term_commitments(clauses)
+    ambiguous = detect_ambiguous_grants(clauses)
+
+    print()
+
+    if long_term:
+        print("RISK: Long-term commitments detected in clauses:")
+        for c in long_term:
+            print(f"{c['clause_id']} | {c['label']}")
+    else:
+        print("No long-term commitments detected.")
+
+    print()
+
+    if ambiguous:
+        print("RISK: Broad or ambiguous grants detected in clauses:")
+        for c in ambiguous:
+            print(f"{c['clause_id']} | {c['label']}")
+    else:
+        print("No ambiguous grants detected.")
@@ -1,12 +1,4 @@
-import json
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
-
-def load_cuad():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+from src.cuad_corpus import open_corpus
 
 def extract_full_contract_text(contract):
     paragraphs = contract["paragraphs"]
@@ -20,9 +12,7 @@ def extract_full_contract_text(contract):
     return "\n\n".join(full_text)
 
 if __name__ == "__main__":
-    cuad_data = load_cuad()
-
-    contract = cuad_data["data"][0]
+    contract = open_corpus().get(0)
     contract_text = extract_full_contract_text(contract)
 
     print("Contract title:")
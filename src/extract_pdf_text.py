@@ -0,0 +1,86 @@
+from collections import deque
+from io import BytesIO
+from typing import Iterator, List, Tuple
+
+import pdfplumber
+
+PAGES_PER_TASK = 16
+
+
+def _page_text(page) -> str:
+    text = page.extract_text() or ""
+    # Drop the page's cached layout objects as soon as its text is out
+    page.close()
+    return text
+
+
+def count_pages(file_bytes: bytes) -> int:
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        return len(pdf.pages)
+
+
+def page_ranges(page_count: int, pages_per_task: int = PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    return [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+def extract_page_range(file_bytes: bytes, start: int, end: int) -> List[str]:
+    """
+    Extracts pages [start, end). Runs inside a worker process.
+    """
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        return [_page_text(pdf.pages[i]) for i in range(start, end)]
+
+
+def iter_pages(file_bytes: bytes) -> Iterator[str]:
+    """
+    Yields page texts one at a time, releasing each page after use,
+    so memory stays flat regardless of page count.
+    """
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        for page in pdf.pages:
+            yield _page_text(page)
+
+
+def iter_pages_parallel(
+    file_bytes: bytes,
+    executor,
+    pages_per_task: int = PAGES_PER_TASK,
+    max_in_flight: int = None
+) -> Iterator[str]:
+    """
+    Splits the document into page ranges extracted by executor workers and
+    yields page texts in order as soon as each range finishes. At most
+    max_in_flight ranges are outstanding at any time.
+    """
+    ranges = page_ranges(count_pages(file_bytes), pages_per_task)
+    max_in_flight = max_in_flight or getattr(executor, "_max_workers", 4) * 2
+
+    pending = deque()
+    next_range = 0
+
+    while pending or next_range < len(ranges):
+        while next_range < len(ranges) and len(pending) < max_in_flight:
+            start, end = ranges[next_range]
+            pending.append(executor.submit(extract_page_range, file_bytes, start, end))
+            next_range += 1
+
+        yield from pending.popleft().result()
+
+
+def extract_pages_parallel(
+    file_bytes: bytes,
+    executor,
+    pages_per_task: int = PAGES_PER_TASK
+) -> List[str]:
+    return list(iter_pages_parallel(file_bytes, executor, pages_per_task))
+
+
+def join_pages(pages) -> str:
+    return "\n\n".join(text for text in pages if text)
+
+
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    return join_pages(iter_pages(file_bytes))
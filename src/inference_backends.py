@@ -0,0 +1,147 @@
+"""
+Inference backends behind the clause classifier.
+
+A backend turns one padded batch (the dict tokenizer.pad returns) into
+float32 logits of shape (batch, labels). batch_inference only talks to
+this interface, so the PyTorch model and the exported ONNX graph are
+interchangeable.
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+import torch
+
+ONNX_OPSET = 17
+ONNX_INPUTS = ("input_ids", "attention_mask")
+
+
+class InferenceBackend:
+    name = "base"
+
+    def logits(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    """
+    Runs the transformers model in-process (any precision mode).
+    """
+    name = "torch"
+
+    def __init__(self, model):
+        model.eval()
+        self.model = model
+
+    def logits(self, inputs):
+        with torch.no_grad():
+            return self.model(**inputs).logits.float()
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Runs an exported classifier under ONNX Runtime on CPU with all graph
+    optimisations enabled. threads=0 lets ORT use every physical core.
+    """
+    name = "onnx"
+
+    def __init__(self, path: Path, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.path = Path(path)
+        self.session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def logits(self, inputs):
+        feed = {name: inputs[name].numpy() for name in self.input_names}
+        return torch.from_numpy(self.session.run(["logits"], feed)[0])
+
+
+def as_backend(model) -> InferenceBackend:
+    """
+    Accepts a backend or a bare transformers model.
+    """
+    if isinstance(model, InferenceBackend):
+        return model
+    return TorchBackend(model)
+
+
+class _ExportWrapper(torch.nn.Module):
+    """
+    Fixes the graph's inputs to (input_ids, attention_mask) and derives
+    BERT's absolute position ids and single-segment token type ids from
+    the input shape. Left to the tracer, both would be baked in for the
+    sample's sequence length.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        position_ids = torch.arange(
+            input_ids.shape[1], device=input_ids.device
+        ).unsqueeze(0).expand_as(input_ids)
+        return self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            token_type_ids=torch.zeros_like(input_ids),
+            position_ids=position_ids
+        ).logits
+
+
+def export_onnx(model, tokenizer, path: Path, quantize: bool = False) -> Path:
+    """
+    Exports an fp32 sequence-classification model with dynamic batch and
+    sequence axes, optionally with dynamic int8 weights. The file is
+    written atomically so concurrent workers never load a partial graph.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    sample = tokenizer(
+        ["Sample clause.", "A slightly longer sample clause for export."],
+        padding=True,
+        return_tensors="pt"
+    )
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".onnx.tmp")
+    os.close(fd)
+    try:
+        model.eval()
+        torch.onnx.export(
+            _ExportWrapper(model),
+            tuple(sample[n] for n in ONNX_INPUTS),
+            tmp,
+            input_names=list(ONNX_INPUTS),
+            output_names=["logits"],
+            dynamic_axes={
+                **{n: {0: "batch", 1: "sequence"} for n in ONNX_INPUTS},
+                "logits": {0: "batch"}
+            },
+            opset_version=ONNX_OPSET,
+            dynamo=False
+        )
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantized = tmp + ".int8"
+            quantize_dynamic(tmp, quantized, weight_type=QuantType.QInt8)
+            os.replace(quantized, tmp)
+
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return path
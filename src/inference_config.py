@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+INFERENCE_CONFIG = {
+    # Padded tokens (batch size x longest sequence) allowed in one forward pass
+    "MAX_BATCH_TOKENS": 8192,
+    "MAX_BATCH_SIZE": 32,
+
+    # Inference backend: "torch" (transformers in-process) or "onnx"
+    # (exported once to ONNX_CACHE_DIR, run under ONNX Runtime).
+    # ONNX_THREADS=0 lets ONNX Runtime use every physical core.
+    "BACKEND": os.environ.get("PRODOC_BACKEND", "torch"),
+    "ONNX_CACHE_DIR": os.environ.get(
+        "PRODOC_ONNX_DIR",
+        str(BASE_DIR / "data" / "cache" / "onnx")
+    ),
+    "ONNX_THREADS": int(os.environ.get("PRODOC_ONNX_THREADS", "0")),
+
+    # Classifier precision on CPU: "fp32", "int8" (dynamic quantisation of
+    # the linear layers) or "bf16" (falls back to fp32 where unsupported)
+    "PRECISION": os.environ.get("PRODOC_PRECISION", "fp32"),
+
+    # Seed for classifier head weights the checkpoint does not provide
+    # (e.g. the 8-label head on a base model), so every process builds
+    # the same head
+    "HEAD_SEED": int(os.environ.get("PRODOC_HEAD_SEED", "0")),
+
+    # Two-tier cascade: a hashed n-gram linear model labels clauses first;
+    # clauses under CASCADE_MARGIN (top-1 minus top-2 probability) or in
+    # CRITICAL_CLAUSE_TYPES escalate to the transformer
+    "CASCADE_ENABLED": os.environ.get("PRODOC_CASCADE", "0") == "1",
+    "CASCADE_MODEL_PATH": os.environ.get(
+        "PRODOC_CASCADE_MODEL",
+        str(BASE_DIR / "data" / "models" / "lexical_classifier.npz")
+    ),
+    "CASCADE_MARGIN": float(os.environ.get("PRODOC_CASCADE_MARGIN", "0.3")),
+
+    # Sliding-window mode: clauses longer than the model context are split
+    # into overlapping windows whose logits are mean-pooled, instead of
+    # being truncated. Windows per clause and per request are capped.
+    "WINDOWED": os.environ.get("PRODOC_WINDOWED", "0") == "1",
+    "WINDOW_MAX_LENGTH": 512,
+    "WINDOW_STRIDE": 128,
+    "MAX_WINDOWS_PER_CLAUSE": 8,
+    "MAX_WINDOWS_PER_REQUEST": 256,
+
+    # Cross-request scheduler: clauses collected into one shared batch
+    "SCHEDULER_MAX_BATCH_SIZE": 64,
+    "SCHEDULER_MAX_WAIT_MS": 10,
+
+    # Clause classification cache (in-memory LRU in front of SQLite)
+    "CACHE_ENABLED": os.environ.get("PRODOC_CACHE_ENABLED", "1") != "0",
+    "CACHE_MEMORY_ENTRIES": 4096,
+    "CACHE_PATH": os.environ.get(
+        "PRODOC_CACHE_PATH",
+        str(BASE_DIR / "data" / "cache" / "clause_cache.sqlite3")
+    ),
+    "CACHE_MAX_DISK_BYTES": 256 * 1024 * 1024
+}
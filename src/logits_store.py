@@ -0,0 +1,422 @@
+"""
+Append-only, memory-mapped store of raw classifier outputs.
+
+Every analysed clause is one row across flat column files:
+
+    logits.bin      float32 [rows, labels]  raw logits, CLAUSE_LABELS order
+    contract.bin    int32   [rows]          corpus index of the contract
+    start.bin       int64   [rows]          clause offsets into the
+    end.bin         int64   [rows]          contract text
+    num_tokens.bin  int32   [rows]
+    words.bin       int32   [rows]          ClauseBatch keyword features
+    hits.bin        int16   [rows, sets]
+
+contracts.jsonl holds one line per appended contract with its row range.
+That line is written after the column data, so it is the commit point:
+rows past the last committed contract are left over from an interrupted
+append and are truncated away on the next open. Appending never rewrites
+existing rows.
+
+A store lives in a directory named after model_identity(), so outputs of
+a different model, weights, precision or cascade go to a separate store,
+and it is built through the same cascade that identity describes. Labels,
+confidences, decisions, highlights and confidence histograms are all
+recomputed from the columns without loading the model.
+
+    python -m src.logits_store build --limit 50
+    python -m src.logits_store summary
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from src.clause_batch import HIT_SETS, LABEL_NAMES, ClauseBatch
+from src.cuad_corpus import BASE_DIR, DATA_PATH, open_corpus
+
+STORE_VERSION = 1
+STORE_DIR = Path(os.environ.get(
+    "PRODOC_LOGITS_STORE_DIR",
+    BASE_DIR / "data" / "cache" / "logits"
+))
+
+COLUMNS = {
+    "logits": (np.float32, (len(LABEL_NAMES),)),
+    "contract": (np.int32, ()),
+    "start": (np.int64, ()),
+    "end": (np.int64, ()),
+    "num_tokens": (np.int32, ()),
+    "words": (np.int32, ()),
+    "hits": (np.int16, (len(HIT_SETS),))
+}
+
+
+def _max_softmax(logits: np.ndarray) -> np.ndarray:
+    logits = np.asarray(logits, dtype=np.float64)
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True, initial=-np.inf))
+    return shifted.max(axis=1, initial=0.0) / shifted.sum(axis=1)
+
+
+class LogitsStore:
+    """
+    One store directory. Appends come from a single writer; readers get
+    read-only memory maps over the committed rows. A read_only store must
+    already exist and is never modified, not even to drop an interrupted
+    append.
+    """
+
+    def __init__(self, directory: Union[str, Path], identity: str = None, read_only: bool = False):
+        self.directory = Path(directory)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._maps = {}
+
+        manifest_path = self.directory / "manifest.json"
+        if read_only and not manifest_path.exists():
+            raise FileNotFoundError(f"No logits store at {self.directory}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest["labels"] != LABEL_NAMES or self.manifest["hit_sets"] != HIT_SETS:
+                raise ValueError(
+                    f"Logits store {self.directory} was built with different "
+                    f"labels or keyword sets; rebuild it"
+                )
+        else:
+            self.manifest = {
+                "version": STORE_VERSION,
+                "identity": identity,
+                "labels": LABEL_NAMES,
+                "hit_sets": HIT_SETS,
+                "columns": {
+                    name: [np.dtype(dtype).name, list(shape)]
+                    for name, (dtype, shape) in COLUMNS.items()
+                }
+            }
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+
+        self._contracts = []
+        index_path = self.directory / "contracts.jsonl"
+        if index_path.exists():
+            torn = False
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    # A torn last line is an uncommitted append
+                    try:
+                        self._contracts.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        torn = True
+                        break
+            if torn and not read_only:
+                with open(index_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(c) + "\n" for c in self._contracts)
+
+        self._position = {c["contract"]: i for i, c in enumerate(self._contracts)}
+        self._rows = self._contracts[-1]["rows"][1] if self._contracts else 0
+        if not read_only:
+            self._truncate_columns()
+
+    def _column_path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    def _truncate_columns(self):
+        for name, (dtype, shape) in COLUMNS.items():
+            row_bytes = np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+            with open(self._column_path(name), "ab") as f:
+                f.truncate(self._rows * row_bytes)
+
+    @property
+    def identity(self) -> str:
+        return self.manifest["identity"]
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, contract: int) -> bool:
+        return contract in self._position
+
+    def contracts(self) -> List[Dict]:
+        return list(self._contracts)
+
+    # -------------------------------------------------
+    # Writing
+    # -------------------------------------------------
+    def append(
+        self,
+        contract: int,
+        title: str,
+        clauses: Sequence[Dict],
+        predictions: Sequence[Dict]
+    ):
+        """
+        Appends one contract: its clause dicts (with start/end offsets and
+        keyword features) and their classify_texts predictions.
+        """
+        from src.risk_rules import word_count
+
+        if self.read_only:
+            raise ValueError(f"Logits store {self.directory} is open read-only")
+        if contract in self._position:
+            raise ValueError(f"Contract {contract} is already in the store")
+
+        n = len(clauses)
+        for c in clauses:
+            word_count(c)
+
+        columns = {
+            "logits": np.array(
+                [p["logits"] for p in predictions], dtype=np.float32
+            ).reshape(n, len(LABEL_NAMES)),
+            "contract": np.full(n, contract, dtype=np.int32),
+            "start": np.fromiter((c.get("start", -1) for c in clauses), np.int64, n),
+            "end": np.fromiter((c.get("end", -1) for c in clauses), np.int64, n),
+            "num_tokens": np.fromiter((p.get("num_tokens", 0) for p in predictions), np.int32, n),
+            "words": np.fromiter((c["features"]["words"] for c in clauses), np.int32, n),
+            "hits": np.array(
+                [[c["features"]["hits"][name] for name in HIT_SETS] for c in clauses],
+                dtype=np.int16
+            ).reshape(n, len(HIT_SETS))
+        }
+
+        entry = {"contract": contract, "title": title, "rows": [self._rows, self._rows + n]}
+        index_path = self.directory / "contracts.jsonl"
+
+        with self._lock:
+            index_size = index_path.stat().st_size if index_path.exists() else 0
+            try:
+                for name, values in columns.items():
+                    with open(self._column_path(name), "ab") as f:
+                        f.write(np.ascontiguousarray(values).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                with open(index_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                # Roll every column (and the index) back to the committed
+                # rows, so a failed append cannot shift later ones
+                self._truncate_columns()
+                with open(index_path, "ab") as f:
+                    f.truncate(index_size)
+                raise
+
+            self._position[contract] = len(self._contracts)
+            self._contracts.append(entry)
+            self._rows += n
+            self._maps = {}
+
+    # -------------------------------------------------
+    # Reading
+    # -------------------------------------------------
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only memory map of one column over the committed rows.
+        """
+        maps = self._maps
+        if name not in maps:
+            dtype, shape = COLUMNS[name]
+            if self._rows == 0:
+                maps[name] = np.zeros((0,) + shape, dtype=dtype)
+            else:
+                maps[name] = np.memmap(
+                    self._column_path(name), dtype=dtype, mode="r",
+                    shape=(self._rows,) + shape
+                )
+        return maps[name]
+
+    def rows(self, contract: int) -> slice:
+        start, stop = self._contracts[self._position[contract]]["rows"]
+        return slice(start, stop)
+
+    def labels(self) -> np.ndarray:
+        return self.column("logits").argmax(axis=1).astype(np.int16)
+
+    def confidences(self) -> np.ndarray:
+        """
+        Softmax probability of the predicted label, per row.
+        """
+        return _max_softmax(self.column("logits"))
+
+    def clause_batch(self, contract: int, text: str = None) -> ClauseBatch:
+        """
+        The stored clauses of one contract as a ClauseBatch. Given the
+        contract text, clause texts and offsets are available too.
+        """
+        rows = self.rows(contract)
+        n = rows.stop - rows.start
+        logits = self.column("logits")[rows]
+
+        if text is not None:
+            buffer = text
+            starts, ends = self.column("start")[rows], self.column("end")[rows]
+        else:
+            buffer = ""
+            starts = ends = np.zeros(n, dtype=np.int64)
+
+        return ClauseBatch(
+            [f"CL-{i:03d}" for i in range(1, n + 1)],
+            buffer,
+            starts,
+            ends,
+            logits.argmax(axis=1),
+            _max_softmax(logits),
+            self.column("words")[rows],
+            self.column("hits")[rows],
+            source_offsets=text is not None
+        )
+
+    def confidence_histogram(self, bins: int = 10) -> Dict:
+        counts, edges = np.histogram(self.confidences(), bins=bins, range=(0.0, 1.0))
+        return {"edges": edges.round(4).tolist(), "counts": counts.tolist()}
+
+    def decisions(self, corpus_path: Union[str, Path] = DATA_PATH, mode: str = "service") -> Dict:
+        """
+        Risk score and decision of every stored contract, recomputed with
+        the current risk rules, weights and thresholds. "service" mode
+        decides as run_prodoc_on_text does (highlight-gated, with the
+        complex-contract and safe-score fallbacks; word counts come from
+        the corpus text); "pipeline" mode uses classify_decision alone, as
+        analyze_contract_text does.
+        """
+        from src.threshold_sweep import contract_decisions, sweep_inputs_from_store
+
+        decisions = contract_decisions(sweep_inputs_from_store(self, corpus_path), mode)
+        decisions["mode"] = mode
+        return decisions
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_logits_store(identity: str = None, root: Path = None, create: bool = True) -> LogitsStore:
+    """
+    Returns the store for a model identity (the current model_identity()
+    by default), creating it on first use. With create=False the store is
+    opened read-only and a missing one raises FileNotFoundError.
+    """
+    if identity is None:
+        from src.model_registry import model_identity
+        identity = model_identity()
+
+    directory = Path(root or STORE_DIR) / identity
+    key = (directory, create)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = LogitsStore(directory, identity, read_only=not create)
+    return store
+
+
+def build_store(
+    store: LogitsStore,
+    corpus_path: Union[str, Path] = DATA_PATH,
+    limit: int = None,
+    token_cache=None
+) -> int:
+    """
+    Classifies every corpus contract that is not in the store yet and
+    appends it. Clauses go through the cascade when it is enabled, as
+    model_identity() says. With a token_cache the clause token IDs are
+    read from it instead of tokenising again. Returns the number of
+    contracts added.
+    """
+    from src.batch_inference import classify_texts, classify_token_ids
+    from src.clause_segmenter import iter_clause_spans
+    from src.lexical_classifier import get_cascade
+    from src.model_registry import model_identity
+    from src.prodoc_pipeline import extract_full_contract_text, normalize_clause_spans
+
+    if store.identity != model_identity():
+        raise ValueError(
+            f"Logits store {store.directory} belongs to model {store.identity}, "
+            f"not the current {model_identity()}"
+        )
+
+    corpus = open_corpus(corpus_path)
+    cascade = get_cascade()
+    added = 0
+
+    for index, title in enumerate(corpus.titles()[:limit]):
+        if index in store:
+            continue
+
+        text = extract_full_contract_text(corpus.get(index))
+        clauses = normalize_clause_spans(text, iter_clause_spans(text))
+        classify_fn = classify_texts
+        if token_cache is not None:
+            token_ids = dict(zip(
+                token_cache.clause_texts(index), token_cache.clause_tokens(index)
+            ))
+
+            def classify_fn(texts):
+                return classify_token_ids([token_ids[t] for t in texts])
+        if cascade is not None:
+            classify_fn = cascade.wrap(classify_fn)
+
+        predictions = classify_fn([c["text"] for c in clauses])
+
+        store.append(index, title, clauses, predictions)
+        added += 1
+        print(f"[{index + 1}] {title}: {len(clauses)} clauses", file=sys.stderr)
+
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped store of clause logits")
+    parser.add_argument("command", choices=["build", "summary"])
+    parser.add_argument("--corpus", type=Path, default=DATA_PATH)
+    parser.add_argument("--store-dir", type=Path, default=STORE_DIR)
+    parser.add_argument("--limit", type=int, help="only consider the first N contracts")
+    parser.add_argument("--token-cache", action="store_true",
+                        help="read clause token IDs from the pre-tokenised cache")
+    parser.add_argument("--bins", type=int, default=10, help="confidence histogram bins")
+    parser.add_argument("--mode", choices=["service", "pipeline"], default="service",
+                        help="decide as the service (default) or as analyze_contract_text")
+    args = parser.parse_args(argv)
+
+    try:
+        store = get_logits_store(root=args.store_dir, create=args.command == "build")
+    except FileNotFoundError as exc:
+        parser.error(f"{exc}; build it first")
+
+    if args.command == "build":
+        token_cache = None
+        if args.token_cache:
+            from src.model_registry import get_classifier
+            from src.token_cache import open_token_cache
+            tokenizer = get_classifier()[0]
+            token_cache = open_token_cache(tokenizer, args.corpus)
+            token_cache.check_tokenizer(tokenizer)
+        added = build_store(store, args.corpus, args.limit, token_cache)
+        print(f"added {added} contracts", file=sys.stderr)
+
+    decisions = store.decisions(args.corpus, args.mode)["decisions"]
+    names, counts = np.unique(decisions, return_counts=True)
+    print(json.dumps({
+        "directory": str(store.directory),
+        "identity": store.identity,
+        "contracts": len(store.contracts()),
+        "clauses": len(store),
+        "mode": args.mode,
+        "decisions": dict(zip(names.tolist(), counts.tolist())),
+        "confidence_histogram": store.confidence_histogram(args.bins)
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
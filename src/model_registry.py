@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Optional
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from src.clause_schema import CLAUSE_LABELS
+from src.inference_config import INFERENCE_CONFIG
+from src.inference_backends import (
+    ONNX_OPSET,
+    OnnxBackend,
+    as_backend,
+    export_onnx
+)
+
+MODEL_NAME = os.environ.get(
+    "PRODOC_MODEL_NAME",
+    "nlpaueb/legal-bert-base-uncased"
+)
+
+PRECISIONS = ("fp32", "int8", "bf16")
+BACKENDS = ("torch", "onnx")
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_classifier = None
+_registered_name = None
+# weights_fingerprint() of the process-wide classifier
+_weights = None
+# Why the last warm_up() failed, for the readiness endpoint
+_warm_up_error = None
+
+
+def bf16_supported() -> bool:
+    return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+
+
+def resolve_backend(backend: str = None) -> str:
+    backend = backend or INFERENCE_CONFIG["BACKEND"]
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {BACKENDS}"
+        )
+    return backend
+
+
+def resolve_precision(precision: str = None, backend: str = None) -> str:
+    """
+    The precision actually used for a requested mode (default:
+    INFERENCE_CONFIG["PRECISION"]). bf16 falls back to fp32 on CPUs
+    without native bf16 support, and under the ONNX backend.
+    """
+    precision = precision or INFERENCE_CONFIG["PRECISION"]
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"Unknown precision {precision!r}, expected one of {PRECISIONS}"
+        )
+    if precision == "bf16" and (
+        resolve_backend(backend) == "onnx" or not bf16_supported()
+    ):
+        return "fp32"
+    return precision
+
+
+def apply_precision(model, precision: str = None):
+    """
+    Returns the fp32 model converted to the given precision. int8 returns
+    a quantised copy; bf16 converts the model in place.
+    """
+    requested = precision or INFERENCE_CONFIG["PRECISION"]
+    precision = resolve_precision(requested, backend="torch")
+    if precision != requested:
+        print(
+            f"{requested} is not supported on this CPU, using {precision}",
+            file=sys.stderr
+        )
+
+    if precision == "int8":
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    elif precision == "bf16":
+        model = model.to(torch.bfloat16)
+
+    model.eval()
+    return model
+
+
+def load_model(model_name=MODEL_NAME, precision: str = None):
+    """
+    Loads the tokenizer and the clause classification head from disk/hub,
+    in the configured precision.
+    Prefer get_classifier(), which does this once per process.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # Head weights missing from the checkpoint are initialised from a
+    # fixed seed, without disturbing the caller's RNG state
+    with torch.random.fork_rng(devices=[]):
+        torch.manual_seed(INFERENCE_CONFIG["HEAD_SEED"])
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name,
+            num_labels=len(CLAUSE_LABELS),
+            ignore_mismatched_sizes=True
+        )
+    model.eval()
+    return tokenizer, apply_precision(model, precision)
+
+
+def weights_fingerprint(model) -> str:
+    """
+    Hash of a model's actual weights: a torch module's state dict, the
+    module behind a TorchBackend, or the graph file of an OnnxBackend.
+    Use it on the fp32 model so it is independent of precision.
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(model, OnnxBackend):
+        with open(model.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+
+    module = getattr(model, "model", model)
+    for name, tensor in module.state_dict().items():
+        if not isinstance(tensor, torch.Tensor):
+            continue
+        tensor = tensor.detach().cpu().contiguous()
+        digest.update(f"{name}\0{tuple(tensor.shape)}\0{tensor.dtype}\0".encode("utf-8"))
+        digest.update(tensor.reshape(-1).view(torch.uint8).numpy())
+    return digest.hexdigest()[:16]
+
+
+def onnx_model_path(model_name=MODEL_NAME, weights: str = None) -> Path:
+    """
+    Where the exported graph for this model, its weights and precision
+    is cached.
+    """
+    key = _fingerprint({
+        "model": model_name,
+        "weights": weights,
+        "labels": CLAUSE_LABELS,
+        "precision": resolve_precision(backend="onnx"),
+        "opset": ONNX_OPSET
+    })
+    return Path(INFERENCE_CONFIG["ONNX_CACHE_DIR"]) / f"{key}.onnx"
+
+
+def load_backend(model_name=MODEL_NAME):
+    """
+    Loads the tokenizer and the configured inference backend and returns
+    (tokenizer, backend, weights fingerprint of the fp32 model). The ONNX
+    graph is exported from the fp32 model on first use and reused from
+    ONNX_CACHE_DIR afterwards.
+    """
+    if resolve_backend() == "torch":
+        tokenizer, model = load_model(model_name, precision="fp32")
+        weights = weights_fingerprint(model)
+        return tokenizer, as_backend(apply_precision(model)), weights
+
+    precision = resolve_precision(backend="onnx")
+    if precision != INFERENCE_CONFIG["PRECISION"]:
+        print(
+            f"{INFERENCE_CONFIG['PRECISION']} is not supported by the ONNX "
+            f"backend, using {precision}",
+            file=sys.stderr
+        )
+
+    # The fp32 weights are loaded either way: the export cache is keyed
+    # on them, so a graph is never reused for a different head
+    tokenizer, model = load_model(model_name, precision="fp32")
+    weights = weights_fingerprint(model)
+    path = onnx_model_path(model_name, weights)
+    if not path.exists():
+        export_onnx(model, tokenizer, path, quantize=precision == "int8")
+    del model
+
+    return tokenizer, OnnxBackend(path, INFERENCE_CONFIG["ONNX_THREADS"]), weights
+
+
+def get_classifier():
+    """
+    Returns the process-wide (tokenizer, backend) pair, loading it on
+    first use.
+    """
+    global _classifier, _weights
+
+    if _classifier is None:
+        with _lock:
+            if _classifier is None:
+                tokenizer, backend, _weights = load_backend()
+                _classifier = (tokenizer, backend)
+
+    return _classifier
+
+
+def register_classifier(tokenizer, model, name: str):
+    """
+    Installs an already-loaded tokenizer and model (or backend) as the
+    process-wide classifier, e.g. a small local model for benchmarks. The
+    name takes the place of MODEL_NAME in model_identity().
+    """
+    global _classifier, _registered_name, _weights
+
+    with _lock:
+        _classifier = (tokenizer, as_backend(model))
+        _registered_name = name
+        _weights = weights_fingerprint(model)
+
+
+def warm_up():
+    """
+    Loads the model and runs one forward pass so the first real request
+    does not pay for lazy initialisation. Marks the registry as ready.
+    A failure is printed, kept for warm_up_error() and re-raised.
+    """
+    global _warm_up_error
+
+    try:
+        tokenizer, backend = get_classifier()
+
+        inputs = tokenizer(
+            "This Agreement shall be governed by the laws of the State.",
+            truncation=True,
+            return_tensors="pt"
+        )
+        backend.logits(inputs)
+    except Exception as exc:
+        _warm_up_error = exc
+        print("Model warm-up failed:", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        raise
+
+    _warm_up_error = None
+    _ready.set()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warm_up_error() -> Optional[str]:
+    """
+    The error of the last failed warm_up(), or None.
+    """
+    return repr(_warm_up_error) if _warm_up_error is not None else None
+
+
+def classifier_identity() -> str:
+    """
+    Fingerprint of everything that changes the transformer's outputs.
+    It never loads the classifier.
+    """
+    return _fingerprint(_classifier_identity())
+
+
+def _classifier_identity() -> dict:
+    identity = {
+        "model": _registered_name or MODEL_NAME,
+        "labels": CLAUSE_LABELS
+    }
+    if _registered_name is not None:
+        # A registered model is already loaded and its name alone does not
+        # pin its weights
+        identity["weights"] = _weights
+    else:
+        # MODEL_NAME always loads to the same weights for a given head seed
+        identity["head_seed"] = INFERENCE_CONFIG["HEAD_SEED"]
+    if resolve_backend() != "torch":
+        identity["backend"] = resolve_backend()
+    if resolve_precision() != "fp32":
+        identity["precision"] = resolve_precision()
+    if INFERENCE_CONFIG["WINDOWED"]:
+        identity["windows"] = [
+            INFERENCE_CONFIG["WINDOW_MAX_LENGTH"],
+            INFERENCE_CONFIG["WINDOW_STRIDE"],
+            INFERENCE_CONFIG["MAX_WINDOWS_PER_CLAUSE"]
+        ]
+    return identity
+
+
+def model_identity() -> str:
+    """
+    Fingerprint of everything that changes classifier outputs: the
+    transformer (classifier_identity) and the cascade in front of it.
+    Caches keyed on it are invalidated when the model, its head seed (or a
+    registered model's weights) or the labels change.
+    """
+    identity = _classifier_identity()
+    if INFERENCE_CONFIG["CASCADE_ENABLED"]:
+        from src.lexical_classifier import lexical_fingerprint
+        identity["cascade"] = [
+            lexical_fingerprint(INFERENCE_CONFIG["CASCADE_MODEL_PATH"]),
+            INFERENCE_CONFIG["CASCADE_MARGIN"]
+        ]
+
+    return _fingerprint(identity)
+
+
+def _fingerprint(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
@@ -1,14 +1,7 @@
-import json
-import re
-from pathlib import Path
 from typing import List, Dict
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
-
-def load_cuad():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+from src.cuad_corpus import open_corpus
+from src.clause_segmenter import split_clauses
 
 def extract_full_contract_text(contract):
     paragraphs = contract["paragraphs"]
@@ -21,18 +14,6 @@ def extract_full_contract_text(contract):
 
     return "\n\n".join(full_text)
 
-def basic_clause_split(text: str) -> List[str]:
-    pattern = r"\n\s*(?=(ARTICLE\s+[IVXLC]+|\d+\.\d+|\d+\.)\s+)"
-    parts = re.split(pattern, text, flags=re.IGNORECASE)
-
-    clauses = []
-    for p in parts:
-        p = p.strip()
-        if len(p) > 200:
-            clauses.append(p)
-
-    return clauses
-
 def normalize_clauses(clauses: List[str]) -> List[Dict]:
     normalized = []
 
@@ -47,11 +28,10 @@ def normalize_clauses(clauses: List[str]) -> List[Dict]:
     return normalized
 
 if __name__ == "__main__":
-    cuad_data = load_cuad()
-    contract = cuad_data["data"][0]
+    contract = open_corpus().get(0)
 
     full_text = extract_full_contract_text(contract)
-    raw_clauses = basic_clause_split(full_text)
+    raw_clauses = split_clauses(full_text)
     clauses = normalize_clauses(raw_clauses)
 
     print("Contract title:")
@@ -25,3 +25,59 @@ TERMINATION_KEYWORDS = {
     "cancellation",
     "expiration"
 }
+
+RESTRICTIVE_TERMINATION_TERMS = {
+    "only",
+    "sole discretion"
+}
+
+LONG_TERM_KEYWORDS = {
+    "perpetual",
+    "in perpetuity",
+    "irrevocable",
+    "automatically renew",
+    "automatically be renewed",
+    "successive renewal",
+    "evergreen"
+}
+
+GRANT_KEYWORDS = {
+    "grant",
+    "license",
+    "licence"
+}
+
+BROAD_GRANT_KEYWORDS = {
+    "any and all",
+    "including but not limited to",
+    "including without limitation",
+    "worldwide",
+    "sublicensable",
+    "for any purpose"
+}
+
+# Language that marks a clause as legally complete and balanced
+STRONG_CLAUSE_KEYWORDS = {
+    "each party",
+    "either party",
+    "shall",
+    "may",
+    "governed by",
+    "indemnify",
+    "termination",
+    "terminate",
+    "liability",
+    "confidential"
+}
+
+# Narrower list used when scoring LOW_CONFIDENCE_CRITICAL_CLAUSE
+SCORING_STRONG_CLAUSE_KEYWORDS = {
+    "each party",
+    "either party",
+    "shall",
+    "may",
+    "governed by",
+    "indemnify",
+    "terminate",
+    "liability"
+}
@@ -1,42 +1,11 @@
 import json
-from pathlib import Path
 
-from src.clause_schema import CLAUSE_LABELS
-from src.critical_clauses import CRITICAL_CLAUSE_TYPES
-from src.risk_thresholds import CONFIDENCE_THRESHOLDS
-from src.risk_weights import RISK_WEIGHTS
-from src.decision_thresholds import DECISION_THRESHOLDS
 from src.aggregate_risk import aggregate_risk, classify_decision
-
-
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import re
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
-
-MODEL_NAME = "nlpaueb/legal-bert-base-uncased"
-
-
-def load_cuad():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def extract_full_contract_text(contract):
-    texts = []
-    for p in contract["paragraphs"]:
-        t = p.get("context", "").strip()
-        if t:
-            texts.append(t)
-    return "\n\n".join(texts)
-
-
-def split_clauses(text):
-    pattern = r"\n\s*(?=(ARTICLE\s+[IVXLC]+|\d+\.\d+|\d+\.)\s+)"
-    parts = re.split(pattern, text, flags=re.IGNORECASE)
-    return [p.strip() for p in parts if p and len(p.strip()) > 200]
+from src.batch_inference import classify_texts
+from src.cuad_corpus import extract_full_contract_text, open_corpus
+from src.risk_rules import is_strong
+from src.clause_batch import as_clause_batch
+from src.clause_segmenter import split_clauses
 
 
 def normalize_clauses(raw_clauses):
@@ -46,77 +15,54 @@ def normalize_clauses(raw_clauses):
     ]
 
 
-def classify_clauses(clauses):
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(
-        MODEL_NAME,
-        num_labels=len(CLAUSE_LABELS),
-        ignore_mismatched_sizes=True
-    )
-    model.eval()
-
-    for c in clauses:
-        inputs = tokenizer(
-            c["text"],
-            truncation=True,
-            padding=True,
-            return_tensors="pt"
-        )
-        with torch.no_grad():
-            outputs = model(**inputs)
-
-        logits = outputs.logits
-        idx = logits.argmax(dim=1).item()
-        confidence = logits.softmax(dim=1)[0][idx].item()
-
-        c["label"] = CLAUSE_LABELS.get(idx, "Unknown")
-        c["confidence"] = confidence
+def normalize_clause_spans(text, spans):
+    """
+    Clause dicts for clause_segmenter spans, keeping start/end offsets
+    into text and the section heading.
+    """
+    return [
+        {
+            "clause_id": f"CL-{i:03d}",
+            "text": text[span.start:span.end],
+            "start": span.start,
+            "end": span.end,
+            "heading": span.heading
+        }
+        for i, span in enumerate(spans, start=1)
+    ]
+
+
+def classify_clauses(clauses, classify_fn=classify_texts):
+    predictions = classify_fn([c["text"] for c in clauses])
+
+    for c, prediction in zip(clauses, predictions):
+        c["label"] = prediction["label"]
+        c["confidence"] = prediction["confidence"]
 
     return clauses
 
 def is_structurally_strong_clause(clause_text: str) -> bool:
-    words = clause_text.split()
-
-    if len(words) >= 60:
-        return True
-
-    strong_keywords = [
-        "each party",
-        "either party",
-        "shall",
-        "may",
-        "governed by",
-        "indemnify",
-        "terminate",
-        "liability"
-    ]
-
-    hits = sum(1 for k in strong_keywords if k in clause_text.lower())
-    return hits >= 2
+    return is_strong({"text": clause_text}, "SCORING_STRONG_CLAUSE")
 
 def detect_risks(clauses):
+    """
+    clauses: a ClauseBatch or a list of classified clause dicts.
+    """
+    batch = as_clause_batch(clauses)
     risks = []
 
-    present_types = {c["label"] for c in clauses}
-    missing = CRITICAL_CLAUSE_TYPES - present_types
+    missing = batch.missing_critical()
     if missing:
         risks.append({
             "id": "MISSING_CRITICAL_CLAUSE",
             "count": len(missing)
         })
 
-    low_conf = [
-    c for c in clauses
-    if c["label"] in CRITICAL_CLAUSE_TYPES
-    and c["confidence"] < CONFIDENCE_THRESHOLDS["LOW"]
-    and not is_structurally_strong_clause(c["text"])
-]
-
-
+    low_conf = int(batch.low_confidence_critical("SCORING_STRONG_CLAUSE").sum())
     if low_conf:
         risks.append({
             "id": "LOW_CONFIDENCE_CRITICAL_CLAUSE",
-            "count": len(low_conf)
+            "count": low_conf
         })
 
     return risks
@@ -130,26 +76,41 @@ def generate_summary(decision, breakdown):
     return "Contract presents high legal risk due to missing or unreliable critical clauses."
 
 
-if __name__ == "__main__":
-    cuad = load_cuad()
-    contract = cuad["data"][0]
+def analyze_contract_text(text, title, classify_fn=classify_texts):
+    """
+    Runs the full pipeline on one contract's text and returns the
+    pipeline output consumed by generate_report.
+    """
+    return analyze_clause_texts(split_clauses(text), title, classify_fn=classify_fn)
 
-    text = extract_full_contract_text(contract)
-    raw_clauses = split_clauses(text)
+
+def analyze_clause_texts(raw_clauses, title, classify_fn=classify_texts):
+    """
+    analyze_contract_text for a contract that is already split into
+    clauses (e.g. read back from the token cache).
+    """
     clauses = normalize_clauses(raw_clauses)
-    clauses = classify_clauses(clauses)
+    clauses = classify_clauses(clauses, classify_fn=classify_fn)
 
     detected_risks = detect_risks(clauses)
     score, breakdown = aggregate_risk(detected_risks)
     decision = classify_decision(score)
     summary = generate_summary(decision, breakdown)
 
-    output = {
-        "contract_title": contract["title"],
+    return {
+        "contract_title": title,
         "decision": decision,
         "risk_score": score,
         "risks": breakdown,
-        "summary": summary
+        "summary": summary,
+        "clause_count": len(clauses)
     }
 
+
+if __name__ == "__main__":
+    contract = open_corpus().get(0)
+
+    text = extract_full_contract_text(contract)
+    output = analyze_contract_text(text, contract["title"])
+
     print(json.dumps(output, indent=2))
@@ -0,0 +1,103 @@
+from typing import Callable, Dict, List
+
+from src.keyword_matcher import KeywordMatcher
+from src.risk_schema import KEYWORD_SETS, RISK_RULES
+
+MATCHER = KeywordMatcher(KEYWORD_SETS)
+
+# is_strong: a clause this long, or with this many keyword hits, is
+# structurally strong (ClauseBatch.strong uses the same constants)
+STRONG_MIN_WORDS = 60
+STRONG_MIN_HITS = 2
+
+def clause_features(clause: Dict) -> Dict:
+    """
+    Keyword-set hit counts for a clause, computed with a single scan and
+    cached on the clause dict. The word count is filled in on demand.
+    """
+    features = clause.get("features")
+    if features is None:
+        features = {"words": None, "hits": MATCHER.counts(clause["text"])}
+        clause["features"] = features
+    return features
+
+
+def word_count(clause: Dict) -> int:
+    features = clause.get("features")
+    if features is None:
+        features = clause_features(clause)
+    if features["words"] is None:
+        features["words"] = len(clause["text"].split())
+    return features["words"]
+
+
+def is_strong(clause: Dict, keyword_set: str = "STRONG_CLAUSE") -> bool:
+    """
+    A clause is structurally strong if it is long (STRONG_MIN_WORDS+
+    words) or uses at least STRONG_MIN_HITS keywords of the given set.
+    """
+    return (
+        word_count(clause) >= STRONG_MIN_WORDS
+        or clause_features(clause)["hits"][keyword_set] >= STRONG_MIN_HITS
+    )
+
+
+def compile_condition(condition: Dict) -> Callable[[Dict, Dict], bool]:
+    """
+    Turns one declarative condition into a predicate over
+    (clause, hit counts).
+    """
+    if "any" in condition:
+        options = [compile_condition(c) for c in condition["any"]]
+        return lambda clause, hits: any(o(clause, hits) for o in options)
+
+    if "label" in condition:
+        label = condition["label"]
+        return lambda clause, hits: clause.get("label") == label
+
+    if "at_least" in condition:
+        name, minimum = condition["hits"], condition["at_least"]
+        return lambda clause, hits: hits[name] >= minimum
+
+    if "more_than" in condition:
+        name, other = condition["hits"], condition["more_than"]
+        return lambda clause, hits: hits[name] > hits[other]
+
+    raise ValueError(f"Unknown rule condition: {condition}")
+
+
+def compile_rule(rule: Dict) -> Dict:
+    return {
+        "id": rule["id"],
+        "scope": [compile_condition(c) for c in rule.get("scope", [])],
+        "when": [compile_condition(c) for c in rule["when"]]
+    }
+
+
+COMPILED_RULES = {rule["id"]: compile_rule(rule) for rule in RISK_RULES}
+
+
+def evaluate_rule(rule_id: str, clauses: List[Dict]) -> Dict:
+    """
+    Returns how many clauses were in the rule's scope and which of them
+    it flagged.
+    """
+    rule = COMPILED_RULES[rule_id]
+    scope, when = rule["scope"], rule["when"]
+
+    in_scope = 0
+    matches = []
+
+    for clause in clauses:
+        hits = clause_features(clause)["hits"]
+        if not all(test(clause, hits) for test in scope):
+            continue
+        in_scope += 1
+        if all(test(clause, hits) for test in when):
+            matches.append(clause)
+
+    return {"in_scope": in_scope, "matches": matches}
+
+
+def evaluate_rules(clauses: List[Dict]) -> Dict[str, Dict]:
+    return {rule_id: evaluate_rule(rule_id, clauses) for rule_id in COMPILED_RULES}
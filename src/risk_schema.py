@@ -1,5 +1,18 @@
 from typing import Dict, List
 
+from src.obligation_heuristics import (
+    OBLIGATION_KEYWORDS,
+    ONE_SIDED_PARTY_TERMS,
+    COUNTERPARTY_TERMS,
+    TERMINATION_KEYWORDS,
+    RESTRICTIVE_TERMINATION_TERMS,
+    LONG_TERM_KEYWORDS,
+    GRANT_KEYWORDS,
+    BROAD_GRANT_KEYWORDS,
+    STRONG_CLAUSE_KEYWORDS,
+    SCORING_STRONG_CLAUSE_KEYWORDS
+)
+
 RISK_SIGNALS = [
     {
         "id": "MISSING_CRITICAL_CLAUSE",
@@ -32,3 +45,66 @@ RISK_SIGNALS = [
         "severity": "MEDIUM"
     }
 ]
+
+# Every keyword set the rules below refer to. All of them are compiled into
+# one matcher, so a clause is scanned once no matter how many rules exist.
+KEYWORD_SETS = {
+    "OBLIGATION": OBLIGATION_KEYWORDS,
+    "ONE_SIDED_PARTY": ONE_SIDED_PARTY_TERMS,
+    "COUNTERPARTY": COUNTERPARTY_TERMS,
+    "TERMINATION": TERMINATION_KEYWORDS,
+    "RESTRICTIVE_TERMINATION": RESTRICTIVE_TERMINATION_TERMS,
+    "LONG_TERM": LONG_TERM_KEYWORDS,
+    "GRANT": GRANT_KEYWORDS,
+    "BROAD_GRANT": BROAD_GRANT_KEYWORDS,
+    "STRONG_CLAUSE": STRONG_CLAUSE_KEYWORDS,
+    "SCORING_STRONG_CLAUSE": SCORING_STRONG_CLAUSE_KEYWORDS
+}
+
+# Clause-level detection rules.
+#   scope: conditions selecting the clauses a rule looks at (default: all)
+#   when:  conditions a clause in scope must meet to be flagged
+# Conditions:
+#   {"hits": SET, "at_least": n}      distinct keywords of SET in the clause
+#   {"hits": SET, "more_than": SET2}  SET has more hits than SET2
+#   {"label": LABEL}                  classifier label
+#   {"any": [conditions]}             at least one condition holds
+RISK_RULES = [
+    {
+        "id": "ONE_SIDED_OBLIGATION",
+        "when": [
+            {"hits": "OBLIGATION", "at_least": 2},
+            {"hits": "ONE_SIDED_PARTY", "more_than": "COUNTERPARTY"}
+        ]
+    },
+    {
+        "id": "WEAK_TERMINATION_RIGHTS",
+        "scope": [
+            {"any": [
+                {"label": "Termination"},
+                {"hits": "TERMINATION", "at_least": 1}
+            ]}
+        ],
+        "when": [
+            {"hits": "RESTRICTIVE_TERMINATION", "at_least": 1}
+        ]
+    },
+    {
+        "id": "LONG_TERM_COMMITMENT",
+        "when": [
+            {"hits": "LONG_TERM", "at_least": 1}
+        ]
+    },
+    {
+        "id": "AMBIGUOUS_GRANT",
+        "scope": [
+            {"any": [
+                {"label": "License / Grant"},
+                {"hits": "GRANT", "at_least": 1}
+            ]}
+        ],
+        "when": [
+            {"hits": "BROAD_GRANT", "at_least": 1}
+        ]
+    }
+]
@@ -1,40 +1,16 @@
-import json
-from generate_report import generate_decision_report
-from prodoc_pipeline import load_cuad
+from src.generate_report import generate_decision_report
+from src.cuad_corpus import open_corpus
 
 if __name__ == "__main__":
-    from prodoc_pipeline import (
+    from src.prodoc_pipeline import (
         extract_full_contract_text,
-        split_clauses,
-        normalize_clauses,
-        classify_clauses,
-        detect_risks,
-        aggregate_risk,
-        classify_decision,
-        generate_summary
+        analyze_contract_text
     )
 
-    cuad = load_cuad()
-    contract = cuad["data"][0]
+    contract = open_corpus().get(0)
 
     text = extract_full_contract_text(contract)
-    raw = split_clauses(text)
-    clauses = normalize_clauses(raw)
-    clauses = classify_clauses(clauses)
-
-    detected_risks = detect_risks(clauses)
-    score, breakdown = aggregate_risk(detected_risks)
-    decision = classify_decision(score)
-    summary = generate_summary(decision, breakdown)
-
-    pipeline_output = {
-        "contract_title": contract["title"],
-        "decision": decision,
-        "risk_score": score,
-        "risks": breakdown,
-        "summary": summary
-    }
+    pipeline_output = analyze_contract_text(text, contract["title"])
 
     report = generate_decision_report(pipeline_output)
     print(report)
-    
\ No newline at end of file
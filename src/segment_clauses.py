@@ -1,13 +1,5 @@
-import json
-import re
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "data" / "contracts" / "CUAD_v1.json"
-
-def load_cuad():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+from src.cuad_corpus import open_corpus
+from src.clause_segmenter import split_clauses
 
 def extract_full_contract_text(contract):
     paragraphs = contract["paragraphs"]
@@ -20,31 +12,11 @@ def extract_full_contract_text(contract):
 
     return "\n\n".join(full_text)
 
-def basic_clause_split(text):
-    """
-    Split contract text using common legal clause patterns:
-    - Section numbers (e.g., '1.', '2.1', 'ARTICLE IV')
-    - Capitalized headings
-    """
-
-    pattern = r"\n\s*(?=(ARTICLE\s+[IVXLC]+|\d+\.\d+|\d+\.)\s+)"
-
-    clauses = re.split(pattern, text, flags=re.IGNORECASE)
-
-    cleaned_clauses = []
-    for c in clauses:
-        c = c.strip()
-        if len(c) > 200:
-            cleaned_clauses.append(c)
-
-    return cleaned_clauses
-
 if __name__ == "__main__":
-    cuad_data = load_cuad()
-    contract = cuad_data["data"][0]
+    contract = open_corpus().get(0)
 
     full_text = extract_full_contract_text(contract)
-    clauses = basic_clause_split(full_text)
+    clauses = split_clauses(full_text)
 
     print("Contract title:")
     print(contract["title"])
@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+
+from src.aggregate_risk import (
+    RISK_IDS,
+    aggregate_risk,
+    aggregate_risk_batch,
+    classify_decision,
+    classify_decision_batch,
+    risk_count_matrix
+)
+from src.decision_thresholds import DECISION_THRESHOLDS
+
+CONTRACTS = 20000
+
+
+def random_detected_risks(rng):
+    """
+    One contract's detect_risks()-style list, sometimes with a risk id
+    that carries no weight.
+    """
+    risks = [
+        {"id": risk_id, "count": rng.randint(0, 9)}
+        for risk_id in rng.sample(RISK_IDS, rng.randint(0, len(RISK_IDS)))
+    ]
+    if rng.random() < 0.2:
+        risks.append({"id": "UNKNOWN_RISK", "count": 3})
+    return risks
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    portfolio = [random_detected_risks(rng) for _ in range(CONTRACTS)]
+
+    scores, contributions = aggregate_risk_batch(risk_count_matrix(portfolio))
+    decisions = classify_decision_batch(scores)
+
+    for i, detected_risks in enumerate(portfolio):
+        score, breakdown = aggregate_risk(detected_risks)
+        assert scores[i] == score, (i, scores[i], score)
+        assert decisions[i] == classify_decision(score), i
+        for entry in breakdown:
+            if entry["risk_id"] in RISK_IDS:
+                j = RISK_IDS.index(entry["risk_id"])
+                assert contributions[i, j] == entry["contribution"], (i, entry)
+
+    # Scores on and around the decision thresholds
+    edges = [0.0] + [
+        value + offset
+        for value in DECISION_THRESHOLDS.values()
+        for offset in (-0.01, 0.0, 0.01)
+    ]
+    assert classify_decision_batch(np.array(edges)).tolist() == [
+        classify_decision(score) for score in edges
+    ], edges
+
+    print("Contracts compared:", CONTRACTS)
+    print("Threshold edge scores:", len(edges))
+    print("\naggregate_risk_batch / classify_decision_batch match the scalar path.")
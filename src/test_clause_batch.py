@@ -0,0 +1,88 @@
+import random
+
+from src.clause_batch import ClauseBatch
+from src.clause_schema import CLAUSE_LABELS
+from src.critical_clauses import CRITICAL_CLAUSE_TYPES
+from src.detect_risks import (
+    detect_low_confidence_critical_clauses,
+    detect_missing_critical_clauses
+)
+from src.prodoc_pipeline import detect_risks
+from src.risk_rules import is_strong
+from src.risk_schema import KEYWORD_SETS
+from src.risk_thresholds import CONFIDENCE_THRESHOLDS
+
+TRIALS = 300
+
+
+# The per-clause dict loops ClauseBatch replaced
+def dict_low_confidence(clauses, strong_set=None):
+    return [
+        c for c in clauses
+        if c["label"] in CRITICAL_CLAUSE_TYPES
+        and c["confidence"] < CONFIDENCE_THRESHOLDS["LOW"]
+        and (strong_set is None or not is_strong(c, strong_set))
+    ]
+
+
+def dict_detect_risks(clauses):
+    risks = []
+    missing = CRITICAL_CLAUSE_TYPES - {c["label"] for c in clauses}
+    if missing:
+        risks.append({"id": "MISSING_CRITICAL_CLAUSE", "count": len(missing)})
+    low_conf = dict_low_confidence(clauses, "SCORING_STRONG_CLAUSE")
+    if low_conf:
+        risks.append({"id": "LOW_CONFIDENCE_CRITICAL_CLAUSE", "count": len(low_conf)})
+    return risks
+
+
+def random_clauses(rng):
+    """
+    Clauses around the strong-clause limits and the LOW threshold, built
+    from keyword-set vocabulary so hit counts vary.
+    """
+    vocabulary = [k for keywords in KEYWORD_SETS.values() for k in keywords]
+    vocabulary += "the party of and to".split()
+    labels = rng.sample(list(CLAUSE_LABELS.values()), rng.randint(1, 8))
+    low = CONFIDENCE_THRESHOLDS["LOW"]
+    return [
+        {
+            "clause_id": f"CL-{i:03d}",
+            "text": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 90))),
+            "label": rng.choice(labels),
+            "confidence": rng.choice([low, low - 1e-5, 0.1, rng.random()])
+        }
+        for i in range(1, rng.randint(0, 30) + 1)
+    ]
+
+
+if __name__ == "__main__":
+    rng = random.Random(1)
+    clauses_checked = 0
+
+    for trial in range(TRIALS):
+        clauses = random_clauses(rng)
+        # Fresh copies, so the dict path does not reuse cached features
+        reference = [dict(c) for c in clauses]
+        batch = ClauseBatch.from_clauses(clauses)
+
+        assert detect_risks(batch) == dict_detect_risks(reference), trial
+        assert detect_risks(clauses) == dict_detect_risks(reference), trial
+        assert detect_missing_critical_clauses(clauses) == (
+            CRITICAL_CLAUSE_TYPES - {c["label"] for c in reference}
+        ), trial
+        assert detect_low_confidence_critical_clauses(clauses) == dict_low_confidence(reference), trial
+
+        for strong_set in ("STRONG_CLAUSE", "SCORING_STRONG_CLAUSE"):
+            assert batch.strong(strong_set).tolist() == [
+                is_strong(c, strong_set) for c in reference
+            ], (trial, strong_set)
+            assert [
+                r["clause_id"] for r in batch.records(batch.low_confidence_critical(strong_set))
+            ] == [c["clause_id"] for c in dict_low_confidence(reference, strong_set)], (trial, strong_set)
+
+        assert [r["text"] for r in batch.records()] == [c["text"] for c in reference], trial
+        clauses_checked += len(clauses)
+
+    print("Random contracts:", TRIALS, "clauses:", clauses_checked)
+    print("\nClauseBatch masks match the per-clause dict path.")
@@ -0,0 +1,44 @@
+import tempfile
+from pathlib import Path
+
+from src.batch_inference import classify_texts
+from src.cuad_corpus import open_corpus
+from src.inference_backends import OnnxBackend, TorchBackend, export_onnx
+from src.model_registry import MODEL_NAME, load_model
+from src.prodoc_pipeline import extract_full_contract_text, split_clauses
+
+SAMPLE_CONTRACTS = 5
+MAX_LOGIT_DIFF = 1e-3
+
+if __name__ == "__main__":
+    tokenizer, model = load_model(MODEL_NAME, precision="fp32")
+    path = export_onnx(model, tokenizer, Path(tempfile.mkdtemp()) / "parity.onnx")
+
+    clauses = []
+    for contract in open_corpus().iter_contracts(stop=SAMPLE_CONTRACTS):
+        clauses.extend(split_clauses(extract_full_contract_text(contract)))
+    assert clauses, f"no clauses found in the first {SAMPLE_CONTRACTS} contracts"
+
+    expected = classify_texts(clauses, tokenizer, TorchBackend(model))
+    actual = classify_texts(clauses, tokenizer, OnnxBackend(path))
+
+    max_diff = max(
+        (
+            abs(a - b)
+            for e, o in zip(expected, actual)
+            for a, b in zip(e["logits"], o["logits"])
+        ),
+        default=0.0
+    )
+    mismatched = [
+        i for i, (e, o) in enumerate(zip(expected, actual))
+        if e["label"] != o["label"]
+    ]
+
+    print("Clauses compared:", len(clauses))
+    print("Max logit difference:", max_diff)
+    print("Label mismatches:", len(mismatched))
+
+    assert max_diff < MAX_LOGIT_DIFF, "ONNX logits drift from the torch path"
+    assert not mismatched, f"labels differ for clauses {mismatched}"
+    print("\nONNX backend matches the torch path.")
@@ -0,0 +1,111 @@
+import random
+
+from src.aggregate_risk import DECISIONS, aggregate_risk, classify_decision
+from src.clause_batch import ClauseBatch
+from src.clause_schema import CLAUSE_LABELS
+from src.critical_clauses import CRITICAL_CLAUSE_TYPES
+from src.decision_thresholds import COMPLEX_CONTRACT_WORDS, DECISION_THRESHOLDS
+from src.prodoc_pipeline import detect_risks
+from src.risk_schema import KEYWORD_SETS
+from src.risk_thresholds import CONFIDENCE_THRESHOLDS
+from src.risk_weights import RISK_WEIGHTS
+from src.threshold_sweep import contract_decisions, sweep, sweep_inputs, sweep_records
+
+CONTRACTS = 150
+SAMPLED_CONFIGS = 40
+
+GRID = {
+    "LOW": [0.05, 0.2, 0.3, 0.45],
+    "MISSING_CRITICAL_CLAUSE": [1, 3, 4.5],
+    "LOW_CONFIDENCE_CRITICAL_CLAUSE": [0.25, 0.5, 2],
+    "REQUIRES_REVIEW": [5, 10, 15],
+    "HIGH_RISK": [15, 25],
+    "SAFE_SCORE": [3, 5, 8],
+    "COMPLEX_WORDS": [300, 1200]
+}
+
+
+def random_contract(rng):
+    """
+    A classified contract as a ClauseBatch, and its word count.
+    """
+    vocabulary = [k for keywords in KEYWORD_SETS.values() for k in keywords]
+    vocabulary += "the party of and to".split()
+    critical = sorted(CRITICAL_CLAUSE_TYPES)
+    other = sorted(set(CLAUSE_LABELS.values()) - CRITICAL_CLAUSE_TYPES)
+    clauses = [
+        {
+            "clause_id": f"CL-{i:03d}",
+            "text": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 90))),
+            "label": rng.choice(critical if rng.random() < 0.6 else other),
+            "confidence": rng.random() * 0.6
+        }
+        for i in range(1, rng.randint(0, 15) + 1)
+    ]
+    return ClauseBatch.from_clauses(clauses), rng.randint(50, 2500)
+
+
+def scalar_decision(batch, words, mode, complex_words=COMPLEX_CONTRACT_WORDS):
+    """
+    detect_risks + aggregate_risk, then run_prodoc_on_text's decision
+    (service) or classify_decision alone (pipeline), under the current
+    settings.
+    """
+    score, _ = aggregate_risk(detect_risks(batch))
+    if mode == "pipeline" or batch.low_confidence_critical("STRONG_CLAUSE").any():
+        return score, classify_decision(score)
+    if words > complex_words:
+        return score, "REQUIRES_LEGAL_REVIEW"
+    if score <= DECISION_THRESHOLDS["SAFE_TO_SIGN"]:
+        return score, "SAFE_TO_SIGN"
+    return score, "REQUIRES_LEGAL_REVIEW"
+
+
+def apply_settings(settings):
+    """
+    Installs one sweep configuration in the settings dicts and returns
+    its complex-contract word count.
+    """
+    CONFIDENCE_THRESHOLDS["LOW"] = settings["LOW"]
+    for risk_id in RISK_WEIGHTS:
+        RISK_WEIGHTS[risk_id] = settings[risk_id]
+    DECISION_THRESHOLDS["REQUIRES_REVIEW"] = settings["REQUIRES_REVIEW"]
+    DECISION_THRESHOLDS["HIGH_RISK"] = settings["HIGH_RISK"]
+    DECISION_THRESHOLDS["SAFE_TO_SIGN"] = settings.get("SAFE_SCORE", DECISION_THRESHOLDS["SAFE_TO_SIGN"])
+    return settings.get("COMPLEX_WORDS", COMPLEX_CONTRACT_WORDS)
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    contracts = [random_contract(rng) for _ in range(CONTRACTS)]
+    batches = [batch for batch, _ in contracts]
+    inputs = sweep_inputs(batches, [words for _, words in contracts])
+    defaults = (
+        dict(CONFIDENCE_THRESHOLDS), dict(RISK_WEIGHTS), dict(DECISION_THRESHOLDS)
+    )
+
+    for mode in ("service", "pipeline"):
+        # Per contract, under the current settings
+        result = contract_decisions(inputs, mode)
+        for i, (batch, words) in enumerate(contracts):
+            score, decision = scalar_decision(batch, words, mode)
+            assert result["scores"][i] == score, (mode, i)
+            assert result["decisions"][i] == decision, (mode, i)
+
+        # Decision counts of sampled grid configurations
+        records = sweep_records(sweep(inputs, GRID, mode))
+        for record in rng.sample(records, SAMPLED_CONFIGS):
+            complex_words = apply_settings(record["settings"])
+            expected = {decision: 0 for decision in DECISIONS.tolist()}
+            for batch, words in contracts:
+                expected[scalar_decision(batch, words, mode, complex_words)[1]] += 1
+            assert record["decisions"] == expected, (mode, record)
+
+            CONFIDENCE_THRESHOLDS.update(defaults[0])
+            RISK_WEIGHTS.update(defaults[1])
+            DECISION_THRESHOLDS.update(defaults[2])
+
+        print(f"{mode}: {CONTRACTS} contracts, {len(records)} configurations, "
+              f"{SAMPLED_CONFIGS} checked")
+
+    print("\nThe sweep matches detect_risks, aggregate_risk and the service decision.")
@@ -0,0 +1,347 @@
+"""
+Re-scores the corpus over a grid of threshold and weight settings from
+cached classifier outputs, without running the model.
+
+Per-clause labels and confidences come from the logits store (or any list
+of ClauseBatch objects). Everything that does not depend on the settings
+(missing critical clauses, structural strength, contract length) is
+computed once; each setting is then a handful of array operations over
+all contracts:
+
+    LOW             CONFIDENCE_THRESHOLDS["LOW"] for the low-confidence
+                    signal and the highlights
+    <risk id>       RISK_WEIGHTS entries
+    REQUIRES_REVIEW, HIGH_RISK
+                    DECISION_THRESHOLDS used by classify_decision
+    SAFE_SCORE      score at or below which a contract without highlights
+                    is safe (DECISION_THRESHOLDS["SAFE_TO_SIGN"])
+    COMPLEX_WORDS   word count above which a contract without highlights
+                    needs review (COMPLEX_CONTRACT_WORDS)
+
+In "service" mode (default) decisions follow run_prodoc_on_text,
+including the complex-contract override; "pipeline" mode uses
+classify_decision alone, as analyze_contract_text does.
+
+    python -m src.threshold_sweep --low 0.1:0.5:0.05 \\
+        --weight LOW_CONFIDENCE_CRITICAL_CLAUSE=0.25,0.5,1 \\
+        --review 10:20:2.5 --high 20:30:2.5 --output runs/sweep.json
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+from src.aggregate_risk import DECISIONS, RISK_IDS
+from src.clause_batch import ClauseBatch
+from src.cuad_corpus import DATA_PATH, extract_full_contract_text, open_corpus
+from src.decision_thresholds import COMPLEX_CONTRACT_WORDS, DECISION_THRESHOLDS
+from src.risk_thresholds import CONFIDENCE_THRESHOLDS
+from src.risk_weights import RISK_WEIGHTS
+
+SAFE, REVIEW, HIGH = range(len(DECISIONS))
+
+# detect_risks only emits these two signals
+_MISSING = RISK_IDS.index("MISSING_CRITICAL_CLAUSE")
+_LOW_CONFIDENCE = RISK_IDS.index("LOW_CONFIDENCE_CRITICAL_CLAUSE")
+
+
+class SweepInputs(NamedTuple):
+    """
+    Setting-independent facts about every clause and contract.
+    """
+    contracts: List
+    # Per clause
+    positions: np.ndarray       # contract position of each clause
+    confidences: np.ndarray
+    scoring_candidates: np.ndarray  # critical and not SCORING_STRONG_CLAUSE-strong
+    highlight_candidates: np.ndarray  # critical and not STRONG_CLAUSE-strong
+    # Per contract
+    missing: np.ndarray         # missing critical clause types
+    words: np.ndarray           # contract word count
+
+
+def sweep_inputs(batches: Sequence[ClauseBatch], contract_words: Sequence[int],
+                 contracts: Sequence = None) -> SweepInputs:
+    """
+    Builds the sweep inputs from one ClauseBatch per contract and the
+    contract word counts.
+    """
+    n = len(batches)
+    sizes = np.fromiter((len(b) for b in batches), np.int64, n)
+
+    def concat(arrays, dtype):
+        return np.concatenate(arrays) if n else np.zeros(0, dtype=dtype)
+
+    critical = concat([b.critical() for b in batches], bool)
+    return SweepInputs(
+        contracts=list(range(n) if contracts is None else contracts),
+        positions=np.repeat(np.arange(n), sizes),
+        confidences=concat([b.confidences for b in batches], np.float64),
+        scoring_candidates=critical & ~concat(
+            [b.strong("SCORING_STRONG_CLAUSE") for b in batches], bool
+        ),
+        highlight_candidates=critical & ~concat(
+            [b.strong("STRONG_CLAUSE") for b in batches], bool
+        ),
+        missing=np.fromiter((len(b.missing_critical()) for b in batches), np.float64, n),
+        words=np.asarray(contract_words, dtype=np.int64)
+    )
+
+
+def sweep_inputs_from_store(store, corpus_path=DATA_PATH) -> SweepInputs:
+    """
+    Sweep inputs for every contract in a logits store. Contract word
+    counts are read from the corpus text.
+    """
+    corpus = open_corpus(corpus_path)
+    contracts = [entry["contract"] for entry in store.contracts()]
+    words = [
+        len(extract_full_contract_text(corpus.get(index)).split())
+        for index in contracts
+    ]
+    return sweep_inputs(
+        [store.clause_batch(index) for index in contracts], words, contracts
+    )
+
+
+def below_counts(inputs: SweepInputs, candidates: np.ndarray,
+                 thresholds: np.ndarray) -> np.ndarray:
+    """
+    thresholds x contracts matrix of how many candidate clauses have a
+    confidence below each threshold. One pass over the clauses: each is
+    binned by the first threshold above it, then counts accumulate.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    order = np.argsort(thresholds)
+    k, n = len(thresholds), len(inputs.contracts)
+
+    bins = np.searchsorted(thresholds[order], inputs.confidences[candidates], side="right")
+    counts = np.bincount(
+        inputs.positions[candidates] * (k + 1) + bins, minlength=n * (k + 1)
+    ).reshape(n, k + 1).cumsum(axis=1)[:, :k]
+
+    result = np.empty((k, n), dtype=np.int64)
+    result[order] = counts.T
+    return result
+
+
+def _product(grid: Dict, names: Sequence[str]) -> np.ndarray:
+    return np.array(list(itertools.product(*(grid[name] for name in names))), dtype=np.float64)
+
+
+def default_grid() -> Dict[str, List[float]]:
+    """
+    A one-point grid with the current settings.
+    """
+    grid = {"LOW": [CONFIDENCE_THRESHOLDS["LOW"]]}
+    grid.update({risk_id: [RISK_WEIGHTS[risk_id]] for risk_id in RISK_IDS})
+    grid.update({
+        "REQUIRES_REVIEW": [DECISION_THRESHOLDS["REQUIRES_REVIEW"]],
+        "HIGH_RISK": [DECISION_THRESHOLDS["HIGH_RISK"]],
+        "SAFE_SCORE": [DECISION_THRESHOLDS["SAFE_TO_SIGN"]],
+        "COMPLEX_WORDS": [COMPLEX_CONTRACT_WORDS]
+    })
+    return grid
+
+
+def _axes(grid: Dict, mode: str):
+    if mode not in ("service", "pipeline"):
+        raise ValueError(f"Unknown sweep mode: {mode}")
+
+    lows = np.asarray(grid["LOW"], dtype=np.float64)
+    weights = _product(grid, RISK_IDS)
+    edges = _product(grid, ["REQUIRES_REVIEW", "HIGH_RISK"])
+    edges = edges[edges[:, 0] <= edges[:, 1]]
+    if mode == "service":
+        fallbacks = _product(grid, ["SAFE_SCORE", "COMPLEX_WORDS"])
+    else:
+        fallbacks = np.zeros((1, 0))
+    return lows, weights, edges, fallbacks
+
+
+def _evaluate(inputs: SweepInputs, lows, weights, edges, fallbacks, mode: str):
+    """
+    Yields, per LOW value, the weights x contracts risk scores and the
+    configs x contracts decision indices (configs in weights, edges,
+    fallbacks order).
+    """
+    n = len(inputs.contracts)
+    low_counts = below_counts(inputs, inputs.scoring_candidates, lows)
+    highlighted = below_counts(inputs, inputs.highlight_candidates, lows) > 0
+
+    signals = np.zeros((n, len(RISK_IDS)))
+    signals[:, _MISSING] = inputs.missing
+
+    for t in range(len(lows)):
+        signals[:, _LOW_CONFIDENCE] = low_counts[t]
+        # weights x contracts
+        scores = np.round(weights @ signals.T, 2)
+
+        # weights x edges x contracts, as classify_decision
+        decision = (
+            (scores[:, None, :] >= edges[None, :, 0, None]).astype(np.int8)
+            + (scores[:, None, :] >= edges[None, :, 1, None])
+        )
+
+        if mode == "service":
+            # Without highlights: complex contracts need review, otherwise
+            # safe up to SAFE_SCORE and review above it
+            complex_contract = inputs.words[None, :] > fallbacks[:, 1, None]
+            fallback = np.where(
+                complex_contract[None],
+                REVIEW,
+                np.where(scores[:, None, :] <= fallbacks[None, :, 0, None], SAFE, REVIEW)
+            ).astype(np.int8)
+            decision = np.where(
+                highlighted[t],
+                decision[:, :, None, :],
+                fallback[:, None, :, :]
+            )
+
+        yield scores, decision.reshape(-1, n)
+
+
+def sweep(inputs: SweepInputs, grid: Dict[str, Sequence[float]] = None,
+          mode: str = "service") -> Dict:
+    """
+    Evaluates every combination of the grid values (missing keys keep
+    their current setting; REQUIRES_REVIEW above HIGH_RISK is skipped).
+
+    Returns {"names", "configs", "counts"}: configs is a configs x names
+    array of settings and counts a configs x DECISIONS array of how many
+    contracts got each decision.
+    """
+    lows, weights, edges, fallbacks = _axes({**default_grid(), **(grid or {})}, mode)
+
+    counts = [
+        np.stack([(decision == d).sum(axis=1) for d in range(len(DECISIONS))], axis=1)
+        for _, decision in _evaluate(inputs, lows, weights, edges, fallbacks, mode)
+    ]
+
+    names = ["LOW"] + RISK_IDS + ["REQUIRES_REVIEW", "HIGH_RISK"]
+    if mode == "service":
+        names += ["SAFE_SCORE", "COMPLEX_WORDS"]
+
+    configs = np.array([
+        np.concatenate(parts)
+        for parts in itertools.product([[low] for low in lows], weights, edges, fallbacks)
+    ]).reshape(-1, len(names))
+
+    return {
+        "names": names,
+        "configs": configs,
+        "counts": np.concatenate(counts) if counts else np.zeros((0, len(DECISIONS)), np.int64)
+    }
+
+
+def contract_decisions(inputs: SweepInputs, mode: str = "service") -> Dict:
+    """
+    Risk score and decision of every contract under the current settings:
+    the per-contract view of sweep() over default_grid().
+    """
+    (scores, decision), = _evaluate(inputs, *_axes(default_grid(), mode), mode)
+    return {
+        "contracts": inputs.contracts,
+        "scores": scores[0],
+        "decisions": DECISIONS[decision[0]]
+    }
+
+
+def sweep_records(result: Dict) -> List[Dict]:
+    """
+    The sweep result as one JSON-friendly dict per configuration.
+    """
+    return [
+        {
+            "settings": dict(zip(result["names"], config.tolist())),
+            "decisions": dict(zip(DECISIONS.tolist(), counts.tolist()))
+        }
+        for config, counts in zip(result["configs"], result["counts"])
+    ]
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def parse_values(spec: str) -> List[float]:
+    """
+    "a,b,c" or an inclusive range "start:stop:step".
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6).tolist()
+    return [float(x) for x in spec.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Threshold and weight sweep over cached logits")
+    parser.add_argument("--corpus", type=Path, default=DATA_PATH)
+    parser.add_argument("--store-dir", type=Path, help="logits store root (default: STORE_DIR)")
+    parser.add_argument("--identity",
+                        help="logits store model identity (default: the current "
+                             "model_identity(); giving it skips loading torch)")
+    parser.add_argument("--mode", choices=["service", "pipeline"], default="service")
+    parser.add_argument("--low", help="LOW confidence thresholds")
+    parser.add_argument("--weight", action="append", default=[], metavar="RISK_ID=VALUES",
+                        help="risk weight values, repeatable")
+    parser.add_argument("--review", help="REQUIRES_REVIEW score thresholds")
+    parser.add_argument("--high", help="HIGH_RISK score thresholds")
+    parser.add_argument("--safe-score", help="safe score limits without highlights")
+    parser.add_argument("--complex-words", help="complex contract word counts")
+    parser.add_argument("--top", type=int, default=10, help="configurations to print")
+    parser.add_argument("--output", type=Path, help="write every configuration as JSON")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for key, spec in (
+        ("LOW", args.low),
+        ("REQUIRES_REVIEW", args.review),
+        ("HIGH_RISK", args.high),
+        ("SAFE_SCORE", args.safe_score),
+        ("COMPLEX_WORDS", args.complex_words)
+    ):
+        if spec:
+            grid[key] = parse_values(spec)
+    for spec in args.weight:
+        risk_id, _, values = spec.partition("=")
+        if risk_id not in RISK_IDS:
+            parser.error(f"Unknown risk id: {risk_id}")
+        grid[risk_id] = parse_values(values)
+
+    from src.logits_store import get_logits_store
+
+    started = time.perf_counter()
+    try:
+        store = get_logits_store(args.identity, root=args.store_dir, create=False)
+    except FileNotFoundError as exc:
+        parser.error(f"{exc}; build it with python -m src.logits_store build")
+    inputs = sweep_inputs_from_store(store, args.corpus)
+    loaded = time.perf_counter()
+    result = sweep(inputs, grid, mode=args.mode)
+    finished = time.perf_counter()
+
+    print(
+        f"{len(result['configs'])} configurations x {len(inputs.contracts)} contracts "
+        f"({len(inputs.confidences)} clauses): inputs {loaded - started:.2f}s, "
+        f"sweep {finished - loaded:.2f}s",
+        file=sys.stderr
+    )
+
+    records = sweep_records(result)
+    for record in records[:args.top]:
+        print(json.dumps(record))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"mode": args.mode, "configs": records}, f)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
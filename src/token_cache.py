@@ -0,0 +1,277 @@
+"""
+Pre-tokenised CUAD corpus.
+
+The build step segments and tokenises every contract once and stores:
+
+    tokens.bin          int32 token IDs of every clause, back to back
+                        (no special tokens, no truncation)
+    token_offsets.bin   int64 [clauses + 1] clause start in tokens.bin
+    text.bin            UTF-8 clause texts, back to back
+    text_offsets.bin    int64 [clauses + 1] clause start in text.bin
+    clause_offsets.bin  int64 [contracts + 1] first clause of each contract
+    manifest.json       titles, counts and the cache key
+
+all read back as memory maps. A cache directory is keyed by the
+tokenizer identity, the corpus file and the segmenter, so a different
+tokenizer or an updated corpus gets its own cache. Runs over the cache
+skip JSON parsing, segmentation and tokenisation.
+
+    python -m src.token_cache build
+    python -m src.token_cache info
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+
+from src.clause_segmenter import CLAUSE_BOUNDARY, MIN_CLAUSE_CHARS, split_clauses
+from src.cuad_corpus import BASE_DIR, DATA_PATH, open_corpus
+
+CACHE_VERSION = 1
+CACHE_DIR = Path(os.environ.get(
+    "PRODOC_TOKEN_CACHE_DIR",
+    BASE_DIR / "data" / "cache" / "tokens"
+))
+
+TOKEN_DTYPE = np.int32
+OFFSET_DTYPE = np.int64
+
+
+def tokenizer_identity(tokenizer) -> str:
+    """
+    Fingerprint of everything that changes token IDs: the tokenizer class,
+    its full serialised pipeline (vocabulary, normaliser, pre-tokeniser)
+    and its maximum length.
+    """
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        spec = json.loads(backend.to_str())
+        # Call-time settings, changed by every tokenizer(...) call
+        spec.pop("truncation", None)
+        spec.pop("padding", None)
+        spec = json.dumps(spec, sort_keys=True)
+    else:
+        spec = json.dumps(sorted(tokenizer.get_vocab().items()))
+
+    payload = f"{type(tokenizer).__name__}\0{tokenizer.model_max_length}\0{spec}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(tokenizer, corpus_path: Union[str, Path] = DATA_PATH) -> Dict:
+    stat = Path(corpus_path).stat()
+    return {
+        "version": CACHE_VERSION,
+        "tokenizer": tokenizer_identity(tokenizer),
+        "corpus": {
+            "path": str(Path(corpus_path).resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        },
+        "segmenter": [CLAUSE_BOUNDARY.pattern, MIN_CLAUSE_CHARS]
+    }
+
+
+def cache_path(key: Dict, root: Path = None) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    return Path(root or CACHE_DIR) / digest[:16]
+
+
+class TokenCache:
+    """
+    Read-only view over a built cache directory. Token and text slices
+    are views into the memory maps; nothing is loaded up front.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        with open(self.directory / "manifest.json", "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.tokens = self._map("tokens.bin", TOKEN_DTYPE)
+        self.token_offsets = self._map("token_offsets.bin", OFFSET_DTYPE)
+        self.text = self._map("text.bin", np.uint8)
+        self.text_offsets = self._map("text_offsets.bin", OFFSET_DTYPE)
+        self.clause_offsets = self._map("clause_offsets.bin", OFFSET_DTYPE)
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        path = self.directory / name
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    @property
+    def tokenizer(self) -> str:
+        return self.manifest["key"]["tokenizer"]
+
+    def __len__(self) -> int:
+        return len(self.manifest["titles"])
+
+    def titles(self) -> List[str]:
+        return self.manifest["titles"]
+
+    def clause_range(self, index: int) -> range:
+        return range(int(self.clause_offsets[index]), int(self.clause_offsets[index + 1]))
+
+    def clause_lengths(self, index: int) -> np.ndarray:
+        """
+        Token count of every clause of one contract.
+        """
+        clauses = self.clause_range(index)
+        return np.diff(self.token_offsets[clauses.start:clauses.stop + 1])
+
+    def clause_tokens(self, index: int) -> List[np.ndarray]:
+        return [
+            self.tokens[self.token_offsets[c]:self.token_offsets[c + 1]]
+            for c in self.clause_range(index)
+        ]
+
+    def clause_texts(self, index: int) -> List[str]:
+        return [
+            self.text[self.text_offsets[c]:self.text_offsets[c + 1]].tobytes().decode("utf-8")
+            for c in self.clause_range(index)
+        ]
+
+    def check_tokenizer(self, tokenizer):
+        if tokenizer_identity(tokenizer) != self.tokenizer:
+            raise ValueError(
+                f"Token cache {self.directory} was built with a different tokenizer"
+            )
+
+
+def _append(f, array: np.ndarray) -> int:
+    f.write(array.tobytes())
+    return len(array)
+
+
+def build_token_cache(
+    tokenizer,
+    corpus_path: Union[str, Path] = DATA_PATH,
+    root: Path = None,
+    chunk_clauses: int = 512
+) -> TokenCache:
+    """
+    Segments and tokenises the whole corpus into a new cache directory.
+    Files are written to a temporary directory that is renamed into place
+    once complete.
+    """
+    from src.batch_inference import tokenize_full
+    from src.prodoc_pipeline import extract_full_contract_text
+
+    key = cache_key(tokenizer, corpus_path)
+    target = cache_path(key, root)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".building-", dir=target.parent))
+
+    titles = []
+    token_offsets = [0]
+    text_offsets = [0]
+    clause_offsets = [0]
+    pending = []
+
+    try:
+        with open(staging / "tokens.bin", "wb") as tokens_f, \
+                open(staging / "text.bin", "wb") as text_f:
+
+            def flush():
+                for ids in tokenize_full(pending, tokenizer):
+                    token_offsets.append(
+                        token_offsets[-1] + _append(tokens_f, np.asarray(ids, dtype=TOKEN_DTYPE))
+                    )
+                pending.clear()
+
+            for contract in open_corpus(corpus_path).iter_contracts():
+                titles.append(contract["title"])
+                clauses = split_clauses(extract_full_contract_text(contract))
+                for text in clauses:
+                    encoded = text.encode("utf-8")
+                    text_f.write(encoded)
+                    text_offsets.append(text_offsets[-1] + len(encoded))
+                clause_offsets.append(clause_offsets[-1] + len(clauses))
+
+                pending.extend(clauses)
+                if len(pending) >= chunk_clauses:
+                    flush()
+            flush()
+
+        for name, offsets in (
+            ("token_offsets.bin", token_offsets),
+            ("text_offsets.bin", text_offsets),
+            ("clause_offsets.bin", clause_offsets)
+        ):
+            np.asarray(offsets, dtype=OFFSET_DTYPE).tofile(staging / name)
+
+        with open(staging / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "key": key,
+                "titles": titles,
+                "clauses": len(text_offsets) - 1,
+                "tokens": token_offsets[-1]
+            }, f)
+
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return TokenCache(target)
+
+
+def open_token_cache(
+    tokenizer,
+    corpus_path: Union[str, Path] = DATA_PATH,
+    root: Path = None,
+    build: bool = True
+) -> TokenCache:
+    """
+    Returns the cache for this tokenizer and corpus, building it first
+    if it does not exist yet (unless build is False).
+    """
+    path = cache_path(cache_key(tokenizer, corpus_path), root)
+    if (path / "manifest.json").exists():
+        return TokenCache(path)
+    if not build:
+        raise FileNotFoundError(f"No token cache at {path}")
+    return build_token_cache(tokenizer, corpus_path, root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-tokenised CUAD corpus cache")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--corpus", type=Path, default=DATA_PATH)
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="rebuild even if the cache exists")
+    args = parser.parse_args(argv)
+
+    from transformers import AutoTokenizer
+    from src.model_registry import MODEL_NAME
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    if args.command == "build" and args.rebuild:
+        cache = build_token_cache(tokenizer, args.corpus, args.cache_dir)
+    else:
+        cache = open_token_cache(
+            tokenizer, args.corpus, args.cache_dir, build=args.command == "build"
+        )
+
+    print(json.dumps({
+        "directory": str(cache.directory),
+        "tokenizer": cache.tokenizer,
+        "contracts": len(cache),
+        "clauses": cache.manifest["clauses"],
+        "tokens": cache.manifest["tokens"]
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())